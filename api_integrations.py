@@ -9,6 +9,15 @@ from typing import Dict, List, Optional
 import tweepy
 import time
 
+from config import Config
+from dispatcher import notify_scheduled
+from linkedin_scheduler import invalidate_calendar_month
+from publish_executor import PublishExecutor, platform_key
+from publish_ledger import as_result, idempotency_key
+from publish_queue import PublishQueue, worker_id
+
+config = Config()
+
 class SocialMediaAPIs:
     def __init__(self):
         self.linkedin_token = os.getenv('LINKEDIN_ACCESS_TOKEN')
@@ -127,6 +136,8 @@ class SocialMediaAPIs:
                     'url': f"https://twitter.com/user/status/{response.data['id']}",
                     'platform': platform
                 }
+            except tweepy.HTTPException as e:
+                return self._failure(e, e.response)
             except Exception as e:
                 return {'success': False, 'error': str(e)}
         
@@ -161,6 +172,7 @@ class SocialMediaAPIs:
                         'post_id': response.json().get('id'),
                         'platform': platform
                     }
+                return self._failure(f"LinkedIn API returned {response.status_code}", response)
             except Exception as e:
                 return {'success': False, 'error': str(e)}
         
@@ -173,6 +185,16 @@ class SocialMediaAPIs:
             'note': 'Demo mode - post not actually published'
         }
     
+    @staticmethod
+    def _failure(error, response) -> Dict:
+        """Failed publish result carrying the HTTP status and Retry-After for retry policies"""
+        return {
+            'success': False,
+            'error': str(error),
+            'status_code': getattr(response, 'status_code', None),
+            'retry_after': getattr(response, 'headers', {}).get('Retry-After')
+        }
+    
     def get_post_analytics(self, platform: str, post_id: str) -> Dict:
         """Get analytics for a specific post"""
         # Mock real-time post analytics
@@ -323,71 +345,95 @@ class RealTimeAnalytics:
 
 
 class ContentScheduler:
-    def __init__(self):
+    """Multi-platform scheduling backed by the shared scheduled_posts queue"""
+    
+    def __init__(self, db_path: Optional[str] = None):
         self.social_apis = SocialMediaAPIs()
-        self.scheduled_posts = []
+        self.queue = PublishQueue(db_path)
+        self.executor = PublishExecutor(self.queue, self.social_apis.post_to_platform)
+        self.ledger = self.executor.ledger
+        self.db_path = self.queue.db_path
     
     def schedule_post(self, platform: str, content: str, schedule_time: datetime, media_urls: List[str] = None) -> Dict:
         """Schedule a post for future publishing"""
-        post_id = f"scheduled_{int(time.time())}_{len(self.scheduled_posts)}"
-        
-        scheduled_post = {
-            'id': post_id,
-            'platform': platform,
-            'content': content,
-            'schedule_time': schedule_time,
-            'media_urls': media_urls or [],
-            'status': 'scheduled',
-            'created_at': datetime.now(),
-            'attempts': 0
-        }
-        
-        self.scheduled_posts.append(scheduled_post)
+        job_id = self.queue.enqueue_content(content, schedule_time, platform, media_urls)
+        invalidate_calendar_month(self.db_path, schedule_time)
+        notify_scheduled(self.db_path, job_id, schedule_time)
         
         return {
             'success': True,
-            'post_id': post_id,
+            'post_id': job_id,
             'scheduled_for': schedule_time.isoformat(),
             'platform': platform
         }
     
     def publish_now(self, platform: str, content: str, media_urls: List[str] = None) -> Dict:
-        """Publish content immediately"""
-        return self.social_apis.post_to_platform(platform, content, media_urls)
+        """Publish content immediately.
+
+        Repeats of the same content to the same platform (a double-clicked
+        button) return the first publish's result with duplicate=True.
+        """
+        key = idempotency_key(content, platform=platform_key(platform))
+        prior = self.ledger.begin(key, None, platform, reuse_seconds=config.PUBLISH_NOW_DEDUP_SECONDS)
+        if prior is not None:
+            result = as_result(prior)
+            if prior['state'] == 'started':
+                result['error'] = "This post is already being published"
+            elif prior['state'] == 'unknown':
+                minutes = max(1, round(config.PUBLISH_NOW_DEDUP_SECONDS / 60))
+                result['error'] = (f"An earlier publish of this post was interrupted; check {platform} "
+                                   f"before publishing again (allowed after {minutes} min)")
+            return result
+        
+        try:
+            result = self.social_apis.post_to_platform(platform, content, media_urls)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        
+        if result['success']:
+            self.ledger.succeed(key, result)
+        else:
+            self.ledger.fail(key, result.get('error', 'Unknown error'))
+        return result
     
-    def get_scheduled_posts(self) -> List[Dict]:
-        """Get all scheduled posts"""
-        return self.scheduled_posts
+    def get_scheduled_posts(self, status: Optional[str] = None, cursor: Optional[List] = None,
+                            limit: int = 20) -> List[Dict]:
+        """One page of scheduled posts in due-time order (see PublishQueue.list_jobs)"""
+        page = self.queue.list_jobs(status, cursor, limit)
+        return [self._as_post(job) for job in page['jobs']]
     
-    def cancel_scheduled_post(self, post_id: str) -> bool:
+    def get_status_counts(self) -> Dict[str, int]:
+        """Scheduled posts per status; 'published' counts today's publishes"""
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.queue.status_counts(since=today)
+    
+    def cancel_scheduled_post(self, post_id) -> bool:
         """Cancel a scheduled post"""
-        for post in self.scheduled_posts:
-            if post['id'] == post_id:
-                post['status'] = 'cancelled'
-                return True
-        return False
+        job = self.queue.cancel(int(post_id))
+        if job is None:
+            return False
+        invalidate_calendar_month(self.db_path, job['scheduled_time'])
+        return True
     
-    def process_scheduled_posts(self):
-        """Process posts that are ready to be published"""
-        now = datetime.now()
-        
-        for post in self.scheduled_posts:
-            if (post['status'] == 'scheduled' and 
-                post['schedule_time'] <= now and 
-                post['attempts'] < 3):
-                
-                result = self.social_apis.post_to_platform(
-                    post['platform'],
-                    post['content'],
-                    post['media_urls']
-                )
-                
-                if result['success']:
-                    post['status'] = 'published'
-                    post['published_at'] = now
-                    post['post_url'] = result.get('url')
-                else:
-                    post['attempts'] += 1
-                    if post['attempts'] >= 3:
-                        post['status'] = 'failed'
-                        post['error'] = result.get('error')
+    def process_scheduled_posts(self, limit: int = 200) -> int:
+        """Publish due posts concurrently (per-platform pools); returns how many were attempted"""
+        owner = worker_id()
+        self.ledger.reconcile()
+        jobs = self.queue.claim_due(owner, limit)
+        self.executor.publish_many(jobs, owner)
+        return len(jobs)
+    
+    @staticmethod
+    def _as_post(job: Dict) -> Dict:
+        return {
+            'id': job['id'],
+            'platform': job['platform'],
+            'content': job['content'] or "",
+            'schedule_time': datetime.fromisoformat(str(job['scheduled_time'])),
+            'media_urls': job['media_urls'],
+            'status': job['status'],
+            'attempts': job['attempts'],
+            'published_at': job['published_at'],
+            'post_url': job['post_url'],
+            'error': job['error_message']
+        }
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Benchmark few-shot retrieval at scale
+
+Generates synthetic corpora with realistic tag, language and line-count
+distributions, then times load, index build, filtering, top-k selection and
+tag listing for:
+
+    baseline  the pre-change pandas FewShotPosts, vendored verbatim in
+              baseline_few_shot.py (top-k is its filter result cut to k, as
+              post_generator used it; get_tags has no frequency sort)
+    json      the current FewShotPosts on the processed JSON corpus
+    mmap      the current FewShotPosts on a memory-mapped corpus store
+
+Results are printed as JSON so runs can be diffed or tracked over time.
+
+    python benchmarks/few_shot_benchmark.py --sizes 10000 100000 --output bench.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from few_shot import FewShotPosts, CorpusSnapshot, PANDAS_AVAILABLE, build_corpus_store
+from baseline_few_shot import FewShotPosts as BaselineFewShotPosts
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+BACKENDS = ["baseline", "json", "mmap"]
+IMPLEMENTATIONS = {
+    "baseline": "pre-change few_shot.FewShotPosts (pandas, vendored)",
+    "json": "few_shot.FewShotPosts on JSON",
+    "mmap": "few_shot.FewShotPosts on a corpus store",
+}
+
+WORDS = (
+    "career growth team leadership hiring interview resume skills learning "
+    "mindset journey startup product customer data remote culture feedback "
+    "mentor network promotion salary burnout focus habit goal success failure "
+    "kaam naukri sapne mehnat dost zindagi"
+).split()
+
+
+def generate_corpus(size, seed=42, tag_vocabulary=300):
+    """Build a synthetic corpus shaped like processed_posts.json"""
+    rng = random.Random(seed)
+    tags = [f"Topic {i:03d}" for i in range(tag_vocabulary)]
+    # Zipf-like tag popularity: a handful of topics dominate, with a long tail
+    weights = [1.0 / (rank + 1) for rank in range(tag_vocabulary)]
+
+    posts = []
+    for _ in range(size):
+        line_count = max(1, min(25, int(rng.lognormvariate(1.6, 0.6))))
+        lines = [" ".join(rng.choices(WORDS, k=rng.randint(4, 14))) for _ in range(line_count)]
+        posts.append({
+            "text": "\n".join(lines),
+            "engagement": int(rng.paretovariate(1.5) * 40),
+            "line_count": line_count,
+            "language": "Hinglish" if rng.random() < 0.2 else "English",
+            "tags": list(set(rng.choices(tags, weights=weights, k=rng.choice([1, 2, 2])))),
+        })
+    return posts
+
+
+def sample_queries(posts, count, seed=7):
+    """Mostly realistic queries plus a share that need the relaxation ladder"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        post = rng.choice(posts)
+        length = rng.choice(["Short", "Medium", "Long"])
+        language = post["language"] if rng.random() < 0.8 else rng.choice(["English", "Hinglish"])
+        queries.append((length, language, rng.choice(post["tags"])))
+    return queries
+
+
+def _rss_bytes():
+    """Current resident set size where /proc is available, else None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def _latency_summary(samples_ms):
+    ordered = sorted(samples_ms)
+    return {
+        "mean_ms": round(statistics.fmean(ordered), 4),
+        "p50_ms": round(ordered[len(ordered) // 2], 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "max_ms": round(ordered[-1], 4),
+    }
+
+
+def _load(backend, json_path, store_path):
+    if backend == "baseline":
+        return BaselineFewShotPosts(json_path)
+    return FewShotPosts(store_path if backend == "mmap" else json_path)
+
+
+def bench_backend(backend, posts, json_path, store_path, queries, k):
+    """Time one backend against an on-disk corpus"""
+    gc.collect()
+    result = {"backend": backend, "implementation": IMPLEMENTATIONS[backend]}
+
+    # Index build: the store file for mmap, the in-memory snapshot for JSON; the baseline
+    # has no index (its DataFrame is built during load)
+    if backend == "mmap":
+        _, result["index_build_ms"] = _timed(build_corpus_store, json_path, store_path)
+        result["store_bytes"] = os.path.getsize(store_path)
+    elif backend == "json":
+        builder = FewShotPosts.__new__(FewShotPosts)
+        _, result["index_build_ms"] = _timed(
+            builder._apply_changes, CorpusSnapshot(), [dict(post) for post in posts], None)
+        del builder
+    else:
+        result["index_build_ms"] = None
+
+    gc.collect()
+    rss_before = _rss_bytes()
+    tracemalloc.start()
+    fs, result["load_ms"] = _timed(_load, backend, json_path, store_path)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = _rss_bytes()
+    result["python_heap_bytes"] = current
+    result["python_heap_peak_bytes"] = peak
+    if rss_before is not None:
+        result["rss_delta_bytes"] = rss_after - rss_before
+
+    filter_fn = lambda q: fs.get_filtered_posts(*q)
+    if backend == "baseline":
+        top_k_fn = lambda q: fs.get_filtered_posts(*q)[:k]
+        tags_fn = fs.get_tags
+    else:
+        fs.reload_interval = float("inf")  # measure queries, not change detection
+        top_k_fn = lambda q: fs.get_ranked_posts(*q, k=k)
+        tags_fn = lambda: fs.get_tags(sort_by="frequency")
+
+    result["filter"] = _latency_summary([_timed(filter_fn, q)[1] for q in queries])
+    result["top_k"] = _latency_summary([_timed(top_k_fn, q)[1] for q in queries])
+    result["get_tags"] = _latency_summary([_timed(tags_fn)[1] for _ in range(min(len(queries), 50))])
+
+    if backend != "baseline" and fs.snapshot.store is not None:
+        fs.snapshot.store.close()
+    return result
+
+
+def run(sizes, backends, queries_per_size=200, k=2, seed=42, workdir=None):
+    report = {
+        "benchmark": "few_shot_retrieval",
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas_available": PANDAS_AVAILABLE,
+        "results": [],
+    }
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for size in sizes:
+            posts, generate_ms = _timed(generate_corpus, size, seed)
+            json_path = os.path.join(tmp, f"corpus_{size}.json")
+            store_path = os.path.join(tmp, f"corpus_{size}.ccs")
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump(posts, f)
+            queries = sample_queries(posts, queries_per_size, seed)
+
+            entry = {
+                "size": size,
+                "generate_ms": round(generate_ms, 2),
+                "json_bytes": os.path.getsize(json_path),
+                "backends": [],
+            }
+            for backend in backends:
+                if backend == "baseline" and not PANDAS_AVAILABLE:
+                    entry["backends"].append({"backend": backend, "skipped": "pandas not installed"})
+                    continue
+                entry["backends"].append(bench_backend(backend, posts, json_path, store_path, queries, k))
+
+            report["results"].append(entry)
+            del posts
+            gc.collect()
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark few-shot retrieval at scale")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--queries", type=int, default=200, help="queries per corpus size")
+    parser.add_argument("--k", type=int, default=2, help="examples per top-k query")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.backends, args.queries, args.k, args.seed)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Benchmark report written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,84 @@ class Config:
     # Data paths
     PROCESSED_POSTS_PATH = "data/processed_posts.json"
     RAW_POSTS_PATH = "data/raw_posts.json"
+    TAG_ALIASES_PATH = "data/tag_aliases.json"
+    
+    # Memory-mapped corpus store, used instead of the JSON corpus when present
+    CORPUS_STORE_SUFFIX = ".ccs"
+    CORPUS_STORE_PATH = "data/processed_posts.ccs"
+    
+    # Seconds between checks for a rewritten few-shot corpus (hot reload)
+    CORPUS_RELOAD_INTERVAL = float(os.getenv("CORPUS_RELOAD_INTERVAL", "2"))
+    
+    # Content library database
+    DB_PATH = "content_library.db"
+    DB_BUSY_TIMEOUT_MS = 5000
+    DB_SYNCHRONOUS = "NORMAL"      # safe with WAL; FULL fsyncs on every commit
+    DB_CACHE_SIZE_KB = 20000
+    
+    # post_metrics rows older than this move to monthly tables in <db>.archive.db
+    METRICS_RETENTION_DAYS = int(os.getenv("METRICS_RETENTION_DAYS", "90"))
+    METRICS_ARCHIVE_SUFFIX = ".archive.db"
+    
+    # Cached calendar months expire after this many seconds (picks up other processes' writes)
+    CALENDAR_CACHE_TTL = float(os.getenv("CALENDAR_CACHE_TTL", "60"))
+    
+    # Seconds between dispatcher checks for posts scheduled by other processes
+    DISPATCHER_POLL_INTERVAL = float(os.getenv("DISPATCHER_POLL_INTERVAL", "5"))
+    
+    # Publish queue: how long a claimed job stays leased
+    SCHEDULER_LEASE_SECONDS = float(os.getenv("SCHEDULER_LEASE_SECONDS", "120"))
+    
+    # Dispatcher workers heartbeat this often, extending the leases of jobs they hold
+    WORKER_HEARTBEAT_INTERVAL = float(os.getenv("WORKER_HEARTBEAT_INTERVAL", "10"))
+    # A worker silent for this long is dead: its leases are reclaimed and leadership can move
+    WORKER_TIMEOUT = float(os.getenv("WORKER_TIMEOUT", "30"))
+    # With several dispatchers, only the elected leader publishes (the others stand by)
+    DISPATCHER_LEADER_ONLY = os.getenv("DISPATCHER_LEADER_ONLY", "false").lower() == "true"
+    
+    # Posting-time optimiser: how many posts' worth of weight the research prior gets per
+    # weekday/hour cell, and how close to the best score an hour must be to count as optimal
+    POSTING_TIME_PRIOR_STRENGTH = 5
+    POSTING_TIME_TOLERANCE = 0.9
+    POSTING_TIME_CACHE_TTL = 300
+    
+    # Batch scheduling defaults: minimum gap between posts and posts per day
+    BATCH_MIN_SPACING_HOURS = 3
+    BATCH_MAX_POSTS_PER_DAY = 2
+    
+    # Scheduler instrumentation: seconds between utilisation/queue-depth samples, days kept
+    SCHEDULER_METRICS_INTERVAL = float(os.getenv("SCHEDULER_METRICS_INTERVAL", "60"))
+    SCHEDULER_METRICS_RETENTION_DAYS = 30
+    
+    # A repeated "Publish Now" of the same content within this many seconds returns the first result
+    PUBLISH_NOW_DEDUP_SECONDS = 600
+    
+    # Retry policies per platform and error class (rate_limited, server, network, auth, client);
+    # delays are seconds, more specific entries override "default"
+    RETRY_POLICIES = {
+        "default": {
+            "default": {"max_attempts": 5, "base_delay": 30, "max_delay": 3600},
+            "rate_limited": {"max_attempts": 8, "base_delay": 60},
+            "network": {"base_delay": 10},
+        },
+        "twitter": {
+            "rate_limited": {"base_delay": 900},  # 15-minute rate limit windows
+        },
+    }
+    
+    # Per-platform publishing pools: concurrent workers and API calls per minute
+    PUBLISH_LIMITS = {
+        "linkedin": {"workers": 4, "rate_per_minute": 100},
+        "twitter": {"workers": 8, "rate_per_minute": 300},
+        "instagram": {"workers": 2, "rate_per_minute": 25},
+        "facebook": {"workers": 4, "rate_per_minute": 200},
+        "default": {"workers": 2, "rate_per_minute": 60},
+    }
+    
+    # Near-duplicate detection on save (MinHash LSH, 8x8 bands ~ 0.77 Jaccard cut-off)
+    NEAR_DUPLICATE_THRESHOLD = 0.8
+    MINHASH_BANDS = 8
+    MINHASH_ROWS_PER_BAND = 8
     
     # Application settings
     APP_NAME = "ContentCraft AI PostGen"
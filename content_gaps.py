@@ -0,0 +1,121 @@
+"""
+Content gap detection over long horizons
+
+Scheduled posts are counted per day (optionally per platform and/or content
+type) with one grouped query per window of days; the gaps of a window are
+its open days minus the days that already have enough posts. Windows are
+queried only as the generator is consumed, so the next ten gaps of a
+multi-year horizon cost a single month's query.
+"""
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta
+from itertools import product
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from config import Config
+from database import get_connection
+
+config = Config()
+
+WINDOW_DAYS = 31
+GROUP_COLUMNS = {'platform': 'sp.platform', 'content_type': 'p.content_type'}
+
+
+def _group_values(conn, column: str, given: Optional[List[str]]) -> List[Optional[str]]:
+    """Groups to report: the given ones, else those in the data, else a fallback.
+
+    An empty calendar is all gaps, so with nothing scheduled yet platforms fall
+    back to the configured publishing platforms and content types to a single
+    unlabelled (None) group.
+    """
+    if given:
+        return list(given)
+    if column == 'platform':
+        rows = conn.execute("SELECT DISTINCT platform FROM scheduled_posts WHERE platform IS NOT NULL")
+        fallback = [platform for platform in config.PUBLISH_LIMITS if platform != 'default']
+    else:
+        rows = conn.execute("SELECT DISTINCT content_type FROM posts WHERE content_type IS NOT NULL")
+        fallback = [None]
+    return sorted(row[0] for row in rows) or fallback
+
+
+def iter_gaps(db_path: Optional[str], start: date, end: date, by: Sequence[str] = (),
+              platforms: Optional[List[str]] = None, content_types: Optional[List[str]] = None,
+              posts_per_day: int = 1, weekdays: Iterable[int] = range(5),
+              scores: Optional[List[List[float]]] = None) -> Iterator[Dict]:
+    """Yield days in [start, end) with fewer than posts_per_day posts, in date order.
+
+    by groups the count by 'platform' and/or 'content_type', yielding one gap
+    per missing group and day. platforms/content_types restrict the groups
+    (and the posts counted). Each gap carries a free slot on the day's best
+    hour, by scores (the posting-time model) when given.
+    """
+    unknown = set(by) - set(GROUP_COLUMNS)
+    if unknown:
+        raise ValueError(f"Cannot group gaps by {', '.join(sorted(unknown))}")
+
+    conn = get_connection(db_path or config.DB_PATH)
+    keys = list(product(*(
+        _group_values(conn, column, platforms if column == 'platform' else content_types) for column in by
+    )))
+    weekdays = set(weekdays)
+    rankings = [
+        sorted(range(24), key=lambda hour: (-scores[weekday][hour], hour)) if scores else list(range(9, 24)) + list(range(9))
+        for weekday in range(7)
+    ]
+
+    key_columns = "".join(f", {GROUP_COLUMNS[column]}" for column in by)
+    conditions = ["sp.scheduled_time >= ?", "sp.scheduled_time < ?",
+                  "sp.status IN ('pending', 'publishing', 'published')"]
+    filters = []
+    for column, values in (('platform', platforms), ('content_type', content_types)):
+        if values:
+            conditions.append(f"{GROUP_COLUMNS[column]} IN ({', '.join('?' for _ in values)})")
+            filters.extend(values)
+    join = "JOIN posts p ON p.id = sp.post_id" if 'content_type' in by or content_types else ""
+    query = f'''
+        SELECT date(sp.scheduled_time), CAST(strftime('%H', sp.scheduled_time) AS INTEGER){key_columns}, COUNT(*)
+        FROM scheduled_posts sp
+        {join}
+        WHERE {' AND '.join(conditions)}
+        GROUP BY 1, 2{''.join(f', {i}' for i in range(3, 3 + len(by)))}
+    '''
+
+    window_start = start
+    while window_start < end:
+        window_end = min(window_start + timedelta(days=WINDOW_DAYS), end)
+        counts = Counter()
+        hours = defaultdict(set)
+        for day, hour, *key, count in conn.execute(
+            query, [datetime.combine(window_start, time()), datetime.combine(window_end, time())] + filters
+        ):
+            counts[(day, tuple(key))] += count
+            hours[day].add(hour)
+
+        open_days = {
+            window_start + timedelta(days=offset) for offset in range((window_end - window_start).days)
+        }
+        open_days = {day for day in open_days if day.weekday() in weekdays}
+        free = {
+            key: open_days - {
+                date.fromisoformat(day) for (day, group), count in counts.items()
+                if group == key and count >= posts_per_day
+            }
+            for key in keys
+        }
+
+        for day in sorted(open_days):
+            taken = hours.get(day.isoformat(), ())
+            hour = next((hour for hour in rankings[day.weekday()] if hour not in taken), None)
+            for key in keys:
+                if day in free[key]:
+                    scheduled = counts.get((day.isoformat(), key), 0)
+                    gap = {
+                        'date': day,
+                        'scheduled': scheduled,
+                        'missing': posts_per_day - scheduled,
+                        'slot': datetime.combine(day, time(hour)) if hour is not None else None,
+                    }
+                    gap.update(zip(by, key))
+                    yield gap
+        window_start = window_end
@@ -0,0 +1,275 @@
+"""
+Memory-mapped corpus store for large few-shot example libraries
+
+Layout (all integers little-endian):
+
+    header    magic, version, post count, sha256 of the body, section table
+    offsets   (count + 1) x u64 byte offsets into the text blob
+    text      UTF-8 post texts, concatenated
+    records   count x fixed-size record (line_count, engagement, tag slice,
+              language id, length id)
+    index     u32 JSON length, JSON vocabulary/postings directory and tag
+              statistics, then a u32 array holding posting lists and the
+              per-post tag ids
+
+A missing language is kept as JSON null (language postings are keyed by
+language id, since JSON object keys can only be strings), so a mapped corpus
+answers language=None queries exactly like the JSON corpus.
+
+Readers map the file read-only, so every process on a host shares the same
+page cache and a post's text is only paged in when it is actually used.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterable, List
+
+MAGIC = b"CCSTORE1"
+VERSION = 2
+
+HEADER = struct.Struct("<8sII32s" + "QQ" * 4)
+RECORD = struct.Struct("<IIIHHBxxx")
+OFFSET = struct.Struct("<Q")
+U32 = struct.Struct("<I")
+
+
+class CorpusStoreError(Exception):
+    """Raised when a corpus store file is missing or malformed"""
+
+
+def _u32_array(data) -> array:
+    values = array("I")
+    values.frombytes(data)
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def write_corpus_store(posts: List[Dict], file_path: str, tag_stats: Dict = None) -> str:
+    """Write posts (already carrying a 'length' bucket) to a store file.
+
+    The file is written next to the target and renamed into place, so readers
+    that still map the previous version keep a valid view. Returns the digest.
+    """
+    languages, lengths, tags = {}, {}, {}
+    language_postings, length_postings, tag_postings = {}, {}, {}
+
+    text_blob = bytearray()
+    offsets = bytearray(OFFSET.pack(0))
+    post_tags = array("I")
+    records = bytearray()
+
+    for post_id, post in enumerate(posts):
+        text_blob += post.get("text", "").encode("utf-8", "surrogatepass")
+        offsets += OFFSET.pack(len(text_blob))
+
+        language_id = languages.setdefault(post.get("language"), len(languages))
+        length_id = lengths.setdefault(post["length"], len(lengths))
+        language_postings.setdefault(str(language_id), []).append(post_id)
+        length_postings.setdefault(post["length"], []).append(post_id)
+
+        tags_start = len(post_tags)
+        for tag in dict.fromkeys(post.get("tags", [])):
+            post_tags.append(tags.setdefault(tag, len(tags)))
+            tag_postings.setdefault(tag, []).append(post_id)
+
+        records += RECORD.pack(
+            int(post.get("line_count", 0)), int(post.get("engagement", 0)),
+            tags_start, len(post_tags) - tags_start, language_id, length_id,
+        )
+
+    # Posting lists and per-post tag ids share one u32 array
+    ints = array("I")
+    directory = {}
+    for name, postings in (("tag", tag_postings), ("language", language_postings),
+                           ("length", length_postings)):
+        directory[name] = {}
+        for term, ids in postings.items():
+            directory[name][term] = [len(ints), len(ids)]
+            ints.extend(ids)
+    post_tags_offset = len(ints)
+    ints.extend(post_tags)
+    if sys.byteorder != "little":
+        ints.byteswap()
+
+    tag_stats = dict(tag_stats or {})
+    if "by_language" in tag_stats:
+        tag_stats["by_language"] = [[language, counts] for language, counts in tag_stats["by_language"].items()]
+
+    index_json = json.dumps({
+        "languages": list(languages),
+        "lengths": list(lengths),
+        "tags": list(tags),
+        "postings": directory,
+        "post_tags_offset": post_tags_offset,
+        "tag_stats": tag_stats,
+    }).encode("utf-8")
+    index = U32.pack(len(index_json)) + index_json + ints.tobytes()
+
+    sections = [bytes(offsets), bytes(text_blob), bytes(records), index]
+    digest = hashlib.sha256()
+    for section in sections:
+        digest.update(section)
+
+    table = []
+    position = HEADER.size
+    for section in sections:
+        table.extend((position, len(section)))
+        position += len(section)
+
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(posts), digest.digest(), *table))
+        for section in sections:
+            f.write(section)
+    os.replace(tmp_path, file_path)
+    return digest.hexdigest()
+
+
+def read_store_digest(file_path: str) -> str:
+    """Read only the header digest; used to detect a rewritten store cheaply"""
+    with open(file_path, "rb") as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size or header[:8] != MAGIC:
+        raise CorpusStoreError(f"{file_path} is not a corpus store")
+    return HEADER.unpack(header)[3].hex()
+
+
+class _PostingsIndex(Mapping):
+    """Term -> frozenset of post ids, decoded from the map on first use"""
+
+    def __init__(self, store, directory):
+        self._store = store
+        self._directory = directory
+        self._cache = {}
+
+    def __getitem__(self, term):
+        ids = self._cache.get(term)
+        if ids is None:
+            start, count = self._directory[term]
+            ids = frozenset(self._store._ints(start, count))
+            self._cache[term] = ids
+        return ids
+
+    def __contains__(self, term):
+        return term in self._directory
+
+    def __iter__(self):
+        return iter(self._directory)
+
+    def __len__(self):
+        return len(self._directory)
+
+
+class _MappedPosts(Mapping):
+    """Post id -> post dict, reading the text from the map on access"""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __getitem__(self, post_id):
+        return self._store.post(post_id)
+
+    def __iter__(self):
+        return iter(range(len(self._store)))
+
+    def __len__(self):
+        return len(self._store)
+
+
+class CorpusStore:
+    """Read-only, memory-mapped view of a corpus store file"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        with open(file_path, "rb") as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise CorpusStoreError(f"{file_path} is empty") from e
+
+        if len(self._mm) < HEADER.size or self._mm[:8] != MAGIC:
+            raise CorpusStoreError(f"{file_path} is not a corpus store")
+        fields = HEADER.unpack_from(self._mm, 0)
+        if fields[1] != VERSION:
+            raise CorpusStoreError(f"Unsupported corpus store version {fields[1]}; rebuild it with python corpus_store.py")
+
+        self.count = fields[2]
+        self.digest = fields[3].hex()
+        (self._offsets_at, _, self._text_at, _,
+         self._records_at, _, index_at, index_len) = fields[4:]
+
+        json_len = U32.unpack_from(self._mm, index_at)[0]
+        meta = json.loads(self._mm[index_at + 4:index_at + 4 + json_len].decode("utf-8"))
+        self._ints_at = index_at + 4 + json_len
+        self._languages = meta["languages"]
+        self._lengths = meta["lengths"]
+        self._tags = meta["tags"]
+        self._post_tags_offset = meta["post_tags_offset"]
+        self.tag_stats = meta["tag_stats"]
+        if "by_language" in self.tag_stats:
+            self.tag_stats["by_language"] = {language: counts for language, counts in self.tag_stats["by_language"]}
+
+        postings = meta["postings"]
+        self.tag_index = _PostingsIndex(self, postings["tag"])
+        self.language_index = _PostingsIndex(self, {
+            self._languages[int(language_id)]: entry for language_id, entry in postings["language"].items()
+        })
+        self.length_index = _PostingsIndex(self, postings["length"])
+        self.posts = _MappedPosts(self)
+
+    def __len__(self):
+        return self.count
+
+    def _ints(self, start: int, count: int) -> array:
+        begin = self._ints_at + start * U32.size
+        return _u32_array(self._mm[begin:begin + count * U32.size])
+
+    def _check(self, post_id: int):
+        if not 0 <= post_id < self.count:
+            raise KeyError(post_id)
+
+    def meta(self, post_id: int) -> Dict:
+        """Post fields without the text; only touches the records section"""
+        self._check(post_id)
+        line_count, engagement, tags_start, tags_count, language_id, length_id = \
+            RECORD.unpack_from(self._mm, self._records_at + post_id * RECORD.size)
+        tag_ids = self._ints(self._post_tags_offset + tags_start, tags_count)
+        return {
+            "line_count": line_count,
+            "engagement": engagement,
+            "language": self._languages[language_id],
+            "tags": [self._tags[tag_id] for tag_id in tag_ids],
+            "length": self._lengths[length_id],
+        }
+
+    def text(self, post_id: int) -> str:
+        self._check(post_id)
+        start, end = struct.unpack_from("<QQ", self._mm, self._offsets_at + post_id * OFFSET.size)
+        begin = self._text_at + start
+        return self._mm[begin:self._text_at + end].decode("utf-8", "surrogatepass")
+
+    def post(self, post_id: int) -> Dict:
+        post = self.meta(post_id)
+        post["text"] = self.text(post_id)
+        return post
+
+    def iter_posts(self) -> Iterable[Dict]:
+        for post_id in range(self.count):
+            yield self.post(post_id)
+
+    def close(self):
+        self._mm.close()
+
+
+if __name__ == "__main__":
+    from few_shot import build_corpus_store
+
+    source = sys.argv[1] if len(sys.argv) > 1 else None
+    target = sys.argv[2] if len(sys.argv) > 2 else None
+    print(f"Wrote corpus store {build_corpus_store(source, target)}")
@@ -0,0 +1,95 @@
+"""
+Shared SQLite connection management for the content library
+
+Every thread keeps one long-lived connection per database file, configured
+for WAL journaling so dashboard readers never wait on writers. Use
+``get_connection`` for reads and ``transaction`` for anything that writes.
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from config import Config
+
+config = Config()
+
+_local = threading.local()
+
+
+def _connections() -> dict:
+    if not hasattr(_local, "connections"):
+        _local.connections = {}
+        _local.depth = {}
+    return _local.connections
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    # isolation_level=None: transactions are opened explicitly by transaction()
+    conn = sqlite3.connect(db_path, timeout=config.DB_BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={config.DB_SYNCHRONOUS}")
+    conn.execute(f"PRAGMA cache_size=-{int(config.DB_CACHE_SIZE_KB)}")
+    conn.execute(f"PRAGMA busy_timeout={int(config.DB_BUSY_TIMEOUT_MS)}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def open_connection(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """A new connection outside the pool, configured like the pooled ones (the caller closes it)"""
+    return _connect(db_path or config.DB_PATH)
+
+
+def get_connection(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """Return this thread's pooled connection to db_path, opening it on first use"""
+    db_path = db_path or config.DB_PATH
+    connections = _connections()
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = _connect(db_path)
+        connections[db_path] = conn
+    return conn
+
+
+@contextmanager
+def transaction(db_path: Optional[str] = None, immediate: bool = True) -> Iterator[sqlite3.Connection]:
+    """Run a block in a single transaction, committing on success.
+
+    Writers take the write lock up front (BEGIN IMMEDIATE) so they wait on the
+    busy timeout instead of failing mid-transaction. Nested blocks join the
+    outermost transaction.
+    """
+    db_path = db_path or config.DB_PATH
+    conn = get_connection(db_path)
+    depth = _local.depth.get(db_path, 0)
+    if depth:
+        _local.depth[db_path] = depth + 1
+        try:
+            yield conn
+        finally:
+            _local.depth[db_path] = depth
+        return
+
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    _local.depth[db_path] = 1
+    try:
+        yield conn
+        # A failed COMMIT (e.g. SQLITE_BUSY) leaves the transaction open; the
+        # handler below rolls it back so the pooled connection stays usable
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        _local.depth[db_path] = 0
+
+
+def close_connections(db_path: Optional[str] = None) -> None:
+    """Close this thread's pooled connections (all of them when db_path is None)"""
+    connections = _connections()
+    paths = [db_path or config.DB_PATH] if db_path else list(connections)
+    for path in paths:
+        conn = connections.pop(path, None)
+        if conn is not None:
+            conn.close()
@@ -0,0 +1,214 @@
+"""
+Exact and near-duplicate detection for saved posts
+
+Exact duplicates are caught by a hash of the normalised content (unique
+index on posts.content_hash). Near duplicates use MinHash signatures over
+word shingles, banded into an LSH index stored in SQLite, so a lookup only
+compares against posts that share at least one band bucket instead of
+scanning the library.
+"""
+import hashlib
+import re
+import struct
+from array import array
+from typing import Dict, List, Optional
+
+from config import Config
+
+config = Config()
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _permutations(count: int, seed: int = 1):
+    """Deterministic (a, b) pairs for the universal hash family a*x + b mod p"""
+    params = []
+    for i in range(count):
+        digest = hashlib.blake2b(f"minhash-{seed}-{i}".encode(), digest_size=16).digest()
+        a, b = struct.unpack("<QQ", digest)
+        params.append((a % (_MERSENNE_PRIME - 1) + 1, b % _MERSENNE_PRIME))
+    return params
+
+
+_PERMUTATIONS = _permutations(config.MINHASH_BANDS * config.MINHASH_ROWS_PER_BAND)
+
+
+def normalize_content(content: str) -> str:
+    """Case-folded words joined by single spaces; ignores punctuation and spacing.
+
+    Content without any word characters (emoji, symbols) falls back to its
+    whitespace-collapsed text, so such posts are not all equal to each other.
+    """
+    folded = (content or "").casefold()
+    return " ".join(_WORD.findall(folded)) or " ".join(folded.split())
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(normalize_content(content).encode("utf-8")).hexdigest()
+
+
+def _shingles(content: str, size: int = 3) -> set:
+    words = normalize_content(content).split()
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(content: str) -> List[int]:
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "little")
+        for shingle in _shingles(content)
+    ]
+    if not hashes:
+        return [_MAX_HASH] * len(_PERMUTATIONS)
+    return [
+        min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+        for a, b in _PERMUTATIONS
+    ]
+
+
+def estimate_jaccard(signature: List[int], other: List[int]) -> float:
+    return sum(1 for x, y in zip(signature, other) if x == y) / len(signature)
+
+
+def _band_keys(signature: List[int]) -> List[tuple]:
+    rows = config.MINHASH_ROWS_PER_BAND
+    keys = []
+    for band in range(config.MINHASH_BANDS):
+        chunk = array("I", signature[band * rows:(band + 1) * rows]).tobytes()
+        keys.append((band, hashlib.blake2b(chunk, digest_size=8).hexdigest()))
+    return keys
+
+
+def _pack(signature: List[int]) -> bytes:
+    return array("I", signature).tobytes()
+
+
+def _unpack(blob: bytes) -> List[int]:
+    values = array("I")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+def find_duplicate(conn, content: str, threshold: Optional[float] = None) -> Optional[Dict]:
+    """Return the closest saved post that duplicates content, if any.
+
+    {'type': 'exact' | 'near', 'post_id': ..., 'similarity': ...}
+    """
+    row = conn.execute(
+        "SELECT id FROM posts WHERE content_hash = ?", (content_hash(content),)
+    ).fetchone()
+    if row:
+        return {'type': 'exact', 'post_id': row[0], 'similarity': 1.0}
+
+    if not _shingles(content):
+        return None  # empty content has no meaningful similarity
+
+    threshold = config.NEAR_DUPLICATE_THRESHOLD if threshold is None else threshold
+    signature = minhash_signature(content)
+    keys = _band_keys(signature)
+    clause = " OR ".join("(band = ? AND bucket = ?)" for _ in keys)
+    params = [value for key in keys for value in key]
+    candidates = conn.execute(f'''
+        SELECT DISTINCT m.post_id, m.signature
+        FROM post_minhash_bands b
+        JOIN post_minhash m ON m.post_id = b.post_id
+        WHERE {clause}
+    ''', params).fetchall()
+
+    best = None
+    for post_id, blob in candidates:
+        similarity = estimate_jaccard(signature, _unpack(blob))
+        if similarity >= threshold and (best is None or similarity > best['similarity']):
+            best = {'type': 'near', 'post_id': post_id, 'similarity': similarity}
+    return best
+
+
+def index_post(conn, post_id: int, content: str):
+    """Store a post's signature and LSH band buckets (call inside the insert transaction)"""
+    signature = minhash_signature(content)
+    conn.execute(
+        "INSERT OR REPLACE INTO post_minhash (post_id, signature) VALUES (?, ?)",
+        (post_id, _pack(signature)),
+    )
+    conn.execute("DELETE FROM post_minhash_bands WHERE post_id = ?", (post_id,))
+    if not _shingles(content):
+        return  # not bucketed, or every empty post would be a near duplicate of the others
+    conn.executemany(
+        "INSERT INTO post_minhash_bands (band, bucket, post_id) VALUES (?, ?, ?)",
+        [(band, bucket, post_id) for band, bucket in _band_keys(signature)],
+    )
+
+
+def store_post(conn, content: str, content_type: Optional[str] = None, topic: Optional[str] = None,
+               tone: Optional[str] = None, industry: Optional[str] = None, hashtags: str = "") -> int:
+    """Insert a post unless an exact duplicate exists; returns the post id (call inside a transaction)"""
+    digest = content_hash(content)
+    existing = conn.execute("SELECT id FROM posts WHERE content_hash = ?", (digest,)).fetchone()
+    if existing:
+        return existing[0]
+
+    cursor = conn.execute('''
+        INSERT INTO posts (content, content_type, topic, tone, industry, hashtags, content_hash)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (content, content_type, topic, tone, industry, hashtags, digest))
+    index_post(conn, cursor.lastrowid, content)
+    return cursor.lastrowid
+
+
+def create_dedup_tables(conn):
+    """Migration step: content_hash column, LSH tables and backfill of existing posts"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(posts)")]
+    if "content_hash" not in columns:
+        conn.execute("ALTER TABLE posts ADD COLUMN content_hash TEXT")
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS post_minhash (
+            post_id INTEGER PRIMARY KEY,
+            signature BLOB NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS post_minhash_bands (
+            band INTEGER NOT NULL,
+            bucket TEXT NOT NULL,
+            post_id INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket, post_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS posts_minhash_delete AFTER DELETE ON posts BEGIN
+            DELETE FROM post_minhash WHERE post_id = old.id;
+            DELETE FROM post_minhash_bands WHERE post_id = old.id;
+        END
+    ''')
+
+    # Existing duplicates keep a NULL hash so the unique index can be built without deleting posts
+    seen = set()
+    for post_id, content in conn.execute("SELECT id, content FROM posts ORDER BY id").fetchall():
+        digest = content_hash(content)
+        conn.execute(
+            "UPDATE posts SET content_hash = ? WHERE id = ?",
+            (None if digest in seen else digest, post_id),
+        )
+        seen.add(digest)
+        index_post(conn, post_id, content)
+
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_posts_content_hash ON posts (content_hash)")
+
+
+def rehash_wordless_posts(conn):
+    """Migration step: rehash posts that used to normalise to "" (and their NULL-hash twins)"""
+    empty = hashlib.sha256(b"").hexdigest()
+    rows = conn.execute(
+        "SELECT id, content FROM posts WHERE content_hash = ? OR content_hash IS NULL ORDER BY id", (empty,)
+    ).fetchall()
+    conn.execute("UPDATE posts SET content_hash = NULL WHERE content_hash = ?", (empty,))
+    for post_id, content in rows:
+        digest = content_hash(content)
+        taken = conn.execute("SELECT 1 FROM posts WHERE content_hash = ?", (digest,)).fetchone()
+        if not taken:
+            conn.execute("UPDATE posts SET content_hash = ? WHERE id = ?", (digest, post_id))
+        index_post(conn, post_id, content)
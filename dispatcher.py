@@ -0,0 +1,259 @@
+"""
+Background dispatcher for scheduled posts
+
+Pending rows of ``scheduled_posts`` are loaded once into a min-heap keyed on
+due time. The dispatcher thread sleeps until the earliest entry is due or a
+new one is added, so posts go out within a fraction of a second of their
+scheduled time without rescanning the table. Rows scheduled by other
+processes are picked up incrementally by id; each poll also reads the pending
+rows due before the next one (the status/time index), which catches retries
+and recovered jobs that went back to 'pending' under an old id.
+
+Any number of dispatcher processes can share the queue: claims are atomic,
+workers heartbeat through ``worker_registry`` and an elected leader reclaims
+the jobs of workers that die.
+
+Run it as a service with ``python dispatcher.py``.
+"""
+import heapq
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from database import get_connection
+from metrics_rollup import compact_rollups
+from publish_executor import PublishExecutor, platform_key
+from publish_queue import PublishQueue, worker_id
+from retry_policy import next_retry
+from worker_registry import LeaderElection, WorkerRegistry
+
+config = Config()
+
+_dispatchers: List["ScheduleDispatcher"] = []
+
+
+def _due_timestamp(value) -> float:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(str(value)).timestamp()
+
+
+def notify_scheduled(db_path: str, schedule_id: int, scheduled_time) -> None:
+    """Wake this process's dispatchers for db_path about a new or moved schedule"""
+    for dispatcher in list(_dispatchers):
+        if dispatcher.db_path == db_path:
+            dispatcher.add(schedule_id, scheduled_time)
+
+
+class ScheduleDispatcher:
+    """Publishes scheduled posts when they fall due"""
+
+    def __init__(self, db_path: Optional[str] = None,
+                 publish: Optional[Callable[..., Dict]] = None):
+        self.db_path = db_path or config.DB_PATH
+        self.queue = PublishQueue(self.db_path)
+        self.executor = PublishExecutor(self.queue, self.publish)
+        self.registry = WorkerRegistry(self.db_path)
+        self.election = LeaderElection(self.db_path)
+        self.worker = f"{worker_id()}:{uuid.uuid4().hex[:8]}"  # unique per dispatcher, even in one process
+        self.is_leader = False
+        self._last_sample = time.time()
+        self._publish = publish
+        self._heap: List[Tuple[float, int]] = []
+        self._queued: Dict[int, float] = {}  # schedule id -> due time of its live heap entry
+        self._last_id = 0
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._heap)
+
+    def publish(self, platform: str, content: str, media_urls: Optional[List[str]] = None) -> Dict:
+        if self._publish is None:
+            # Imported lazily: the platform clients are only needed once something is due
+            from api_integrations import SocialMediaAPIs
+            self._publish = SocialMediaAPIs().post_to_platform
+        return self._publish(platform, content, media_urls)
+
+    def load(self) -> int:
+        """Push pending rows scheduled since the last load, or due before the next one, onto the heap"""
+        horizon = datetime.now() + timedelta(seconds=2 * config.DISPATCHER_POLL_INTERVAL)
+        conn = get_connection(self.db_path)
+        rows = conn.execute('''
+            SELECT id, scheduled_time FROM scheduled_posts
+            WHERE id > ? AND status = 'pending'
+        ''', (self._last_id,)).fetchall()
+        # Retried, reset and reclaimed jobs keep their old ids
+        rows += conn.execute('''
+            SELECT id, scheduled_time FROM scheduled_posts
+            WHERE status = 'pending' AND scheduled_time < ?
+        ''', (horizon,)).fetchall()
+
+        added = 0
+        with self._condition:
+            for schedule_id, scheduled_time in rows:
+                added += self._push(schedule_id, scheduled_time)
+            if added:
+                self._condition.notify()
+        return added
+
+    def _push(self, schedule_id: int, scheduled_time) -> bool:
+        """Heap push unless an entry for the same due time is queued (hold the condition)"""
+        due = _due_timestamp(scheduled_time)
+        self._last_id = max(self._last_id, schedule_id)
+        if self._queued.get(schedule_id) == due:
+            return False
+        heapq.heappush(self._heap, (due, schedule_id))
+        self._queued[schedule_id] = due
+        return True
+
+    def add(self, schedule_id: int, scheduled_time) -> None:
+        """Queue one schedule (stale heap entries are skipped when popped)"""
+        with self._condition:
+            if self._push(schedule_id, scheduled_time):
+                self._condition.notify()
+
+    def _next_due(self, timeout: float) -> Optional[int]:
+        """Wait up to timeout for the earliest entry to fall due and pop it"""
+        deadline = time.time() + timeout
+        with self._condition:
+            while self._running:
+                now = time.time()
+                if self._heap and self._heap[0][0] <= now:
+                    due, schedule_id = heapq.heappop(self._heap)
+                    if self._queued.get(schedule_id) == due:
+                        del self._queued[schedule_id]
+                    return schedule_id
+                wake_at = min(self._heap[0][0], deadline) if self._heap else deadline
+                if wake_at <= now:
+                    return None
+                self._condition.wait(wake_at - now)
+        return None
+
+    def dispatch(self, schedule_id: int) -> Optional[Future]:
+        """Hand one due schedule to the publishing pools if it is still pending"""
+        row = get_connection(self.db_path).execute(
+            "SELECT scheduled_time FROM scheduled_posts WHERE id = ? AND status = 'pending'",
+            (schedule_id,)
+        ).fetchone()
+        if not row:
+            return None  # cancelled or already handled
+
+        if _due_timestamp(row[0]) > time.time():
+            self.add(schedule_id, row[0])  # rescheduled later since it was queued
+            return None
+
+        # Atomic claim: only one dispatcher process wins the job
+        job = self.queue.claim(schedule_id, self.worker)
+        if job is None:
+            return None
+
+        # Publish on the platform's pool so the timer loop never waits on an API call
+        future = self.executor.submit(job, job['lease_owner'])
+        future.add_done_callback(lambda done: self._requeue(job, done))
+        return future
+
+    def _requeue(self, job: Dict, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            # The executor swallows callback errors; release the job now rather than at lease expiry
+            print(f"Warning: publishing schedule {job['id']} failed: {e}")
+            try:
+                retry_at = next_retry(platform_key(job['platform']), {'success': False, 'error': str(e)},
+                                      job['attempts'])
+                status = self.queue.fail(job['id'], job['lease_owner'], f"[error] {e}", retry_at)
+            except Exception as e:
+                print(f"Warning: could not release schedule {job['id']}: {e}")
+                return
+            result = {'status': status, 'retry_at': retry_at}
+        if result.get('status') == 'pending':
+            self.add(job['id'], result['retry_at'])
+
+    def run(self):
+        """Dispatch in the calling thread until stop()"""
+        self._running = True
+        self._loop()
+
+    def maintain(self):
+        """Heartbeat, renew or contest leadership and, as leader, reclaim dead workers' jobs and fold rollups"""
+        self.registry.heartbeat(self.worker)
+        self.is_leader = self.election.acquire(self.worker)
+        if self.is_leader:
+            for schedule_id, scheduled_time in self.registry.reclaim_dead():
+                self.add(schedule_id, scheduled_time)
+            self.executor.ledger.reconcile()
+            compact_rollups(self.db_path)
+        if time.time() - self._last_sample >= config.SCHEDULER_METRICS_INTERVAL:
+            # Every worker reports its pools; the leader also samples the shared queue
+            self.executor.metrics.sample(self.worker, self.executor.utilisation(), queue_depth=self.is_leader)
+            self._last_sample = time.time()
+
+    def _active(self) -> bool:
+        return self.is_leader or not config.DISPATCHER_LEADER_ONLY
+
+    def _loop(self):
+        self.registry.register(self.worker)
+        self.maintain()
+        self.load()
+        last_load = last_heartbeat = time.time()
+        timeout = min(config.DISPATCHER_POLL_INTERVAL, config.WORKER_HEARTBEAT_INTERVAL)
+        while self._running:
+            if self._active():
+                schedule_id = self._next_due(timeout)
+            else:
+                schedule_id = None
+                with self._condition:
+                    self._condition.wait(timeout)  # standby: keep the heap warm for failover
+            if schedule_id is not None:
+                try:
+                    self.dispatch(schedule_id)
+                except Exception as e:
+                    print(f"Warning: dispatch of schedule {schedule_id} failed: {e}")
+            if time.time() - last_heartbeat >= config.WORKER_HEARTBEAT_INTERVAL:
+                try:
+                    self.maintain()
+                except Exception as e:
+                    print(f"Warning: dispatcher heartbeat failed: {e}")
+                last_heartbeat = time.time()
+            if time.time() - last_load >= config.DISPATCHER_POLL_INTERVAL:
+                self.load()
+                last_load = time.time()
+
+    def start(self) -> "ScheduleDispatcher":
+        """Run the dispatch loop in a daemon thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            _dispatchers.append(self)
+            self._thread = threading.Thread(target=self._loop, name="schedule-dispatcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self in _dispatchers:
+            _dispatchers.remove(self)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.executor.shutdown(wait=False)
+        # Jobs still in flight keep their leases until they expire or the new leader reclaims them
+        self.election.release(self.worker)
+        self.registry.unregister(self.worker)
+
+
+if __name__ == "__main__":
+    dispatcher = ScheduleDispatcher()
+    _dispatchers.append(dispatcher)
+    print(f"Dispatching scheduled posts from {dispatcher.db_path}")
+    try:
+        dispatcher.run()
+    except KeyboardInterrupt:
+        dispatcher.stop()
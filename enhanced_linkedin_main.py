@@ -6,16 +6,21 @@ import time
 import random
 from dataclasses import dataclass
 from typing import List, Dict, Optional
-import sqlite3
 from pathlib import Path
 import calendar
+from itertools import islice
 
 # Import existing modules
 from llm_helper import get_llm
 from post_generator import generate_post as original_generate_post
 from few_shot import FewShotPosts
 from config import Config
+from database import get_connection, transaction
+from dedup import find_duplicate, store_post
+from migrations import migrate
 from linkedin_scheduler import LinkedInScheduler, ContentCalendar, PerformanceTracker
+from publish_executor import platform_key
+from scheduler_metrics import SchedulerMetrics
 from linkedin_api_client import LinkedInAPIClient, LinkedInAuthManager, LINKEDIN_API_SETUP_INSTRUCTIONS
 
 # Enhanced LinkedIn configuration
@@ -72,7 +77,7 @@ class EnhancedLinkedInGenerator:
         self.llm = None
         self.few_shot = None
         self.init_ai_components()
-        self.db_path = "content_library.db"
+        self.db_path = Config.DB_PATH
         self.init_database()
         
     def init_ai_components(self):
@@ -88,55 +93,7 @@ class EnhancedLinkedInGenerator:
     
     def init_database(self):
         """Initialize SQLite database for content library"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create tables
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS posts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                content TEXT NOT NULL,
-                content_type TEXT,
-                topic TEXT,
-                tone TEXT,
-                industry TEXT,
-                hashtags TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                performance_score INTEGER DEFAULT 0,
-                is_published BOOLEAN DEFAULT FALSE,
-                scheduled_time TIMESTAMP,
-                engagement_data TEXT
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS analytics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                post_id INTEGER,
-                views INTEGER DEFAULT 0,
-                likes INTEGER DEFAULT 0,
-                comments INTEGER DEFAULT 0,
-                shares INTEGER DEFAULT 0,
-                clicks INTEGER DEFAULT 0,
-                date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (post_id) REFERENCES posts (id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_preferences (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT DEFAULT 'default',
-                writing_style TEXT,
-                preferred_topics TEXT,
-                brand_voice TEXT,
-                posting_schedule TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        migrate(self.db_path)
     
     def generate_ai_post(self, content_type: str, topic: str, length: str, tone: str, 
                         industry: str, custom_prompt: str = "", user_context: str = "") -> str:
@@ -167,7 +124,7 @@ class EnhancedLinkedInGenerator:
         examples = ""
         if self.few_shot:
             try:
-                example_posts = self.few_shot.get_filtered_posts(length.lower(), topic.lower())
+                example_posts = self.few_shot.get_ranked_posts(length, "English", topic, k=2)['posts']
                 if example_posts:
                     examples = "\n\nExample LinkedIn posts for reference:\n"
                     for i, post in enumerate(example_posts[:2], 1):
@@ -229,35 +186,51 @@ Generate a LinkedIn post that follows these guidelines and will perform well wit
     
     def save_post(self, content: str, content_type: str, topic: str, tone: str, 
                   industry: str, hashtags: str = "") -> int:
-        """Save post to content library"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO posts (content, content_type, topic, tone, industry, hashtags)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (content, content_type, topic, tone, industry, hashtags))
-        
-        post_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
-        
-        return post_id
+        """Save post to content library.
+
+        Re-saving the same content (ignoring case, spacing and punctuation)
+        returns the existing post id instead of adding a copy.
+        """
+        with transaction(self.db_path) as conn:
+            return store_post(conn, content, content_type, topic, tone, industry, hashtags)
+    
+    def find_duplicate(self, content: str) -> Optional[Dict]:
+        """Find a saved post that is an exact or near duplicate of content"""
+        return find_duplicate(get_connection(self.db_path), content)
     
     def get_saved_posts(self, limit: int = 10) -> List[Dict]:
         """Retrieve saved posts from library"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        return self.get_posts_page(page_size=limit)['posts']
+    
+    def get_posts_page(self, cursor: Optional[List] = None, filters: Optional[Dict] = None,
+                       page_size: int = 20) -> Dict:
+        """Fetch one page of saved posts, newest first, using keyset pagination.
+
+        cursor is the (created_at, id) of the last post on the previous page,
+        as returned in next_cursor; None starts from the newest post. Each page
+        is an index seek, so deep pages cost the same as the first one.
+        """
+        conditions, params = [], []
+        for column in ('topic', 'content_type', 'industry', 'is_published'):
+            value = (filters or {}).get(column)
+            if value is not None and value != "":
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if cursor:
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend(cursor)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        rows = get_connection(self.db_path).execute(f'''
             SELECT id, content, content_type, topic, created_at, performance_score
             FROM posts 
-            ORDER BY created_at DESC 
+            {where}
+            ORDER BY created_at DESC, id DESC 
             LIMIT ?
-        ''', (limit,))
+        ''', params + [page_size + 1]).fetchall()
         
         posts = []
-        for row in cursor.fetchall():
+        for row in rows[:page_size]:
             posts.append({
                 'id': row[0],
                 'content': row[1],
@@ -267,8 +240,71 @@ Generate a LinkedIn post that follows these guidelines and will perform well wit
                 'performance_score': row[5]
             })
         
-        conn.close()
-        return posts
+        next_cursor = None
+        if len(rows) > page_size:
+            next_cursor = [posts[-1]['created_at'], posts[-1]['id']]
+        
+        return {'posts': posts, 'next_cursor': next_cursor}
+    
+    def search_posts(self, query: str, filters: Optional[Dict] = None, limit: int = 20) -> List[Dict]:
+        """Full-text search over saved posts, best matches first.
+
+        filters may narrow by content_type, topic, industry and is_published.
+        Each result carries a highlighted snippet of the matching content.
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        
+        conditions, params = [], []
+        for column in ('content_type', 'topic', 'industry', 'is_published'):
+            value = (filters or {}).get(column)
+            if value is not None and value != "":
+                conditions.append(f"p.{column} = ?")
+                params.append(value)
+        where = "".join(f" AND {condition}" for condition in conditions)
+        
+        conn = get_connection(self.db_path)
+        has_fts = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posts_fts'"
+        ).fetchone()
+        
+        if has_fts:
+            # Quote every term so user input is never parsed as FTS syntax; prefix-match the last one
+            match = " ".join('"' + term.replace('"', '""') + '"' for term in terms) + "*"
+            cursor = conn.execute(f'''
+                SELECT p.id, p.content, p.content_type, p.topic, p.created_at, p.performance_score,
+                       snippet(posts_fts, 0, '**', '**', '…', 24) AS snippet
+                FROM posts_fts
+                JOIN posts p ON p.id = posts_fts.rowid
+                WHERE posts_fts MATCH ?{where}
+                ORDER BY bm25(posts_fts, 1.0, 2.0, 1.5)
+                LIMIT ?
+            ''', [match] + params + [limit])
+        else:
+            like_conditions = " AND ".join("(p.content LIKE ? OR p.topic LIKE ? OR p.hashtags LIKE ?)" for _ in terms)
+            like_params = [f"%{term}%" for term in terms for _ in range(3)]
+            cursor = conn.execute(f'''
+                SELECT p.id, p.content, p.content_type, p.topic, p.created_at, p.performance_score,
+                       substr(p.content, 1, 160) || CASE WHEN length(p.content) > 160 THEN '…' ELSE '' END AS snippet
+                FROM posts p
+                WHERE {like_conditions}{where}
+                ORDER BY p.created_at DESC
+                LIMIT ?
+            ''', like_params + params + [limit])
+        
+        return [
+            {
+                'id': row[0],
+                'content': row[1],
+                'content_type': row[2],
+                'topic': row[3],
+                'created_at': row[4],
+                'performance_score': row[5],
+                'snippet': row[6]
+            }
+            for row in cursor.fetchall()
+        ]
     
     def generate_variations(self, original_post: str, num_variations: int = 3) -> List[str]:
         """Generate variations of a post for A/B testing"""
@@ -585,11 +621,18 @@ def show_post_generator(generator, analytics):
     with col3:
         if st.button("💾 Save Post", use_container_width=True):
             if st.session_state.generated_post:
-                post_id = generator.save_post(
-                    st.session_state.generated_post, content_type, 
-                    topic, tone, industry
-                )
-                st.success(f"💾 Saved as Post #{post_id}")
+                duplicate = generator.find_duplicate(st.session_state.generated_post)
+                if duplicate and duplicate['type'] == 'exact':
+                    st.info(f"💾 Already in your library as Post #{duplicate['post_id']}")
+                else:
+                    post_id = generator.save_post(
+                        st.session_state.generated_post, content_type, 
+                        topic, tone, industry
+                    )
+                    st.success(f"💾 Saved as Post #{post_id}")
+                    if duplicate:
+                        st.warning(f"⚠️ Very similar to Post #{duplicate['post_id']} "
+                                   f"({duplicate['similarity']:.0%} overlap)")
     
     with col4:
         if st.button("📤 Schedule", use_container_width=True):
@@ -674,14 +717,50 @@ def show_content_library(generator):
     """Content library interface"""
     st.title("📚 Content Library")
     
-    # Saved posts
-    saved_posts = generator.get_saved_posts(20)
+    # Search and filters
+    col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+    with col1:
+        search_query = st.text_input("🔍 Search your library", placeholder="e.g. remote work leadership")
+    with col2:
+        search_type = st.selectbox("📝 Content Type", ["All"] + config.CONTENT_TYPES, key="library_search_type")
+    with col3:
+        search_industry = st.selectbox("🏢 Industry", ["All"] + config.INDUSTRIES, key="library_search_industry")
+    with col4:
+        published_only = st.checkbox("✅ Published only", key="library_published_only")
+    
+    filters = {}
+    if search_type != "All":
+        filters['content_type'] = search_type
+    if search_industry != "All":
+        filters['industry'] = search_industry
+    if published_only:
+        filters['is_published'] = True
+    
+    has_more = False
+    if search_query.strip():
+        saved_posts = generator.search_posts(search_query, filters, limit=20)
+        heading = f"### 🔍 Search Results ({len(saved_posts)})"
+    else:
+        # Keep loaded pages across reruns; start over when the filters or newest post change
+        first_page = generator.get_posts_page(filters=filters, page_size=20)
+        newest_id = first_page['posts'][0]['id'] if first_page['posts'] else None
+        if (st.session_state.get('library_filters') != filters or
+                st.session_state.get('library_newest_id') != newest_id):
+            st.session_state.library_filters = filters
+            st.session_state.library_newest_id = newest_id
+            st.session_state.library_posts = first_page['posts']
+            st.session_state.library_cursor = first_page['next_cursor']
+        saved_posts = st.session_state.library_posts
+        has_more = st.session_state.library_cursor is not None
+        heading = f"### 📄 Recent Posts ({len(saved_posts)}{'+' if has_more else ''})"
     
     if saved_posts:
-        st.markdown(f"### 📄 Recent Posts ({len(saved_posts)})")
+        st.markdown(heading)
         
         for post in saved_posts:
             with st.expander(f"{post['content_type']} - {post['topic']} ({post['created_at'][:10]})"):
+                if post.get('snippet'):
+                    st.markdown(post['snippet'])
                 st.text_area("", post['content'], height=100, key=f"saved_{post['id']}")
                 
                 col1, col2, col3 = st.columns(3)
@@ -694,6 +773,16 @@ def show_content_library(generator):
                 with col3:
                     if st.button("🗑️ Delete", key=f"delete_{post['id']}"):
                         st.warning("🗑️ Delete functionality coming soon!")
+        
+        if has_more and st.button("⬇️ Load more", use_container_width=True):
+            next_page = generator.get_posts_page(
+                cursor=st.session_state.library_cursor, filters=filters, page_size=20
+            )
+            st.session_state.library_posts = saved_posts + next_page['posts']
+            st.session_state.library_cursor = next_page['next_cursor']
+            st.rerun()
+    elif search_query.strip():
+        st.info("🔍 No saved posts match your search.")
     else:
         st.info("📝 No saved posts yet. Generate and save some content to build your library!")
 
@@ -796,7 +885,8 @@ def show_content_calendar(generator):
                             st.success("🚀 Publishing functionality coming soon!")
                     with col3:
                         if st.button("🗑️ Delete", key=f"delete_{post['schedule_id']}"):
-                            st.warning("🗑️ Delete functionality coming soon!")
+                            if scheduler.cancel_scheduled_post(post['schedule_id']):
+                                st.warning("🗑️ Scheduled post cancelled")
         else:
             st.info("📝 No scheduled posts. Use the Schedule tab to plan your content!")
     
@@ -853,12 +943,12 @@ def show_content_calendar(generator):
         st.markdown("### 🔍 Content Gap Analysis")
         
         # Get content gaps
-        gaps = content_calendar.suggest_content_gaps(30)
+        gaps = list(islice(content_calendar.suggest_content_gaps(30), 10))
         
         if gaps:
             st.markdown(f"### 📊 Found {len(gaps)} content opportunities in the next 30 days:")
             
-            for gap in gaps[:10]:
+            for gap in gaps:
                 with st.expander(f"📅 {gap['date'].strftime('%A, %B %d')} - {gap['optimal_time']}"):
                     st.markdown(f"**Suggested Content:** {gap['suggested_content']}")
                     st.markdown(f"**Optimal Time:** {gap['optimal_time']}")
@@ -894,6 +984,61 @@ def show_content_calendar(generator):
         with col4:
             st.metric("Avg Likes", f"{performance_summary['avg_likes']:.0f}")
         
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Median Views", f"{performance_summary['median_views']:.0f}")
+        with col2:
+            st.metric("P90 Views", f"{performance_summary['p90_views']:.0f}")
+        with col3:
+            st.metric("Median Engagement", f"{performance_summary['median_engagement_rate']:.1f}%")
+        with col4:
+            st.metric("P90 Engagement", f"{performance_summary['p90_engagement_rate']:.1f}%")
+        
+        # Top posts
+        top_posts = performance_tracker.get_top_posts('shares', days=30, limit=5)
+        if top_posts:
+            st.markdown("### 🏆 Most Shared Posts (30 days)")
+            for post in top_posts:
+                st.markdown(f"• **Post #{post['post_id']}** ({post['content_type']}) - {post['shares']} shares: {post['content']}")
+        
+        # Scheduler lag and throughput
+        scheduler_report = SchedulerMetrics(scheduler.db_path).report(7)
+        if scheduler_report['published'] or scheduler_report['outcomes'] or scheduler_report['queue_depth']:
+            st.markdown("### ⏱️ Scheduler Performance (7 days)")
+            lag = scheduler_report['lag']
+            
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.metric("Published", scheduler_report['published'])
+            with col2:
+                st.metric("On Time (< 1 min)", f"{lag['on_time']:.0%}")
+            with col3:
+                st.metric("Median Lag", f"{lag['p50']:.1f}s")
+            with col4:
+                st.metric("P90 Lag", f"{lag['p90']:.1f}s")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("**Scheduled vs. actual publish time**")
+                st.bar_chart(lag['histogram'])
+            with col2:
+                if scheduler_report['queue_depth']:
+                    st.markdown("**Queue depth**")
+                    st.line_chart({
+                        'pending': [sample['pending'] for sample in scheduler_report['queue_depth']],
+                        'due': [sample['due'] for sample in scheduler_report['queue_depth']]
+                    })
+            
+            for platform, latency in scheduler_report['latency'].items():
+                utilization = scheduler_report['utilization'].get(platform_key(platform))
+                utilization_text = f", {utilization:.0%} worker utilisation" if utilization is not None else ""
+                st.markdown(f"• **{platform}:** {latency['calls']} calls, {latency['avg']:.2f}s avg / "
+                            f"{latency['p90']:.2f}s p90 latency{utilization_text}")
+            
+            retried = sum(count for attempts, count in scheduler_report['attempts'].items() if attempts > 1)
+            dead_letters = scheduler_report['outcomes'].get('dead_letter', 0)
+            st.markdown(f"• **Retries:** {retried} posts needed more than one attempt, {dead_letters} dead-lettered")
+        
         # AI Insights
         st.markdown("### 🤖 AI-Powered Insights")
         
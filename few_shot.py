@@ -1,5 +1,12 @@
+import hashlib
 import json
+import os
+import threading
+import time
+from collections import Counter
+from itertools import combinations
 from config import Config
+from corpus_store import CorpusStore, CorpusStoreError, read_store_digest, write_corpus_store
 
 config = Config()
 
@@ -11,90 +18,480 @@ except ImportError:
     PANDAS_AVAILABLE = False
     print("Warning: pandas not available, using basic JSON processing")
 
+
+# Length buckets tried when an exact length has no examples
+ADJACENT_LENGTHS = {
+    "Short": ["Medium"],
+    "Medium": ["Short", "Long"],
+    "Long": ["Medium"],
+}
+
+
+def categorize_length(line_count):
+    """Categorize post length based on line count"""
+    if line_count < 5:
+        return "Short"
+    elif 5 <= line_count <= 10:
+        return "Medium"
+    else:
+        return "Long"
+
+
+def _canonical_tag(tag):
+    return " ".join(str(tag).split()).casefold()
+
+
+def load_tag_aliases(file_path=None):
+    """Load the original -> unified tag mapping written by preprocess"""
+    if file_path is None:
+        file_path = config.TAG_ALIASES_PATH
+    try:
+        with open(file_path, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+class TagStats:
+    """Tag counts, co-occurrence and per-language/per-length breakdowns.
+
+    Maintained in a single pass over added/removed posts, so a reload costs
+    O(changed posts) rather than a rescan of the whole corpus.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.co_occurrence = Counter()      # (tag_a, tag_b) sorted pair -> count
+        self.by_language = {}               # language -> Counter of tags
+        self.by_length = {}                 # length bucket -> Counter of tags
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.counts = Counter(data.get('counts', {}))
+        stats.co_occurrence = Counter({
+            tuple(item['tags']): item['count'] for item in data.get('co_occurrence', [])
+        })
+        stats.by_language = {key: Counter(value) for key, value in data.get('by_language', {}).items()}
+        stats.by_length = {key: Counter(value) for key, value in data.get('by_length', {}).items()}
+        return stats
+
+    def copy(self):
+        stats = TagStats()
+        stats.counts = self.counts.copy()
+        stats.co_occurrence = self.co_occurrence.copy()
+        stats.by_language = {key: counter.copy() for key, counter in self.by_language.items()}
+        stats.by_length = {key: counter.copy() for key, counter in self.by_length.items()}
+        return stats
+
+    def add(self, post, delta=1):
+        tags = sorted(set(post.get('tags', [])))
+        language_counts = self.by_language.setdefault(post.get('language'), Counter())
+        length_counts = self.by_length.setdefault(post['length'], Counter())
+        for counter in (self.counts, language_counts, length_counts):
+            _bump(counter, tags, delta)
+        _bump(self.co_occurrence, combinations(tags, 2), delta)
+
+    def remove(self, post):
+        self.add(post, delta=-1)
+
+    def to_dict(self):
+        return {
+            'counts': dict(self.counts),
+            'co_occurrence': [
+                {'tags': list(pair), 'count': count}
+                for pair, count in sorted(self.co_occurrence.items(), key=lambda item: (-item[1], item[0]))
+            ],
+            'by_language': {key: dict(counter) for key, counter in self.by_language.items() if counter},
+            'by_length': {key: dict(counter) for key, counter in self.by_length.items() if counter},
+        }
+
+
+def _bump(counter, keys, delta):
+    if delta > 0:
+        counter.update(keys)  # counted in C; only removals can drop a key
+        return
+    for key in keys:
+        counter[key] += delta
+        if counter[key] <= 0:
+            del counter[key]
+
+
+class CorpusSnapshot:
+    """Immutable view of the few-shot corpus and its inverted indexes.
+
+    Snapshots are never mutated once published; reloads build a new snapshot
+    that shares every untouched index bucket with its predecessor.
+    """
+
+    def __init__(self, digest=None, posts=None, keys=None, tag_index=None,
+                 language_index=None, length_index=None, next_id=0, aliases=None,
+                 tag_stats=None, store=None):
+        self.digest = digest
+        self.posts = posts or {}                    # post id -> post dict
+        self.keys = keys or {}                      # position in the file -> post id
+        self.tag_index = tag_index or {}            # tag -> frozenset of post ids
+        self.language_index = language_index or {}
+        self.length_index = length_index or {}
+        self.next_id = next_id
+        self.aliases = aliases or {}                # original tag -> unified tag
+        self.tag_stats = tag_stats or TagStats()
+        self.store = store                          # CorpusStore when memory-mapped
+        self.canonical_tags = None                  # built lazily by FewShotPosts
+        self._df = None
+
+    def __len__(self):
+        return len(self.posts)
+
+    @classmethod
+    def from_store(cls, store, aliases=None):
+        """Wrap a memory-mapped store; indexes and texts stay in the map"""
+        return cls(
+            digest=store.digest,
+            posts=store.posts,
+            tag_index=store.tag_index,
+            language_index=store.language_index,
+            length_index=store.length_index,
+            next_id=len(store),
+            aliases=aliases,
+            tag_stats=TagStats.from_dict(store.tag_stats),
+            store=store,
+        )
+
+    def records(self, ids):
+        """Return posts for the given ids in corpus order"""
+        return [self.posts[post_id] for post_id in sorted(ids)]
+
+    def meta(self, post_id):
+        """Post fields needed for ranking, without paging in mapped text"""
+        if self.store is not None:
+            return self.store.meta(post_id)
+        return self.posts[post_id]
+
+    def to_dataframe(self):
+        """Materialise the snapshot as a DataFrame (cached per snapshot)"""
+        if self._df is None:
+            self._df = pd.DataFrame(self.records(self.posts.keys()))
+        return self._df
+
+
+def _unchanged(stored, post):
+    """Whether a loaded post (plus its derived 'length') still matches the file's post"""
+    return len(stored) - len(post) <= 1 and all(stored.get(key, stored) == value for key, value in post.items())
+
+
+def _update_index(index, changes):
+    """Copy-on-write update of an inverted index.
+
+    ``changes`` maps bucket -> (ids to add, ids to remove). Buckets that are not
+    touched keep pointing at the previous snapshot's frozensets.
+    """
+    updated = dict(index)
+    for bucket, (added, removed) in changes.items():
+        ids = set(updated.get(bucket, ()))
+        ids.difference_update(removed)
+        ids.update(added)
+        if ids:
+            updated[bucket] = frozenset(ids)
+        else:
+            updated.pop(bucket, None)
+    return updated
+
+
 class FewShotPosts:
+    # Minimum seconds between corpus file checks on the request path
+    reload_interval = config.CORPUS_RELOAD_INTERVAL
+
     def __init__(self, file_path=None):
         if file_path is None:
-            file_path = config.PROCESSED_POSTS_PATH
-        self.df = None
-        self.unique_tags = None
+            # Prefer the memory-mapped store when one has been built
+            if os.path.exists(config.CORPUS_STORE_PATH):
+                file_path = config.CORPUS_STORE_PATH
+            else:
+                file_path = config.PROCESSED_POSTS_PATH
+        self.file_path = file_path
+        self._snapshot = CorpusSnapshot()
+        self._reload_lock = threading.Lock()
+        self._last_check = 0.0
+        self._file_signature = None
         self.load_posts(file_path)
 
+    @property
+    def snapshot(self):
+        """Current corpus snapshot; callers should read it once per request"""
+        return self._snapshot
+
+    @property
+    def df(self):
+        if not PANDAS_AVAILABLE:
+            return None
+        return self._snapshot.to_dataframe()
+
+    @property
+    def posts_data(self):
+        snapshot = self._snapshot
+        return snapshot.records(snapshot.posts.keys())
+
+    @property
+    def unique_tags(self):
+        return list(self._snapshot.tag_index.keys())
+
     def load_posts(self, file_path):
         """Load and process posts from JSON file"""
+        self.file_path = file_path
+        with self._reload_lock:
+            self._snapshot = CorpusSnapshot()
+            self._refresh_locked(force=True)
+
+    def refresh(self, force=False):
+        """Re-read the corpus file if it changed and swap in the new snapshot.
+
+        Returns True when a new snapshot was published.
+        """
+        with self._reload_lock:
+            return self._refresh_locked(force)
+
+    def _maybe_refresh(self):
+        """Cheap, throttled change check used on the request path"""
+        now = time.monotonic()
+        if now - self._last_check < self.reload_interval:
+            return
+        if self._reload_lock.acquire(blocking=False):
+            try:
+                self._refresh_locked(force=False)
+            finally:
+                self._reload_lock.release()
+
+    def _refresh_locked(self, force):
+        self._last_check = time.monotonic()
+        current = self._snapshot
+
         try:
-            with open(file_path, encoding="utf-8") as f:
-                posts = json.load(f)
-                
-                if PANDAS_AVAILABLE:
-                    self.df = pd.json_normalize(posts)
-                    self.df['length'] = self.df['line_count'].apply(self.categorize_length)
-                    # collect unique tags
-                    all_tags = self.df['tags'].apply(lambda x: x).sum()
-                    self.unique_tags = list(set(all_tags))
-                else:
-                    # Fallback to basic processing without pandas
-                    self.posts_data = posts
-                    self.df = None
-                    # Process posts manually
-                    for post in posts:
-                        post['length'] = self.categorize_length(post.get('line_count', 0))
-                    
-                    # collect unique tags
-                    all_tags = []
-                    for post in posts:
-                        all_tags.extend(post.get('tags', []))
-                    self.unique_tags = list(set(all_tags))
-                    
+            stat = os.stat(self.file_path)
         except FileNotFoundError:
-            print(f"Warning: Could not find {file_path}. Using empty dataset.")
-            if PANDAS_AVAILABLE:
-                self.df = pd.DataFrame()
-            else:
-                self.posts_data = []
-                self.df = None
-            self.unique_tags = []
+            if self._file_signature is not None or force:
+                print(f"Warning: Could not find {self.file_path}. Using empty dataset.")
+                self._file_signature = None
+                self._snapshot = CorpusSnapshot()
+                return True
+            return False
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if not force and signature == self._file_signature:
+            return False
+        self._file_signature = signature
+
+        if _is_store_path(self.file_path):
+            return self._refresh_store(current)
+
+        with open(self.file_path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        if digest == current.digest:
+            # Touched but unchanged, keep serving the current snapshot
+            return False
+
+        try:
+            posts = json.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            print(f"Warning: Could not parse {self.file_path} ({e}). Keeping previous corpus.")
+            return False
+
+        self._snapshot = self._apply_changes(current, posts, digest)
+        return True
+
+    def _refresh_store(self, current):
+        """Re-map a rewritten store; the previous map stays valid for in-flight readers"""
+        try:
+            if read_store_digest(self.file_path) == current.digest:
+                return False
+            store = CorpusStore(self.file_path)
+        except CorpusStoreError as e:
+            print(f"Warning: Could not open {self.file_path} ({e}). Keeping previous corpus.")
+            return False
+
+        self._snapshot = CorpusSnapshot.from_store(store, aliases=load_tag_aliases())
+        return True
+
+    def _apply_changes(self, current, posts, digest):
+        """Build the next snapshot by appending new posts and retracting removed ones.
+
+        Posts are keyed by their position in the file and compared with the
+        loaded post at that position, so an appended file only adds its tail
+        and a first load does no per-post key work at all.
+        """
+        incoming = dict(enumerate(posts))
+        removed_keys = [
+            key for key, post_id in current.keys.items()
+            if key not in incoming or not _unchanged(current.posts[post_id], incoming[key])
+        ]
+
+        new_posts = dict(current.posts)
+        new_keys = dict(current.keys)
+        tag_stats = current.tag_stats.copy()
+        tag_changes, language_changes, length_changes = {}, {}, {}
+
+        def track(changes, bucket, post_id, slot):
+            changes.setdefault(bucket, (set(), set()))[slot].add(post_id)
+
+        for key in removed_keys:
+            post_id = new_keys.pop(key)
+            post = new_posts.pop(post_id)
+            tag_stats.remove(post)
+            for tag in post.get('tags', []):
+                track(tag_changes, tag, post_id, 1)
+            track(language_changes, post.get('language'), post_id, 1)
+            track(length_changes, post['length'], post_id, 1)
+
+        next_id = current.next_id
+        for key, post in incoming.items():
+            if key in new_keys:
+                continue
+            post_id = next_id
+            next_id += 1
+            post['length'] = categorize_length(post.get('line_count', 0))
+            new_posts[post_id] = post
+            new_keys[key] = post_id
+            tag_stats.add(post)
+            for tag in post.get('tags', []):
+                track(tag_changes, tag, post_id, 0)
+            track(language_changes, post.get('language'), post_id, 0)
+            track(length_changes, post['length'], post_id, 0)
+
+        return CorpusSnapshot(
+            digest=digest,
+            posts=new_posts,
+            keys=new_keys,
+            tag_index=_update_index(current.tag_index, tag_changes),
+            language_index=_update_index(current.language_index, language_changes),
+            length_index=_update_index(current.length_index, length_changes),
+            next_id=next_id,
+            aliases=load_tag_aliases(),
+            tag_stats=tag_stats,
+        )
 
     def get_filtered_posts(self, length, language, tag):
         """Filter posts based on length, language, and tag"""
-        if PANDAS_AVAILABLE and self.df is not None:
-            if self.df.empty:
-                return []
-                
-            df_filtered = self.df[
-                (self.df['tags'].apply(lambda tags: tag in tags)) &
-                (self.df['language'] == language) &
-                (self.df['length'] == length)
-            ]
-            return df_filtered.to_dict(orient='records')
-        else:
-            # Fallback manual filtering
-            if not hasattr(self, 'posts_data') or not self.posts_data:
-                return []
-                
-            filtered_posts = []
-            for post in self.posts_data:
-                if (tag in post.get('tags', []) and 
-                    post.get('language') == language and 
-                    post.get('length') == length):
-                    filtered_posts.append(post)
-            return filtered_posts
+        self._maybe_refresh()
+        snapshot = self._snapshot
+        return snapshot.records(self._match(snapshot, [tag], [language], [length]))
+
+    def get_ranked_posts(self, length, language, tag, k=2):
+        """Return up to k examples, relaxing the query until something matches.
+
+        The ladder is: exact match, adjacent length buckets, any language,
+        then other tags sharing the same canonical tag. The result records
+        which level matched (None when the corpus has nothing relevant).
+        """
+        self._maybe_refresh()
+        snapshot = self._snapshot
+
+        lengths = [length] + ADJACENT_LENGTHS.get(length, [])
+        alias_tags = [t for t in self._tag_aliases(snapshot, tag) if t != tag]
+        ladder = [
+            ("exact", [tag], [language], [length]),
+            ("adjacent_length", [tag], [language], lengths),
+            ("any_language", [tag], None, lengths),
+            ("tag_alias", alias_tags, None, lengths),
+        ]
+
+        for level, tags, languages, level_lengths in ladder:
+            matches = self._match(snapshot, tags, languages, level_lengths)
+            if matches:
+                def rank(post_id):
+                    post = snapshot.meta(post_id)
+                    return (post['length'] != length,
+                            post.get('language') != language,
+                            -post.get('engagement', 0),
+                            post_id)
+
+                best = sorted(matches, key=rank)[:k]
+                return {'posts': [snapshot.posts[post_id] for post_id in best],
+                        'level': level, 'candidates': len(matches)}
+
+        return {'posts': [], 'level': None, 'candidates': 0}
+
+    def _match(self, snapshot, tags, languages, lengths):
+        """Intersect the union of index buckets for each dimension (None = any)"""
+        dimensions = [
+            (snapshot.tag_index, tags),
+            (snapshot.language_index, languages),
+            (snapshot.length_index, lengths),
+        ]
+        buckets = []
+        for index, values in dimensions:
+            if values is None:
+                continue
+            sets = [index[value] for value in values if value in index]
+            if not sets:
+                return frozenset()
+            buckets.append(sets[0] if len(sets) == 1 else frozenset().union(*sets))
+
+        if not buckets:
+            return frozenset(snapshot.posts)
+        buckets.sort(key=len)
+        return buckets[0].intersection(*buckets[1:])
+
+    def _tag_aliases(self, snapshot, tag):
+        """Tags in the corpus that share the canonical form of ``tag``"""
+        if snapshot.canonical_tags is None:
+            groups = {}
+            for corpus_tag in snapshot.tag_index:
+                canonical = _canonical_tag(snapshot.aliases.get(corpus_tag, corpus_tag))
+                groups.setdefault(canonical, []).append(corpus_tag)
+            snapshot.canonical_tags = groups
+        canonical = _canonical_tag(snapshot.aliases.get(tag, tag))
+        return snapshot.canonical_tags.get(canonical, [])
 
     def categorize_length(self, line_count):
         """Categorize post length based on line count"""
-        if line_count < 5:
-            return "Short"
-        elif 5 <= line_count <= 10:
-            return "Medium"
-        else:
-            return "Long"
+        return categorize_length(line_count)
+
+    def get_tags(self, sort_by=None):
+        """Get list of unique tags from the dataset.
+
+        sort_by: None (corpus order), 'frequency' (most used first) or 'name'.
+        """
+        self._maybe_refresh()
+        counts = self._snapshot.tag_stats.counts
+        if not counts:
+            return ["General", "Technology", "Career", "Business"]
+
+        if sort_by == 'frequency':
+            return sorted(counts, key=lambda tag: (-counts[tag], tag))
+        if sort_by == 'name':
+            return sorted(counts)
+        return self.unique_tags
+
+    def get_tag_stats(self):
+        """Get tag counts, co-occurrence and per-language/per-length breakdowns"""
+        self._maybe_refresh()
+        return self._snapshot.tag_stats.to_dict()
+
+
+def _is_store_path(file_path):
+    return str(file_path).endswith(config.CORPUS_STORE_SUFFIX)
+
+
+def build_corpus_store(json_path=None, store_path=None):
+    """Convert the processed JSON corpus into a memory-mapped corpus store"""
+    json_path = json_path or config.PROCESSED_POSTS_PATH
+    store_path = store_path or config.CORPUS_STORE_PATH
+
+    with open(json_path, encoding="utf-8") as f:
+        posts = json.load(f)
+
+    tag_stats = TagStats()
+    for post in posts:
+        post['length'] = categorize_length(post.get('line_count', 0))
+        tag_stats.add(post)
 
-    def get_tags(self):
-        """Get list of unique tags from the dataset"""
-        return self.unique_tags if self.unique_tags else ["General", "Technology", "Career", "Business"]
+    write_corpus_store(posts, store_path, tag_stats=tag_stats.to_dict())
+    return store_path
 
 
 if __name__ == "__main__":
     fs = FewShotPosts()
     # print(fs.get_tags())
     posts = fs.get_filtered_posts("Medium","Hinglish","Job Search")
-    print(posts)
\ No newline at end of file
+    print(posts)
@@ -1,50 +1,87 @@
-import sqlite3
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, List, Dict, Optional, Sequence, Tuple
 import json
+import sqlite3
+import threading
 import time
 
+from config import Config
+from content_gaps import iter_gaps
+from database import get_connection, transaction
+from dispatcher import notify_scheduled
+from metrics_rollup import refresh_dirty_rollups, window_summary
+from migrations import migrate
+from posting_times import DAYS, PostingTimeOptimizer, assign_slots
+from publish_queue import PublishQueue
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+config = Config()
+
+# (db_path, year, month) -> (loaded_at, calendar_data), shared by every calendar in the process
+_calendar_cache: Dict[Tuple, Tuple[float, Dict]] = {}
+_calendar_generation = 0
+_calendar_lock = threading.Lock()
+
+
+def _engagement_rates(views, likes, comments, shares) -> List[float]:
+    """(likes + comments + shares) / views * 100 per row, 0 where there are no views"""
+    if NUMPY_AVAILABLE:
+        views = np.asarray(views, dtype=float)
+        engaged = np.asarray(likes, dtype=float) + np.asarray(comments, dtype=float) + np.asarray(shares, dtype=float)
+        rates = np.divide(engaged * 100, views, out=np.zeros_like(views), where=views > 0)
+        return rates.tolist()
+    return [
+        (l + c + s) / v * 100 if v > 0 else 0.0
+        for v, l, c, s in zip(views, likes, comments, shares)
+    ]
+
+
+def _metric_date(value) -> Optional[str]:
+    """Day of a metrics row as YYYY-MM-DD, so (post_id, metric_date) stays one row per day"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return datetime.fromisoformat(str(value)).date().isoformat()
+
+
+def _format_hour(hour: int) -> str:
+    return f"{hour % 12 or 12}:00 {'AM' if hour < 12 else 'PM'}"
+
+
+def _shift_month(year: int, month: int, delta: int) -> Tuple[int, int]:
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+def invalidate_calendar_month(db_path: str, when) -> None:
+    """Drop the cached calendar month containing when (a datetime or ISO string)"""
+    global _calendar_generation
+    if isinstance(when, str):
+        when = datetime.fromisoformat(when)
+    with _calendar_lock:
+        _calendar_cache.pop((db_path, when.year, when.month), None)
+        _calendar_generation += 1
+
 class LinkedInScheduler:
     """Advanced content scheduling system for LinkedIn posts"""
     
     def __init__(self, db_path: str = "content_library.db"):
         self.db_path = db_path
         self.init_scheduler_tables()
+        self.queue = PublishQueue(db_path)
+        self.optimizer = PostingTimeOptimizer(db_path)
     
     def init_scheduler_tables(self):
         """Initialize scheduler database tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS scheduled_posts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                post_id INTEGER,
-                scheduled_time TIMESTAMP NOT NULL,
-                status TEXT DEFAULT 'pending',
-                platform TEXT DEFAULT 'linkedin',
-                auto_hashtags BOOLEAN DEFAULT TRUE,
-                optimal_time_adjusted BOOLEAN DEFAULT FALSE,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                published_at TIMESTAMP,
-                error_message TEXT,
-                FOREIGN KEY (post_id) REFERENCES posts (id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS posting_schedule (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                day_of_week INTEGER,
-                time_slot TEXT,
-                frequency TEXT DEFAULT 'weekly',
-                is_active BOOLEAN DEFAULT TRUE,
-                performance_score REAL DEFAULT 0.0
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        migrate(self.db_path)
     
     def schedule_post(self, post_id: int, scheduled_time: datetime, 
                      auto_optimize: bool = True) -> int:
@@ -54,28 +91,79 @@ class LinkedInScheduler:
         if auto_optimize:
             scheduled_time = self._optimize_posting_time(scheduled_time)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO scheduled_posts (post_id, scheduled_time, optimal_time_adjusted)
-            VALUES (?, ?, ?)
-        ''', (post_id, scheduled_time, auto_optimize))
-        
-        schedule_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        schedule_id = self.queue.enqueue(post_id, scheduled_time, optimal_time_adjusted=auto_optimize)
         
+        invalidate_calendar_month(self.db_path, scheduled_time)
+        notify_scheduled(self.db_path, schedule_id, scheduled_time)
         return schedule_id
     
+    def schedule_batch(self, post_ids: List[int], start: Optional[datetime] = None,
+                       end: Optional[datetime] = None, min_spacing_hours: Optional[float] = None,
+                       max_per_day: Optional[int] = None, blackout_days: Iterable = ()) -> List[Dict]:
+        """Schedule many posts at once, spreading them over the best free slots.
+
+        Slots are assigned globally (see posting_times.assign_slots) around the
+        posts already pending, then written in one transaction. Posts keep their
+        order: the first post gets the earliest slot. Without an end the horizon
+        is the fewest days with room for every post (so posts are not spread
+        thinly over the future); with one, a ValueError is raised if they don't fit.
+        """
+        if not post_ids:
+            return []
+        start = start or datetime.now()
+        spacing = timedelta(hours=config.BATCH_MIN_SPACING_HOURS if min_spacing_hours is None else min_spacing_hours)
+        max_per_day = max_per_day or config.BATCH_MAX_POSTS_PER_DAY
+        blackout_days = list(blackout_days)
+        scores = self.optimizer.model()['scores']
+
+        blackout_weekdays = {day for day in blackout_days if isinstance(day, int)}
+        open_days = 7 - len(blackout_weekdays & set(range(7)))
+        if not open_days:
+            raise ValueError("Every weekday is blacked out")
+        days = -(-len(post_ids) * 7 // (max_per_day * open_days))
+        while True:
+            horizon = end or start + timedelta(days=days)
+            taken = [
+                datetime.fromisoformat(str(row[0]))
+                for row in get_connection(self.db_path).execute('''
+                    SELECT scheduled_time FROM scheduled_posts
+                    WHERE status IN ('pending', 'publishing') AND scheduled_time >= ? AND scheduled_time < ?
+                ''', (start - spacing, horizon + spacing))
+            ]
+            slots = assign_slots(scores, len(post_ids), start, horizon, taken,
+                                 spacing, max_per_day, blackout_days)
+            if len(slots) == len(post_ids):
+                break
+            if end is not None or days > 3660:
+                raise ValueError(f"Only {len(slots)} of {len(post_ids)} posts fit the scheduling constraints")
+            days += max(days // 10, 1)
+
+        schedule_ids = self.queue.enqueue_many(list(zip(post_ids, slots)), optimal_time_adjusted=True)
+
+        for month in {(slot.year, slot.month) for slot in slots}:
+            invalidate_calendar_month(self.db_path, datetime(*month, 1))
+        for schedule_id, slot in zip(schedule_ids, slots):
+            notify_scheduled(self.db_path, schedule_id, slot)
+
+        return [
+            {'schedule_id': schedule_id, 'post_id': post_id, 'scheduled_time': slot}
+            for schedule_id, post_id, slot in zip(schedule_ids, post_ids, slots)
+        ]
+    
+    def cancel_scheduled_post(self, schedule_id: int) -> bool:
+        """Cancel a pending scheduled post"""
+        job = self.queue.cancel(schedule_id)
+        if job is None:
+            return False
+        
+        invalidate_calendar_month(self.db_path, job['scheduled_time'])
+        return True
+    
     def get_scheduled_posts(self, days_ahead: int = 7) -> List[Dict]:
         """Get posts scheduled for the next N days"""
         end_date = datetime.now() + timedelta(days=days_ahead)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        cursor = get_connection(self.db_path).execute('''
             SELECT sp.id, sp.post_id, sp.scheduled_time, sp.status, 
                    p.content, p.content_type, p.topic
             FROM scheduled_posts sp
@@ -96,46 +184,23 @@ class LinkedInScheduler:
                 'topic': row[6]
             })
         
-        conn.close()
         return scheduled_posts
     
     def _optimize_posting_time(self, requested_time: datetime) -> datetime:
         """Optimize posting time based on engagement data"""
-        
-        # Optimal times for LinkedIn (based on industry research)
-        optimal_times = {
-            0: [],  # Sunday - limited posting
-            1: [9, 10, 11, 13],  # Monday
-            2: [8, 9, 10, 12, 15],  # Tuesday - best day
-            3: [9, 10, 14],  # Wednesday
-            4: [8, 9, 11, 16],  # Thursday
-            5: [9, 13],  # Friday
-            6: [10]  # Saturday - limited
-        }
-        
-        weekday = requested_time.weekday()
-        optimal_hours = optimal_times.get(weekday, [9, 10, 11])
-        
-        # If requested time is already optimal, keep it
-        if requested_time.hour in optimal_hours:
-            return requested_time
-        
-        # Otherwise, adjust to nearest optimal time
-        if optimal_hours:
-            nearest_hour = min(optimal_hours, key=lambda x: abs(x - requested_time.hour))
-            optimized_time = requested_time.replace(hour=nearest_hour, minute=0, second=0)
-            return optimized_time
-        
-        return requested_time
+        return self.optimizer.optimize(requested_time)
     
     def get_optimal_schedule_suggestions(self) -> Dict:
         """Get personalized schedule suggestions"""
         return {
             "high_engagement_times": [
-                {"day": "Tuesday", "time": "9:00 AM", "engagement_boost": "+25%"},
-                {"day": "Tuesday", "time": "12:00 PM", "engagement_boost": "+20%"},
-                {"day": "Wednesday", "time": "10:00 AM", "engagement_boost": "+18%"},
-                {"day": "Thursday", "time": "9:00 AM", "engagement_boost": "+22%"}
+                {
+                    "day": DAYS[slot['weekday']],
+                    "time": _format_hour(slot['hour']),
+                    "engagement_boost": f"{slot['lift']:+.0%}",
+                    "posts": slot['posts']
+                }
+                for slot in self.optimizer.best_slots(4)
             ],
             "recommended_frequency": "3-4 posts per week",
             "best_content_mix": {
@@ -154,61 +219,79 @@ class ContentCalendar:
         self.scheduler = LinkedInScheduler(db_path)
     
     def get_calendar_data(self, year: int, month: int) -> Dict:
-        """Get calendar data for a specific month"""
-        
-        # Get scheduled posts for the month
-        start_date = datetime(year, month, 1)
-        if month == 12:
-            end_date = datetime(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = datetime(year, month + 1, 1) - timedelta(days=1)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Get calendar data for a specific month.
+
+        Months are cached in memory; a miss loads the requested month together
+        with any uncached neighbours in one range query, so paging back and
+        forth through the calendar is served from the cache.
+        """
+        months = [_shift_month(year, month, delta) for delta in (-1, 0, 1)]
+        now = time.monotonic()
+        with _calendar_lock:
+            cached = _calendar_cache.get((self.db_path, year, month))
+            if self._is_fresh(cached, now):
+                return cached[1]
+            missing = [
+                ym for ym in months
+                if ym == (year, month) or not self._is_fresh(_calendar_cache.get((self.db_path, *ym)), now)
+            ]
+            generation = _calendar_generation
+        
+        loaded = self._load_months(missing[0], missing[-1])
+        
+        with _calendar_lock:
+            # Skip caching if a schedule/cancel landed while we were querying
+            if generation == _calendar_generation:
+                for ym in missing:
+                    _calendar_cache[(self.db_path, *ym)] = (now, loaded.get(ym, {}))
+        
+        return loaded.get((year, month), {})
+    
+    @staticmethod
+    def _is_fresh(entry: Optional[Tuple], now: float) -> bool:
+        return bool(entry) and now - entry[0] < config.CALENDAR_CACHE_TTL
+    
+    def _load_months(self, first: Tuple[int, int], last: Tuple[int, int]) -> Dict:
+        """Per-day counts for every month from first to last, keyed by (year, month)"""
+        start_date = date(first[0], first[1], 1)
+        end_date = date(*_shift_month(last[0], last[1], 1), 1)
         
-        cursor.execute('''
+        # Half-open range on the raw column so idx_scheduled_posts_time is used
+        cursor = get_connection(self.db_path).execute('''
             SELECT DATE(sp.scheduled_time) as date, COUNT(*) as post_count,
                    GROUP_CONCAT(p.content_type) as content_types
             FROM scheduled_posts sp
             JOIN posts p ON sp.post_id = p.id
-            WHERE DATE(sp.scheduled_time) BETWEEN ? AND ?
+            WHERE sp.scheduled_time >= ? AND sp.scheduled_time < ?
+              AND sp.status != 'cancelled'
             GROUP BY DATE(sp.scheduled_time)
-        ''', (start_date.date(), end_date.date()))
+        ''', (start_date.isoformat(), end_date.isoformat()))
         
-        calendar_data = {}
+        months = {}
         for row in cursor.fetchall():
-            calendar_data[row[0]] = {
+            day = date.fromisoformat(row[0])
+            months.setdefault((day.year, day.month), {})[row[0]] = {
                 'post_count': row[1],
                 'content_types': row[2].split(',') if row[2] else []
             }
         
-        conn.close()
-        return calendar_data
+        return months
     
-    def suggest_content_gaps(self, days_ahead: int = 30) -> List[Dict]:
-        """Identify gaps in content calendar and suggest content"""
-        
-        # Get current scheduled posts
-        scheduled = self.scheduler.get_scheduled_posts(days_ahead)
-        scheduled_dates = [datetime.fromisoformat(post['scheduled_time']).date() 
-                          for post in scheduled]
-        
-        # Identify gaps (days without posts)
-        gaps = []
-        current_date = datetime.now().date()
-        
-        for i in range(days_ahead):
-            check_date = current_date + timedelta(days=i)
-            
-            # Skip weekends for business content
-            if check_date.weekday() < 5 and check_date not in scheduled_dates:
-                gaps.append({
-                    'date': check_date,
-                    'suggested_content': self._suggest_content_for_date(check_date),
-                    'optimal_time': self._get_optimal_time_for_date(check_date)
-                })
-        
-        return gaps[:10]  # Return top 10 gaps
+    def suggest_content_gaps(self, days_ahead: int = 30, by: Sequence[str] = (),
+                             platforms: Optional[List[str]] = None, content_types: Optional[List[str]] = None,
+                             posts_per_day: int = 1, start: Optional[date] = None) -> Iterator[Dict]:
+        """Identify gaps in content calendar and suggest content.
+
+        Yields gaps lazily in date order (weekdays only, from today); see
+        content_gaps.iter_gaps for grouping by platform or content type.
+        """
+        start = start or datetime.now().date()
+        scores = self.scheduler.optimizer.model()['scores']
+        for gap in iter_gaps(self.db_path, start, start + timedelta(days=days_ahead), by,
+                             platforms, content_types, posts_per_day, scores=scores):
+            gap['suggested_content'] = gap.get('content_type') or self._suggest_content_for_date(gap['date'])
+            gap['optimal_time'] = _format_hour(gap['slot'].hour) if gap['slot'] else self._get_optimal_time_for_date(gap['date'])
+            yield gap
     
     def _suggest_content_for_date(self, date) -> str:
         """Suggest content type based on day of week"""
@@ -224,15 +307,7 @@ class ContentCalendar:
     
     def _get_optimal_time_for_date(self, date) -> str:
         """Get optimal posting time for a specific date"""
-        optimal_times = {
-            0: "9:00 AM",  # Monday
-            1: "10:00 AM",  # Tuesday
-            2: "9:00 AM",   # Wednesday  
-            3: "11:00 AM",  # Thursday
-            4: "9:00 AM"    # Friday
-        }
-        
-        return optimal_times.get(date.weekday(), "9:00 AM")
+        return _format_hour(self.scheduler.optimizer.best_hour(date.weekday()))
 
 class PerformanceTracker:
     """Track and analyze post performance metrics"""
@@ -243,95 +318,113 @@ class PerformanceTracker:
     
     def init_performance_tables(self):
         """Initialize performance tracking tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS post_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                post_id INTEGER,
-                metric_date DATE,
-                views INTEGER DEFAULT 0,
-                likes INTEGER DEFAULT 0,
-                comments INTEGER DEFAULT 0,
-                shares INTEGER DEFAULT 0,
-                clicks INTEGER DEFAULT 0,
-                engagement_rate REAL DEFAULT 0.0,
-                reach INTEGER DEFAULT 0,
-                FOREIGN KEY (post_id) REFERENCES posts (id)
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS performance_insights (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                insight_type TEXT,
-                insight_data TEXT,
-                confidence_score REAL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        migrate(self.db_path)
     
     def track_post_performance(self, post_id: int, metrics: Dict):
         """Record performance metrics for a post"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        engagement_rate = 0
-        if metrics.get('views', 0) > 0:
-            total_engagement = metrics.get('likes', 0) + metrics.get('comments', 0) + metrics.get('shares', 0)
-            engagement_rate = (total_engagement / metrics.get('views', 1)) * 100
-        
-        cursor.execute('''
-            INSERT INTO post_metrics 
-            (post_id, metric_date, views, likes, comments, shares, clicks, engagement_rate, reach)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            post_id, datetime.now().date(),
-            metrics.get('views', 0), metrics.get('likes', 0), 
-            metrics.get('comments', 0), metrics.get('shares', 0),
-            metrics.get('clicks', 0), engagement_rate, metrics.get('reach', 0)
-        ))
+        self.track_many([dict(metrics, post_id=post_id)])
+    
+    def track_many(self, records: List[Dict]) -> int:
+        """Record metrics for many posts in a single transaction.
+
+        Each record needs a post_id plus any of the metric fields and an
+        optional metric_date (defaults to today). A repeated poll for the same
+        post and day updates that day's row instead of adding another one.
+        """
+        if not records:
+            return 0
+        
+        today = datetime.now().date().isoformat()
+        fields = ['views', 'likes', 'comments', 'shares', 'clicks', 'reach']
+        columns = {name: [int(record.get(name, 0) or 0) for record in records] for name in fields}
+        rates = _engagement_rates(columns['views'], columns['likes'], columns['comments'], columns['shares'])
+        
+        rows = [
+            (
+                record['post_id'], _metric_date(record.get('metric_date')) or today,
+                columns['views'][i], columns['likes'][i], columns['comments'][i],
+                columns['shares'][i], columns['clicks'][i], rates[i], columns['reach'][i]
+            )
+            for i, record in enumerate(records)
+        ]
         
-        conn.commit()
-        conn.close()
+        with transaction(self.db_path) as conn:
+            conn.executemany('''
+                INSERT INTO post_metrics 
+                (post_id, metric_date, views, likes, comments, shares, clicks, engagement_rate, reach)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (post_id, metric_date) DO UPDATE SET
+                    views = excluded.views,
+                    likes = excluded.likes,
+                    comments = excluded.comments,
+                    shares = excluded.shares,
+                    clicks = excluded.clicks,
+                    engagement_rate = excluded.engagement_rate,
+                    reach = excluded.reach
+            ''', rows)
+            refresh_dirty_rollups(conn)
+        
+        return len(rows)
     
     def get_performance_summary(self, days: int = 30) -> Dict:
-        """Get performance summary for the last N days"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        """Get performance summary for the last N days (answered from daily rollups)"""
         start_date = datetime.now().date() - timedelta(days=days)
-        
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total_posts,
-                AVG(views) as avg_views,
-                AVG(likes) as avg_likes,
-                AVG(comments) as avg_comments,
-                AVG(shares) as avg_shares,
-                AVG(engagement_rate) as avg_engagement_rate
-            FROM post_metrics 
-            WHERE metric_date >= ?
-        ''', (start_date,))
-        
-        result = cursor.fetchone()
+        window = window_summary(self.db_path, start_date)
         
         summary = {
-            'total_posts': result[0] or 0,
-            'avg_views': round(result[1] or 0, 1),
-            'avg_likes': round(result[2] or 0, 1),
-            'avg_comments': round(result[3] or 0, 1),
-            'avg_shares': round(result[4] or 0, 1),
-            'avg_engagement_rate': round(result[5] or 0, 2)
+            'total_posts': window['count'],
+            'avg_views': round(window['views']['mean'], 1),
+            'avg_likes': round(window['likes']['mean'], 1),
+            'avg_comments': round(window['comments']['mean'], 1),
+            'avg_shares': round(window['shares']['mean'], 1),
+            'avg_engagement_rate': round(window['engagement_rate']['mean'], 2),
+            'median_views': round(window['views']['median'], 1),
+            'p90_views': round(window['views']['p90'], 1),
+            'median_engagement_rate': round(window['engagement_rate']['median'], 2),
+            'p90_engagement_rate': round(window['engagement_rate']['p90'], 2)
         }
         
-        conn.close()
         return summary
     
+    def get_top_posts(self, metric: str = 'shares', days: int = 30, limit: int = 5) -> List[Dict]:
+        """Posts created in the last N days ranked by their latest value of metric (in SQL)"""
+        if metric not in ['views', 'likes', 'comments', 'shares', 'clicks', 'engagement_rate']:
+            raise ValueError(f"Unknown metric: {metric}")
+        
+        column = metric if metric == 'engagement_rate' else f"engagement_{metric}"
+        params = (f"-{int(days)} days", limit)
+        conn = get_connection(self.db_path)
+        try:
+            rows = conn.execute(f'''
+                SELECT id, content, content_type, topic, {column}
+                FROM posts
+                WHERE created_at >= datetime('now', ?) AND {column} IS NOT NULL
+                ORDER BY {column} DESC
+                LIMIT ?
+            ''', params).fetchall()
+        except sqlite3.OperationalError:
+            # Without the generated columns, rank each post's latest metrics row
+            rows = conn.execute(f'''
+                SELECT p.id, p.content, p.content_type, p.topic, m.{metric}
+                FROM posts p
+                JOIN post_metrics m ON m.post_id = p.id
+                WHERE p.created_at >= datetime('now', ?)
+                  AND m.metric_date = (SELECT MAX(metric_date) FROM post_metrics WHERE post_id = p.id)
+                ORDER BY m.{metric} DESC
+                LIMIT ?
+            ''', params).fetchall()
+        
+        return [
+            {
+                'post_id': row[0],
+                'content': row[1][:100] + "..." if len(row[1]) > 100 else row[1],
+                'content_type': row[2],
+                'topic': row[3],
+                metric: row[4]
+            }
+            for row in rows
+        ]
+    
     def generate_performance_insights(self) -> List[Dict]:
         """Generate AI-powered performance insights"""
         
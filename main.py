@@ -20,7 +20,7 @@ def main():
     col1, col2, col3 = st.columns(3)
 
     fs = FewShotPosts()
-    tags = fs.get_tags()
+    tags = fs.get_tags(sort_by='frequency')
     with col1:
         # Dropdown for Topic (Tags)
         selected_tag = st.selectbox("Topic", options=tags)
@@ -0,0 +1,220 @@
+"""
+Time-partitioned retention for post_metrics
+
+Rows older than ``METRICS_RETENTION_DAYS`` are moved, one calendar month at a
+time, into monthly tables (``post_metrics_YYYY_MM``) in an archive database
+file next to the main one. Before the hot rows are deleted their aggregates
+are stored as archived rollup baselines, so daily and per-post rollups keep
+their full history while dashboards and trackers only read recent rows.
+
+``attach_archive`` opens a dedicated connection with the archive attached and
+``post_metrics_archive`` / ``post_metrics_all`` (hot UNION ALL archive) views
+for the rare queries that need full history; pooled connections never see the
+archive, so ordinary transactions do not lock it. Freed pages are returned
+with incremental vacuum once ``enable_incremental_vacuum`` has converted the
+database (``python metrics_retention.py --enable-incremental-vacuum``).
+"""
+import os
+import re
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from config import Config
+from database import get_connection, open_connection, transaction
+from metrics_rollup import refresh_dirty_rollups, store_archived_baselines
+from migrations import migrate
+
+config = Config()
+
+_METRIC_COLUMNS = "id, post_id, metric_date, views, likes, comments, shares, clicks, engagement_rate, reach"
+_MONTH_TABLE = re.compile(r"^post_metrics_\d{4}_\d{2}$")
+
+
+def archive_path(db_path: Optional[str] = None) -> str:
+    """Archive database file for db_path (content_library.db -> content_library.archive.db)"""
+    return os.path.splitext(db_path or config.DB_PATH)[0] + config.METRICS_ARCHIVE_SUFFIX
+
+
+def _archive_tables(conn) -> List[str]:
+    names = conn.execute(
+        "SELECT name FROM archive.sqlite_master WHERE type = 'table' ORDER BY name"
+    ).fetchall()
+    return [name for (name,) in names if _MONTH_TABLE.match(name)]
+
+
+def _create_views(conn):
+    """(Re)build the temp views over the hot table and every monthly archive table"""
+    tables = _archive_tables(conn)
+    archive = " UNION ALL ".join(
+        f"SELECT {_METRIC_COLUMNS} FROM archive.{table}" for table in tables
+    ) or f"SELECT {_METRIC_COLUMNS} FROM main.post_metrics WHERE 0"
+    conn.execute("DROP VIEW IF EXISTS temp.post_metrics_archive")
+    conn.execute(f"CREATE TEMP VIEW post_metrics_archive AS {archive}")
+    conn.execute("DROP VIEW IF EXISTS temp.post_metrics_all")
+    conn.execute(f'''
+        CREATE TEMP VIEW post_metrics_all AS
+        SELECT {_METRIC_COLUMNS} FROM main.post_metrics
+        UNION ALL
+        SELECT {_METRIC_COLUMNS} FROM post_metrics_archive
+    ''')
+
+
+@contextmanager
+def attach_archive(db_path: Optional[str] = None) -> Iterator:
+    """A dedicated connection with the archive attached and history views created, closed on exit"""
+    db_path = db_path or config.DB_PATH
+    migrate(db_path)
+    conn = open_connection(db_path)
+    try:
+        conn.execute("ATTACH DATABASE ? AS archive", (archive_path(db_path),))
+        # Only takes effect while the archive file is still empty
+        conn.execute("PRAGMA archive.auto_vacuum = INCREMENTAL")
+        conn.execute("PRAGMA archive.journal_mode = WAL")
+        _create_views(conn)
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def _write(conn) -> Iterator:
+    """transaction() for an archive connection, which is not pooled"""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+
+def _month_bounds(month: str):
+    start = datetime.strptime(month, "%Y-%m").date()
+    end = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start.isoformat(), end.isoformat()
+
+
+def archive_month(db_path: Optional[str], month: str, cutoff: str) -> int:
+    """Move one month's rows older than cutoff into archive.post_metrics_YYYY_MM"""
+    start, end = _month_bounds(month)
+    end = min(end, cutoff)
+    table = f"post_metrics_{month.replace('-', '_')}"
+
+    with attach_archive(db_path) as conn:
+        # Step 1 (archive file): copy. Idempotent, so a crash before step 2 just repeats it.
+        with _write(conn):
+            conn.execute(f'''
+                CREATE TABLE IF NOT EXISTS archive.{table} (
+                    id INTEGER PRIMARY KEY,
+                    post_id INTEGER,
+                    metric_date DATE,
+                    views INTEGER DEFAULT 0,
+                    likes INTEGER DEFAULT 0,
+                    comments INTEGER DEFAULT 0,
+                    shares INTEGER DEFAULT 0,
+                    clicks INTEGER DEFAULT 0,
+                    engagement_rate REAL DEFAULT 0.0,
+                    reach INTEGER DEFAULT 0,
+                    UNIQUE (post_id, metric_date)
+                )
+            ''')
+            conn.execute(f"CREATE INDEX IF NOT EXISTS archive.idx_{table}_date ON {table} (metric_date)")
+            conn.execute(f'''
+                INSERT OR REPLACE INTO archive.{table} ({_METRIC_COLUMNS})
+                SELECT {_METRIC_COLUMNS} FROM main.post_metrics
+                WHERE metric_date >= ? AND metric_date < ?
+            ''', (start, end))
+        _create_views(conn)
+
+        # Step 2 (main file): baselines from the archive, then drop the hot rows and refold
+        with _write(conn):
+            days = [row[0] for row in conn.execute(
+                "SELECT DISTINCT metric_date FROM main.post_metrics WHERE metric_date >= ? AND metric_date < ?",
+                (start, end),
+            )]
+            post_ids = [row[0] for row in conn.execute(
+                "SELECT DISTINCT post_id FROM main.post_metrics WHERE metric_date >= ? AND metric_date < ?",
+                (start, end),
+            )]
+            store_archived_baselines(conn, "post_metrics_archive", days, post_ids)
+            moved = conn.execute(
+                "DELETE FROM main.post_metrics WHERE metric_date >= ? AND metric_date < ?", (start, end)
+            ).rowcount
+            refresh_dirty_rollups(conn)
+
+    return moved
+
+
+def archive_old_metrics(db_path: Optional[str] = None, retention_days: Optional[int] = None) -> int:
+    """Periodic job: archive every post_metrics row older than the retention window"""
+    db_path = db_path or config.DB_PATH
+    retention_days = config.METRICS_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = (datetime.now().date() - timedelta(days=retention_days)).isoformat()
+
+    migrate(db_path)
+    # Fold pending changes first so the rollups are current before rows move
+    with transaction(db_path) as conn:
+        refresh_dirty_rollups(conn)
+        months = [row[0] for row in conn.execute(
+            "SELECT DISTINCT substr(metric_date, 1, 7) FROM post_metrics WHERE metric_date < ? ORDER BY 1",
+            (cutoff,),
+        )]
+
+    moved = sum(archive_month(db_path, month, cutoff) for month in months)
+    if moved:
+        incremental_vacuum(db_path)
+    return moved
+
+
+def enable_incremental_vacuum(db_path: Optional[str] = None) -> bool:
+    """One-off maintenance: switch the main database to incremental auto_vacuum.
+
+    The mode only takes effect after a full VACUUM, which rewrites the whole file
+    under an exclusive lock, so run it while nothing else uses the database.
+    Returns False when the database was already converted.
+    """
+    conn = get_connection(db_path or config.DB_PATH)
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+        return False
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    return True
+
+
+def incremental_vacuum(db_path: Optional[str] = None, pages: Optional[int] = None) -> int:
+    """Return up to pages free pages (all by default) from the main database to the OS.
+
+    A no-op until enable_incremental_vacuum has converted the database.
+    """
+    conn = get_connection(db_path or config.DB_PATH)
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        return 0
+
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    pages = free if pages is None else min(pages, free)
+    if pages:
+        conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+    return pages
+
+
+def post_history(db_path: Optional[str], post_id: int) -> List[Dict]:
+    """Every metrics row for a post across hot and archived data, oldest first"""
+    with attach_archive(db_path) as conn:
+        cursor = conn.execute('''
+            SELECT metric_date, views, likes, comments, shares, clicks, engagement_rate, reach
+            FROM post_metrics_all
+            WHERE post_id = ?
+            ORDER BY metric_date
+        ''', (post_id,))
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+if __name__ == "__main__":
+    if "--enable-incremental-vacuum" in sys.argv[1:]:
+        converted = enable_incremental_vacuum()
+        print("Converted to incremental auto_vacuum" if converted else "Already using incremental auto_vacuum")
+    print(f"Archived {archive_old_metrics()} post_metrics rows")
@@ -0,0 +1,356 @@
+"""
+Incrementally maintained rollups over post_metrics
+
+Triggers on post_metrics mark the affected days and posts as dirty; dirty
+rollup rows are recomputed from their (indexed) slice of post_metrics inside
+the writer's transaction, or by the periodic ``compact_rollups`` job (run by
+the leading dispatcher). Window summaries are plain reads of one row per day
+instead of scanning every metric row; they never take the write lock.
+
+Each rollup keeps count, sum, sum of squares, min and max per measure plus a
+mergeable quantile sketch for views and engagement rate, so medians and p90s
+for any window come from merging a handful of small histograms.
+"""
+import json
+import math
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from config import Config
+from database import get_connection, transaction
+from posting_times import update_posting_times
+
+config = Config()
+
+MEASURES = ['views', 'likes', 'comments', 'shares', 'clicks', 'engagement_rate']
+SKETCHED = ['views', 'engagement_rate']
+
+
+class QuantileSketch:
+    """Log-bucketed histogram of non-negative values.
+
+    Buckets grow geometrically on log(1 + value), so sketches from different
+    days merge by adding counts and quantiles stay within ~5% of 1 + value.
+    """
+
+    GAMMA = 1.1
+
+    def __init__(self, buckets: Optional[Dict] = None):
+        self.buckets = Counter({int(key): count for key, count in (buckets or {}).items()})
+
+    def add(self, value: float, count: int = 1):
+        bucket = int(math.log1p(max(value or 0, 0)) / math.log(self.GAMMA))
+        self.buckets[bucket] += count
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        self.buckets.update(other.buckets)
+        return self
+
+    def count(self) -> int:
+        return sum(self.buckets.values())
+
+    def quantile(self, q: float) -> float:
+        total = self.count()
+        if not total:
+            return 0.0
+        rank = q * (total - 1)
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen > rank:
+                return math.expm1((bucket + 0.5) * math.log(self.GAMMA))
+        return math.expm1((max(self.buckets) + 0.5) * math.log(self.GAMMA))
+
+    def to_json(self) -> str:
+        return json.dumps(dict(self.buckets))
+
+    @classmethod
+    def from_json(cls, data: Optional[str]) -> "QuantileSketch":
+        return cls(json.loads(data) if data else None)
+
+
+def _aggregate_columns() -> str:
+    columns = []
+    for measure in MEASURES:
+        columns.extend([
+            f"SUM({measure})", f"SUM({measure} * {measure})",
+            f"MIN({measure})", f"MAX({measure})",
+        ])
+    return ", ".join(columns)
+
+
+def _rollup_columns() -> List[str]:
+    columns = []
+    for measure in MEASURES:
+        columns.extend([f"{measure}_sum", f"{measure}_sumsq", f"{measure}_min", f"{measure}_max"])
+    return columns + [f"{measure}_sketch" for measure in SKETCHED]
+
+
+def _sketches(conn, source: str, where: str, params) -> List[str]:
+    sketches = {measure: QuantileSketch() for measure in SKETCHED}
+    for row in conn.execute(f"SELECT {', '.join(SKETCHED)} FROM {source} WHERE {where}", params):
+        for measure, value in zip(SKETCHED, row):
+            sketches[measure].add(value)
+    return [sketches[measure].to_json() for measure in SKETCHED]
+
+
+def aggregate_rows(conn, source: str, where: str, params) -> Optional[tuple]:
+    """Rollup row (row_count, stats..., sketches...) over source rows matching where, None if empty"""
+    aggregate = conn.execute(
+        f"SELECT COUNT(*), {_aggregate_columns()} FROM {source} WHERE {where}", params
+    ).fetchone()
+    if not aggregate[0]:
+        return None
+    return (*aggregate, *_sketches(conn, source, where, params))
+
+
+def combine_rows(rows: List[tuple]) -> tuple:
+    """Merge rollup rows (row_count, stats..., sketches...) into one"""
+    columns = ['row_count'] + _rollup_columns()
+    combined = dict(zip(columns, rows[0]))
+    for row in rows[1:]:
+        record = dict(zip(columns, row))
+        combined['row_count'] += record['row_count']
+        for measure in MEASURES:
+            for stat, combine in (('sum', sum), ('sumsq', sum), ('min', min), ('max', max)):
+                name = f"{measure}_{stat}"
+                values = [v for v in (combined[name], record[name]) if v is not None]
+                combined[name] = combine(values) if values else None
+        for measure in SKETCHED:
+            name = f"{measure}_sketch"
+            combined[name] = QuantileSketch.from_json(combined[name]).merge(
+                QuantileSketch.from_json(record[name])
+            ).to_json()
+    return tuple(combined[column] for column in columns)
+
+
+def _refresh(conn, table: str, key: str, dirty_table: str):
+    keys = [row[0] for row in conn.execute(f"SELECT {key} FROM {dirty_table}")]
+    if not keys:
+        return 0
+
+    columns = _rollup_columns()
+    placeholders = ", ".join("?" for _ in range(len(columns) + 2))
+    for value in keys:
+        # Rows moved out by metrics_retention live on as an archived baseline
+        rows = [
+            row for row in (
+                aggregate_rows(conn, "post_metrics", f"{key} = ?", (value,)),
+                conn.execute(
+                    f"SELECT row_count, {', '.join(columns)} FROM {table}_archived WHERE {key} = ?", (value,)
+                ).fetchone(),
+            )
+            if row
+        ]
+        if not rows:
+            conn.execute(f"DELETE FROM {table} WHERE {key} = ?", (value,))
+            continue
+        conn.execute(
+            f"INSERT OR REPLACE INTO {table} ({key}, row_count, {', '.join(columns)}) "
+            f"VALUES ({placeholders})",
+            (value, *combine_rows(rows)),
+        )
+    conn.execute(f"DELETE FROM {dirty_table}")
+    return len(keys)
+
+
+def sync_engagement_data(conn, post_ids: Optional[List[int]] = None):
+    """Mirror each post's latest post_metrics row into posts.engagement_data (all posts by default)"""
+    statement = '''
+        UPDATE posts SET engagement_data = (
+            SELECT json_object(
+                'views', views, 'likes', likes, 'comments', comments, 'shares', shares,
+                'clicks', clicks, 'engagement_rate', engagement_rate, 'metric_date', metric_date
+            )
+            FROM post_metrics WHERE post_id = posts.id
+            ORDER BY metric_date DESC LIMIT 1
+        )
+    '''
+    if post_ids is None:
+        conn.execute(statement + "WHERE id IN (SELECT post_id FROM post_metrics)")
+    else:
+        # Posts whose metrics were all archived keep their last snapshot
+        conn.executemany(
+            statement + "WHERE id = ? AND EXISTS (SELECT 1 FROM post_metrics WHERE post_id = posts.id)",
+            [(post_id,) for post_id in post_ids],
+        )
+
+
+def refresh_dirty_rollups(conn) -> int:
+    """Recompute rollup rows for days and posts touched since the last refresh.
+
+    Also refreshes the touched posts' engagement_data and posting-time
+    contributions. Must run inside the
+    caller's transaction; returns the number of rows rebuilt.
+    """
+    post_ids = [row[0] for row in conn.execute("SELECT post_id FROM metrics_rollup_dirty_posts")]
+    rebuilt = _refresh(conn, "metrics_daily_rollup", "metric_date", "metrics_rollup_dirty_days")
+    rebuilt += _refresh(conn, "metrics_post_rollup", "post_id", "metrics_rollup_dirty_posts")
+    sync_engagement_data(conn, post_ids)
+    update_posting_times(conn, post_ids)
+    return rebuilt
+
+
+def compact_rollups(db_path: Optional[str] = None, full: bool = False) -> int:
+    """Periodic job: fold pending changes into the rollups (or rebuild them all)"""
+    db_path = db_path or config.DB_PATH
+    if not full and not _has_dirty(get_connection(db_path)):
+        return 0  # checked without the write lock; nothing to fold
+    with transaction(db_path) as conn:
+        if full:
+            conn.execute('''
+                INSERT OR IGNORE INTO metrics_rollup_dirty_days (metric_date)
+                SELECT DISTINCT metric_date FROM post_metrics
+            ''')
+            conn.execute('''
+                INSERT OR IGNORE INTO metrics_rollup_dirty_posts (post_id)
+                SELECT DISTINCT post_id FROM post_metrics
+            ''')
+        return refresh_dirty_rollups(conn)
+
+
+def _has_dirty(conn) -> bool:
+    return bool(
+        conn.execute("SELECT 1 FROM metrics_rollup_dirty_days LIMIT 1").fetchone() or
+        conn.execute("SELECT 1 FROM metrics_rollup_dirty_posts LIMIT 1").fetchone()
+    )
+
+
+def _summarise(rows: Iterable) -> Dict:
+    """Combine rollup rows (row_count, sums..., sketches...) into one summary"""
+    rows = list(rows)
+    columns = ['row_count'] + _rollup_columns()
+    total = dict(zip(columns, combine_rows(rows))) if rows else {'row_count': 0}
+
+    count = total['row_count']
+    summary = {'count': count}
+    for measure in MEASURES:
+        mean = (total.get(f"{measure}_sum") or 0) / count if count else 0.0
+        variance = (total.get(f"{measure}_sumsq") or 0) / count - mean * mean if count else 0.0
+        summary[measure] = {
+            'sum': total.get(f"{measure}_sum") or 0,
+            'mean': mean,
+            'stddev': math.sqrt(max(variance, 0.0)),
+            'min': total.get(f"{measure}_min") or 0,
+            'max': total.get(f"{measure}_max") or 0,
+        }
+    for measure in SKETCHED:
+        sketch = QuantileSketch.from_json(total.get(f"{measure}_sketch"))
+        summary[measure]['median'] = sketch.quantile(0.5)
+        summary[measure]['p90'] = sketch.quantile(0.9)
+    return summary
+
+
+def window_summary(db_path: Optional[str], start_date, end_date=None) -> Dict:
+    """Aggregate metrics for metric_date >= start_date (and <= end_date) from daily rollups"""
+    conn = get_connection(db_path or config.DB_PATH)
+    params = [str(start_date)]
+    where = "metric_date >= ?"
+    if end_date is not None:
+        where += " AND metric_date <= ?"
+        params.append(str(end_date))
+    rows = conn.execute(
+        f"SELECT row_count, {', '.join(_rollup_columns())} FROM metrics_daily_rollup WHERE {where}",
+        params,
+    )
+    return _summarise(rows)
+
+
+def post_summary(db_path: Optional[str], post_id: int) -> Dict:
+    """Lifetime aggregates for one post from its rollup row"""
+    conn = get_connection(db_path or config.DB_PATH)
+    rows = conn.execute(
+        f"SELECT row_count, {', '.join(_rollup_columns())} FROM metrics_post_rollup WHERE post_id = ?",
+        (post_id,),
+    )
+    return _summarise(rows)
+
+
+def create_rollup_tables(conn):
+    """Migration step: rollup tables, dirty markers and the triggers feeding them"""
+    stat_columns = ",\n".join(
+        f"            {column} {'TEXT' if column.endswith('_sketch') else 'REAL'}"
+        for column in _rollup_columns()
+    )
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS metrics_daily_rollup (
+            metric_date DATE PRIMARY KEY,
+            row_count INTEGER NOT NULL,
+{stat_columns}
+        )
+    ''')
+    conn.execute(f'''
+        CREATE TABLE IF NOT EXISTS metrics_post_rollup (
+            post_id INTEGER PRIMARY KEY,
+            row_count INTEGER NOT NULL,
+{stat_columns}
+        )
+    ''')
+    conn.execute("CREATE TABLE IF NOT EXISTS metrics_rollup_dirty_days (metric_date DATE PRIMARY KEY)")
+    conn.execute("CREATE TABLE IF NOT EXISTS metrics_rollup_dirty_posts (post_id INTEGER PRIMARY KEY)")
+
+    # The outer statement's conflict policy overrides OR IGNORE inside trigger bodies
+    # (an UPSERT would abort), so markers are written with an explicit NOT EXISTS.
+    def mark(row):
+        return f'''
+                INSERT INTO metrics_rollup_dirty_days (metric_date)
+                SELECT {row}.metric_date
+                WHERE NOT EXISTS (SELECT 1 FROM metrics_rollup_dirty_days WHERE metric_date = {row}.metric_date);
+                INSERT INTO metrics_rollup_dirty_posts (post_id)
+                SELECT {row}.post_id
+                WHERE NOT EXISTS (SELECT 1 FROM metrics_rollup_dirty_posts WHERE post_id = {row}.post_id);'''
+
+    for event, rows in (("INSERT", ["new"]), ("DELETE", ["old"]), ("UPDATE", ["old", "new"])):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS post_metrics_rollup_{event.lower()} AFTER {event} ON post_metrics BEGIN{"".join(mark(row) for row in rows)}
+            END
+        ''')
+
+    # Existing history is folded in on the first refresh
+    conn.execute('''
+        INSERT OR IGNORE INTO metrics_rollup_dirty_days (metric_date)
+        SELECT DISTINCT metric_date FROM post_metrics
+    ''')
+    conn.execute('''
+        INSERT OR IGNORE INTO metrics_rollup_dirty_posts (post_id)
+        SELECT DISTINCT post_id FROM post_metrics
+    ''')
+
+
+def store_archived_baselines(conn, source: str, days: List[str], post_ids: List[int]):
+    """Recompute archived baselines for the given days and posts from source (the archive)"""
+    columns = _rollup_columns()
+    placeholders = ", ".join("?" for _ in range(len(columns) + 2))
+    for table, key, values in (("metrics_daily_rollup_archived", "metric_date", days),
+                               ("metrics_post_rollup_archived", "post_id", post_ids)):
+        for value in values:
+            row = aggregate_rows(conn, source, f"{key} = ?", (value,))
+            if row is None:
+                conn.execute(f"DELETE FROM {table} WHERE {key} = ?", (value,))
+                continue
+            conn.execute(
+                f"INSERT OR REPLACE INTO {table} ({key}, row_count, {', '.join(columns)}) "
+                f"VALUES ({placeholders})",
+                (value, *row),
+            )
+
+
+def create_archived_rollup_tables(conn):
+    """Migration step: baselines for rollup rows whose source rows were archived"""
+    stat_columns = ",\n".join(
+        f"            {column} {'TEXT' if column.endswith('_sketch') else 'REAL'}"
+        for column in _rollup_columns()
+    )
+    for table, key in (("metrics_daily_rollup_archived", "metric_date DATE"),
+                       ("metrics_post_rollup_archived", "post_id INTEGER")):
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                {key} PRIMARY KEY,
+                row_count INTEGER NOT NULL,
+{stat_columns}
+            )
+        ''')
+
+
+if __name__ == "__main__":
+    print(f"Rebuilt {compact_rollups(full=True)} rollup rows")
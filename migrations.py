@@ -0,0 +1,386 @@
+"""
+Versioned schema migrations for the content library database
+
+Each migration runs once, in its own transaction, and is recorded in the
+``schema_version`` table. ``migrate`` is cheap to call from constructors:
+after the first call per database file in a process it returns immediately.
+"""
+import sqlite3
+import threading
+from typing import Callable, List, Optional, Tuple, Union
+
+from config import Config
+from database import get_connection, transaction
+from dedup import create_dedup_tables, rehash_wordless_posts
+from metrics_rollup import create_archived_rollup_tables, create_rollup_tables, sync_engagement_data
+from posting_times import create_posting_time_tables
+
+config = Config()
+
+Step = Union[str, Callable]
+
+
+def _create_posts_fts(conn):
+    """Full-text index over posts, kept in sync by triggers (skipped without FTS5)"""
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+                content, topic, hashtags,
+                content='posts', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"Warning: SQLite FTS5 unavailable ({e}); library search will use LIKE scans")
+        return
+
+    # executescript() would commit the surrounding transaction, so run triggers one by one
+    for trigger in (
+        '''
+        CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+            INSERT INTO posts_fts (rowid, content, topic, hashtags)
+            VALUES (new.id, new.content, new.topic, new.hashtags);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+            INSERT INTO posts_fts (posts_fts, rowid, content, topic, hashtags)
+            VALUES ('delete', old.id, old.content, old.topic, old.hashtags);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF content, topic, hashtags ON posts BEGIN
+            INSERT INTO posts_fts (posts_fts, rowid, content, topic, hashtags)
+            VALUES ('delete', old.id, old.content, old.topic, old.hashtags);
+            INSERT INTO posts_fts (rowid, content, topic, hashtags)
+            VALUES (new.id, new.content, new.topic, new.hashtags);
+        END
+        ''',
+    ):
+        conn.execute(trigger)
+    conn.execute("INSERT INTO posts_fts (posts_fts) VALUES ('rebuild')")
+
+
+# Typed views of the JSON blobs: (table, json column, generated column, path, type)
+JSON_COLUMNS = [
+    ("posts", "engagement_data", "engagement_views", "$.views", "INTEGER"),
+    ("posts", "engagement_data", "engagement_likes", "$.likes", "INTEGER"),
+    ("posts", "engagement_data", "engagement_comments", "$.comments", "INTEGER"),
+    ("posts", "engagement_data", "engagement_shares", "$.shares", "INTEGER"),
+    ("posts", "engagement_data", "engagement_clicks", "$.clicks", "INTEGER"),
+    ("posts", "engagement_data", "engagement_rate", "$.engagement_rate", "REAL"),
+    ("performance_insights", "insight_data", "insight_message", "$.message", "TEXT"),
+    ("performance_insights", "insight_data", "insight_action", "$.action", "TEXT"),
+]
+
+
+def _create_json_columns(conn):
+    """Indexed generated columns over JSON blobs (skipped without JSON1/generated columns)"""
+    existing = {
+        table: {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+        for table in {column[0] for column in JSON_COLUMNS}
+    }
+    try:
+        for table, source, column, path, column_type in JSON_COLUMNS:
+            if column in existing[table]:
+                continue
+            # json_valid guard: malformed legacy text reads as NULL instead of failing the row
+            conn.execute(f'''
+                ALTER TABLE {table} ADD COLUMN {column} {column_type} GENERATED ALWAYS AS (
+                    CASE WHEN json_valid({source}) THEN json_extract({source}, '{path}') END
+                ) VIRTUAL
+            ''')
+    except sqlite3.OperationalError as e:
+        print(f"Warning: SQLite JSON generated columns unavailable ({e}); top-post queries will read post_metrics")
+        return
+
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS idx_posts_engagement_shares ON posts (engagement_shares)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_engagement_views ON posts (engagement_views)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_engagement_rate ON posts (engagement_rate)",
+        "CREATE INDEX IF NOT EXISTS idx_insights_type_confidence ON performance_insights (insight_type, confidence_score)",
+    ):
+        conn.execute(statement)
+
+
+# (version, description, steps) - append new migrations, never edit applied ones
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (1, "Initial content library schema", [
+        '''
+        CREATE TABLE IF NOT EXISTS posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content TEXT NOT NULL,
+            content_type TEXT,
+            topic TEXT,
+            tone TEXT,
+            industry TEXT,
+            hashtags TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            performance_score INTEGER DEFAULT 0,
+            is_published BOOLEAN DEFAULT FALSE,
+            scheduled_time TIMESTAMP,
+            engagement_data TEXT
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS analytics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            post_id INTEGER,
+            views INTEGER DEFAULT 0,
+            likes INTEGER DEFAULT 0,
+            comments INTEGER DEFAULT 0,
+            shares INTEGER DEFAULT 0,
+            clicks INTEGER DEFAULT 0,
+            date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (post_id) REFERENCES posts (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS user_preferences (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT DEFAULT 'default',
+            writing_style TEXT,
+            preferred_topics TEXT,
+            brand_voice TEXT,
+            posting_schedule TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS scheduled_posts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            post_id INTEGER,
+            scheduled_time TIMESTAMP NOT NULL,
+            status TEXT DEFAULT 'pending',
+            platform TEXT DEFAULT 'linkedin',
+            auto_hashtags BOOLEAN DEFAULT TRUE,
+            optimal_time_adjusted BOOLEAN DEFAULT FALSE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            published_at TIMESTAMP,
+            error_message TEXT,
+            FOREIGN KEY (post_id) REFERENCES posts (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS posting_schedule (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            day_of_week INTEGER,
+            time_slot TEXT,
+            frequency TEXT DEFAULT 'weekly',
+            is_active BOOLEAN DEFAULT TRUE,
+            performance_score REAL DEFAULT 0.0
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS post_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            post_id INTEGER,
+            metric_date DATE,
+            views INTEGER DEFAULT 0,
+            likes INTEGER DEFAULT 0,
+            comments INTEGER DEFAULT 0,
+            shares INTEGER DEFAULT 0,
+            clicks INTEGER DEFAULT 0,
+            engagement_rate REAL DEFAULT 0.0,
+            reach INTEGER DEFAULT 0,
+            FOREIGN KEY (post_id) REFERENCES posts (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS performance_insights (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            insight_type TEXT,
+            insight_data TEXT,
+            confidence_score REAL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+    ]),
+    (2, "Indexes for scheduler and dashboard queries", [
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_posts_status_time ON scheduled_posts (status, scheduled_time)",
+        "CREATE INDEX IF NOT EXISTS idx_post_metrics_date ON post_metrics (metric_date)",
+        "CREATE INDEX IF NOT EXISTS idx_post_metrics_post_date ON post_metrics (post_id, metric_date)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_created_at ON posts (created_at)",
+        "ANALYZE",
+    ]),
+    (3, "One post_metrics row per post per day", [
+        # Keep the latest poll for each (post_id, metric_date) before enforcing uniqueness
+        '''
+        DELETE FROM post_metrics
+        WHERE id NOT IN (SELECT MAX(id) FROM post_metrics GROUP BY post_id, metric_date)
+        ''',
+        "DROP INDEX IF EXISTS idx_post_metrics_post_date",
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_post_metrics_post_date ON post_metrics (post_id, metric_date)",
+    ]),
+    (4, "Full-text search over saved posts", [
+        _create_posts_fts,
+    ]),
+    (5, "Keyset pagination indexes for the content library", [
+        "DROP INDEX IF EXISTS idx_posts_created_at",
+        "CREATE INDEX IF NOT EXISTS idx_posts_created_id ON posts (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_topic_created ON posts (topic, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_type_created ON posts (content_type, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_industry_created ON posts (industry, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_posts_published_created ON posts (is_published, created_at, id)",
+    ]),
+    (6, "Daily and per-post metric rollups", [
+        create_rollup_tables,
+    ]),
+    (7, "Exact and near-duplicate detection for saved posts", [
+        create_dedup_tables,
+    ]),
+    (8, "Range index for calendar month queries", [
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_posts_time ON scheduled_posts (scheduled_time, status, post_id)",
+    ]),
+    (9, "Typed, indexed engagement and insight fields", [
+        _create_json_columns,
+        sync_engagement_data,
+    ]),
+    (10, "Rollup baselines for archived post_metrics", [
+        create_archived_rollup_tables,
+    ]),
+    (11, "Durable publish queue columns on scheduled_posts", [
+        "ALTER TABLE scheduled_posts ADD COLUMN attempts INTEGER DEFAULT 0",
+        "ALTER TABLE scheduled_posts ADD COLUMN media_urls TEXT",
+        "ALTER TABLE scheduled_posts ADD COLUMN post_url TEXT",
+        "ALTER TABLE scheduled_posts ADD COLUMN lease_owner TEXT",
+        "ALTER TABLE scheduled_posts ADD COLUMN lease_expires_at TIMESTAMP",
+        # Rows left 'publishing' by a crashed dispatcher get an already-expired lease
+        "UPDATE scheduled_posts SET lease_expires_at = datetime('now', 'localtime') WHERE status = 'publishing'",
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_posts_lease ON scheduled_posts (status, lease_expires_at)",
+    ]),
+    (12, "Idempotency ledger for publish calls", [
+        '''
+        CREATE TABLE IF NOT EXISTS publish_ledger (
+            idempotency_key TEXT PRIMARY KEY,
+            job_id INTEGER,
+            platform TEXT,
+            state TEXT NOT NULL,
+            external_post_id TEXT,
+            post_url TEXT,
+            error TEXT,
+            started_at TIMESTAMP NOT NULL,
+            finished_at TIMESTAMP
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_publish_ledger_job ON publish_ledger (job_id, state)",
+    ]),
+    (13, "Dispatcher worker registry and leader lease", [
+        '''
+        CREATE TABLE IF NOT EXISTS scheduler_workers (
+            worker_id TEXT PRIMARY KEY,
+            host TEXT,
+            pid INTEGER,
+            started_at TIMESTAMP NOT NULL,
+            heartbeat_at TIMESTAMP NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS scheduler_leader (
+            name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at TIMESTAMP NOT NULL
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_posts_owner ON scheduled_posts (lease_owner, status)",
+    ]),
+    (14, "Engagement by weekday and posting hour", [
+        create_posting_time_tables,
+    ]),
+    (15, "Scheduler lag, latency and utilisation metrics", [
+        '''
+        CREATE TABLE IF NOT EXISTS publish_attempts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER NOT NULL,
+            platform TEXT,
+            attempt INTEGER,
+            due_at TIMESTAMP,
+            started_at TIMESTAMP NOT NULL,
+            finished_at TIMESTAMP NOT NULL,
+            outcome TEXT NOT NULL,
+            worker TEXT
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_publish_attempts_finished ON publish_attempts (finished_at, outcome)",
+        "CREATE INDEX IF NOT EXISTS idx_publish_attempts_job ON publish_attempts (job_id, attempt)",
+        '''
+        CREATE TABLE IF NOT EXISTS queue_depth_samples (
+            sampled_at TIMESTAMP NOT NULL,
+            platform TEXT,
+            pending INTEGER NOT NULL,
+            due INTEGER NOT NULL,
+            publishing INTEGER NOT NULL
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_queue_depth_samples_time ON queue_depth_samples (sampled_at)",
+        '''
+        CREATE TABLE IF NOT EXISTS worker_utilization (
+            sampled_at TIMESTAMP NOT NULL,
+            worker_id TEXT NOT NULL,
+            platform TEXT NOT NULL,
+            busy_seconds REAL NOT NULL,
+            capacity_seconds REAL NOT NULL
+        )
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_worker_utilization_time ON worker_utilization (sampled_at)",
+    ]),
+    (16, "Rehash posts without word characters", [
+        rehash_wordless_posts,
+    ]),
+]
+
+_migrated = set()
+_lock = threading.Lock()
+
+
+def current_version(db_path: Optional[str] = None) -> int:
+    """Highest applied migration version (0 for a fresh database)"""
+    conn = get_connection(db_path or config.DB_PATH)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(db_path: Optional[str] = None) -> int:
+    """Apply pending migrations once per process and return the schema version"""
+    db_path = db_path or config.DB_PATH
+    if db_path in _migrated:
+        return MIGRATIONS[-1][0]
+
+    with _lock:
+        if db_path in _migrated:
+            return MIGRATIONS[-1][0]
+
+        version = current_version(db_path)
+        for target, description, steps in MIGRATIONS:
+            if target <= version:
+                continue
+            with transaction(db_path) as conn:
+                # Re-check under the write lock in case another process got here first
+                applied = conn.execute(
+                    "SELECT 1 FROM schema_version WHERE version = ?", (target,)
+                ).fetchone()
+                if applied:
+                    continue
+                for step in steps:
+                    if callable(step):
+                        step(conn)
+                    else:
+                        conn.execute(step)
+                conn.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                    (target, description),
+                )
+            version = target
+
+        _migrated.add(db_path)
+        return version
+
+
+if __name__ == "__main__":
+    print(f"Schema version: {migrate()}")
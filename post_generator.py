@@ -39,7 +39,8 @@ def get_prompt(length, language, tag):
     '''
     # prompt = prompt.format(post_topic=tag, post_length=length_str, post_language=language)
 
-    examples = few_shot.get_filtered_posts(length, language, tag)
+    # Use max two samples, relaxing the match when there is no exact one
+    examples = few_shot.get_ranked_posts(length, language, tag, k=2)['posts']
 
     if len(examples) > 0:
         prompt += "4) Use the writing style as per the following examples."
@@ -48,9 +49,6 @@ def get_prompt(length, language, tag):
         post_text = post['text']
         prompt += f'\n\n Example {i+1}: \n\n {post_text}'
 
-        if i == 1: # Use max two samples
-            break
-
     return prompt
 
 
@@ -0,0 +1,263 @@
+"""
+Data-driven posting times
+
+Each published post contributes its mean engagement rate (from the post
+rollups) to a weekday x hour cell of ``posting_time_stats``. Contributions are
+kept per post in ``posting_time_posts`` so a new metrics poll replaces a
+post's old contribution instead of rebuilding the matrix; this runs inside
+``refresh_dirty_rollups`` for the posts that changed.
+
+Cell scores shrink toward a prior built from the industry table the scheduler
+used before, weighted by ``POSTING_TIME_PRIOR_STRENGTH`` posts, so sparse
+cells stay close to the prior until enough posts back them. The scored model
+(including the adjusted hour for every weekday and hour) is cached per
+database, making a schedule-time lookup a pair of list indexes.
+"""
+import bisect
+import heapq
+import json
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from config import Config
+from database import get_connection, transaction
+
+config = Config()
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Industry research prior, by datetime.weekday() (Monday = 0)
+PRIOR_HOURS = {
+    0: [9, 10, 11, 13],
+    1: [8, 9, 10, 12, 15],  # Tuesday - best day
+    2: [9, 10, 14],
+    3: [8, 9, 11, 16],
+    4: [9, 13],
+    5: [10],  # Saturday - limited
+    6: [],  # Sunday - limited posting
+}
+
+# Prior engagement relative to an average post: research hours, other working hours, night
+PRIOR_MULTIPLIERS = (1.25, 0.9, 0.5)
+
+# db_path -> (loaded_at, generation, model)
+_model_cache: Dict[str, tuple] = {}
+_generation = 0
+_cache_lock = threading.Lock()
+
+
+def _prior(weekday: int, hour: int) -> float:
+    if hour in PRIOR_HOURS[weekday]:
+        return PRIOR_MULTIPLIERS[0]
+    return PRIOR_MULTIPLIERS[1] if 8 <= hour <= 18 else PRIOR_MULTIPLIERS[2]
+
+
+def update_posting_times(conn, post_ids: Optional[List[int]] = None):
+    """Replace the matrix contributions of the given posts (all posts by default).
+
+    Runs inside the caller's transaction, after the post rollups are refreshed.
+    """
+    global _generation
+    if post_ids is None:
+        post_ids = [row[0] for row in conn.execute("SELECT post_id FROM metrics_post_rollup")]
+        post_ids += [row[0] for row in conn.execute("SELECT post_id FROM posting_time_posts")]
+    if not post_ids:
+        return
+    ids = json.dumps(sorted(set(post_ids)))
+
+    conn.execute('''
+        UPDATE posting_time_stats
+        SET posts = posting_time_stats.posts - old.posts, rate_sum = posting_time_stats.rate_sum - old.rate_sum
+        FROM (
+            SELECT weekday, hour, COUNT(*) AS posts, SUM(engagement_rate) AS rate_sum
+            FROM posting_time_posts
+            WHERE post_id IN (SELECT value FROM json_each(?))
+            GROUP BY weekday, hour
+        ) AS old
+        WHERE posting_time_stats.weekday = old.weekday AND posting_time_stats.hour = old.hour
+    ''', (ids,))
+    conn.execute("DELETE FROM posting_time_posts WHERE post_id IN (SELECT value FROM json_each(?))", (ids,))
+
+    # strftime('%w') counts from Sunday; shift to datetime.weekday()
+    conn.execute('''
+        INSERT INTO posting_time_posts (post_id, weekday, hour, engagement_rate)
+        SELECT r.post_id,
+               (CAST(strftime('%w', sp.published_at) AS INTEGER) + 6) % 7,
+               CAST(strftime('%H', sp.published_at) AS INTEGER),
+               COALESCE(r.engagement_rate_sum, 0) / r.row_count
+        FROM metrics_post_rollup r
+        JOIN (
+            SELECT post_id, MAX(published_at) AS published_at
+            FROM scheduled_posts
+            WHERE status = 'published' AND published_at IS NOT NULL
+            GROUP BY post_id
+        ) sp ON sp.post_id = r.post_id
+        WHERE r.post_id IN (SELECT value FROM json_each(?)) AND r.row_count > 0
+    ''', (ids,))
+    conn.execute('''
+        INSERT INTO posting_time_stats (weekday, hour, posts, rate_sum)
+        SELECT weekday, hour, COUNT(*), SUM(engagement_rate)
+        FROM posting_time_posts
+        WHERE post_id IN (SELECT value FROM json_each(?))
+        GROUP BY weekday, hour
+        ON CONFLICT (weekday, hour) DO UPDATE SET
+            posts = posts + excluded.posts, rate_sum = rate_sum + excluded.rate_sum
+    ''', (ids,))
+
+    with _cache_lock:
+        _generation += 1
+
+
+def build_model(conn) -> Dict:
+    """Shrunk weekday x hour scores plus the adjusted hour for every requested slot"""
+    counts = [[0] * 24 for _ in DAYS]
+    sums = [[0.0] * 24 for _ in DAYS]
+    for weekday, hour, posts, rate_sum in conn.execute(
+        "SELECT weekday, hour, posts, rate_sum FROM posting_time_stats WHERE posts > 0"
+    ):
+        counts[weekday][hour], sums[weekday][hour] = posts, rate_sum
+
+    total_posts = sum(map(sum, counts))
+    # Scores are in engagement-rate units once there is data, relative units before
+    baseline = sum(map(sum, sums)) / total_posts if total_posts else 1.0
+    baseline = baseline or 1.0
+    strength = config.POSTING_TIME_PRIOR_STRENGTH
+    scores = [
+        [
+            (sums[weekday][hour] + strength * baseline * _prior(weekday, hour)) / (counts[weekday][hour] + strength)
+            for hour in range(24)
+        ]
+        for weekday in range(len(DAYS))
+    ]
+
+    cutoff = config.POSTING_TIME_TOLERANCE * max(map(max, scores))
+    targets = []
+    for weekday in range(len(DAYS)):
+        optimal = [hour for hour in range(24) if scores[weekday][hour] >= cutoff]
+        # Keep an optimal hour, otherwise move to the nearest one (a day without any stays put)
+        targets.append([
+            min(optimal, key=lambda best: abs(best - hour)) if optimal else hour
+            for hour in range(24)
+        ])
+
+    return {'scores': scores, 'targets': targets, 'baseline': baseline,
+            'counts': counts, 'posts': total_posts}
+
+
+class PostingTimeOptimizer:
+    """Best posting times learned from post_metrics, cached per database"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or config.DB_PATH
+
+    def model(self) -> Dict:
+        now = time.time()
+        with _cache_lock:
+            entry = _model_cache.get(self.db_path)
+            generation = _generation
+        if entry and entry[1] == generation and now - entry[0] < config.POSTING_TIME_CACHE_TTL:
+            return entry[2]
+
+        model = build_model(get_connection(self.db_path))
+        with _cache_lock:
+            _model_cache[self.db_path] = (now, generation, model)
+        return model
+
+    def optimize(self, requested_time: datetime) -> datetime:
+        """Move requested_time to the nearest high-engagement hour of its day"""
+        hour = self.model()['targets'][requested_time.weekday()][requested_time.hour]
+        if hour == requested_time.hour:
+            return requested_time
+        return requested_time.replace(hour=hour, minute=0, second=0, microsecond=0)
+
+    def best_hour(self, weekday: int) -> int:
+        scores = self.model()['scores'][weekday]
+        return max(range(24), key=scores.__getitem__)
+
+    def best_slots(self, limit: int = 4) -> List[Dict]:
+        """Highest-scoring hour of the best days, with their lift over an average post"""
+        model = self.model()
+        best = [(weekday, self.best_hour(weekday)) for weekday in range(len(DAYS))]
+        cells = sorted(
+            ((model['scores'][weekday][hour], weekday, hour) for weekday, hour in best),
+            key=lambda cell: (-cell[0], cell[1]),
+        )[:limit]
+        return [{
+            'weekday': weekday,
+            'hour': hour,
+            'score': score,
+            'posts': model['counts'][weekday][hour],
+            'lift': score / model['baseline'] - 1,
+        } for score, weekday, hour in cells]
+
+    def refresh(self):
+        """Rebuild the whole matrix from the post rollups"""
+        with transaction(self.db_path) as conn:
+            update_posting_times(conn)
+
+
+def assign_slots(scores: List[List[float]], count: int, start: datetime, end: datetime,
+                 taken: Iterable[datetime] = (), min_spacing: timedelta = timedelta(0),
+                 max_per_day: Optional[int] = None, blackout_days: Iterable = ()) -> List[datetime]:
+    """Pick up to count on-the-hour slots in [start, end), best scores first.
+
+    Greedy over a heap of every candidate hour: the best remaining slot is taken
+    unless its day is full or it is within min_spacing of a taken slot
+    (existing posts in `taken` count too). blackout_days holds dates and/or
+    weekday numbers (Monday = 0). Returns the slots in time order.
+    """
+    blackout_dates = {day.date() if isinstance(day, datetime) else day
+                      for day in blackout_days if isinstance(day, date)}
+    blackout_weekdays = {day for day in blackout_days if isinstance(day, int)}
+
+    slot = start.replace(minute=0, second=0, microsecond=0)
+    if slot < start:
+        slot += timedelta(hours=1)
+    candidates = []
+    while slot < end:
+        if slot.date() not in blackout_dates and slot.weekday() not in blackout_weekdays:
+            candidates.append((-scores[slot.weekday()][slot.hour], slot))
+        slot += timedelta(hours=1)
+    heapq.heapify(candidates)
+
+    times = sorted(taken)
+    per_day = Counter(when.date() for when in times)
+    chosen = []
+    while candidates and len(chosen) < count:
+        _, slot = heapq.heappop(candidates)
+        if max_per_day is not None and per_day[slot.date()] >= max_per_day:
+            continue
+        index = bisect.bisect_left(times, slot)
+        if index > 0 and slot - times[index - 1] < min_spacing:
+            continue
+        if index < len(times) and times[index] - slot < min_spacing:
+            continue
+        times.insert(index, slot)
+        per_day[slot.date()] += 1
+        chosen.append(slot)
+    return sorted(chosen)
+
+
+def create_posting_time_tables(conn):
+    """Migration step: engagement by weekday and hour, built from existing history"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS posting_time_posts (
+            post_id INTEGER PRIMARY KEY,
+            weekday INTEGER NOT NULL,
+            hour INTEGER NOT NULL,
+            engagement_rate REAL NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS posting_time_stats (
+            weekday INTEGER NOT NULL,
+            hour INTEGER NOT NULL,
+            posts INTEGER NOT NULL,
+            rate_sum REAL NOT NULL,
+            PRIMARY KEY (weekday, hour)
+        ) WITHOUT ROWID
+    ''')
+    update_posting_times(conn)
@@ -1,11 +1,16 @@
 import json
+import os
 from llm_helper import llm
+from config import Config
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.exceptions import OutputParserException
 
 
-def process_posts(raw_file_path, processed_file_path=None):
+config = Config()
+
+
+def process_posts(raw_file_path, processed_file_path=None, aliases_file_path=None):
     with open(raw_file_path, encoding='utf-8') as file:
         posts = json.load(file)
         enriched_posts = []
@@ -20,8 +25,22 @@ def process_posts(raw_file_path, processed_file_path=None):
         new_tags = {unified_tags[tag] for tag in current_tags}
         post['tags'] = list(new_tags)
 
-    with open(processed_file_path, encoding='utf-8', mode="w") as outfile:
-        json.dump(enriched_posts, outfile, indent=4)
+    # Keep the original -> unified mapping so few-shot queries can fall back to aliases
+    _write_json_atomic(unified_tags, aliases_file_path or config.TAG_ALIASES_PATH)
+    _write_json_atomic(enriched_posts, processed_file_path)
+
+    # Servers reading the memory-mapped store pick up the rebuilt file on their next check
+    if os.path.exists(config.CORPUS_STORE_PATH):
+        from few_shot import build_corpus_store
+        build_corpus_store(processed_file_path, config.CORPUS_STORE_PATH)
+
+
+def _write_json_atomic(data, file_path):
+    # Write to a temp file and rename so running servers never read a partial file
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, encoding='utf-8', mode="w") as outfile:
+        json.dump(data, outfile, indent=4)
+    os.replace(tmp_path, file_path)
 
 
 def extract_metadata(post):
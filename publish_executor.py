@@ -0,0 +1,162 @@
+"""
+Concurrent publishing with per-platform worker pools
+
+Each platform gets its own bounded thread pool and token-bucket rate limiter,
+so a slow or throttled platform only delays its own posts. Each call is
+bracketed by idempotency-ledger writes, and results are written back to the
+publish queue, together with an attempt record for the scheduler metrics,
+from the worker threads.
+"""
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_for
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from database import transaction
+from publish_ledger import PublishLedger, as_result, idempotency_key
+from publish_queue import PublishQueue
+from retry_policy import classify, next_retry, policy_for
+from scheduler_metrics import SchedulerMetrics
+
+config = Config()
+
+
+def platform_key(platform: Optional[str]) -> str:
+    """'LinkedIn' -> 'linkedin', 'Twitter/X' -> 'twitter'"""
+    return (platform or 'linkedin').lower().split('/')[0].strip()
+
+
+class RateLimiter:
+    """Token bucket: `rate` requests per second with bursts of up to `burst`"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be made"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+class PublishExecutor:
+    """Runs publish jobs in per-platform pools and reports results to the queue"""
+
+    def __init__(self, queue: PublishQueue, publish: Callable[..., Dict],
+                 limits: Optional[Dict[str, Dict]] = None):
+        self.queue = queue
+        self.ledger = PublishLedger(queue.db_path)
+        self.metrics = SchedulerMetrics(queue.db_path)
+        self.publish = publish
+        self.limits = limits or config.PUBLISH_LIMITS
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._lock = threading.Lock()
+        self._busy = Counter()
+        self._sampled = time.monotonic()
+
+    def _pool(self, platform: str):
+        key = platform_key(platform)
+        with self._lock:
+            if key not in self._pools:
+                limit = self.limits.get(key, self.limits['default'])
+                self._pools[key] = ThreadPoolExecutor(max_workers=limit['workers'],
+                                                      thread_name_prefix=f"publish-{key}")
+                self._limiters[key] = RateLimiter(limit['rate_per_minute'] / 60.0, limit['workers'])
+            return self._pools[key], self._limiters[key]
+
+    def _run(self, job: Dict, owner: str, limiter: RateLimiter) -> Dict:
+        key = idempotency_key(job['content'], job['id'])
+        prior = self.ledger.begin(key, job['id'], job['platform'], owner=owner)
+        if prior is not None:
+            return self._skip(job, owner, prior)
+
+        limiter.acquire()
+        started = datetime.now()
+        try:
+            result = self.publish(job['platform'], job['content'], job['media_urls'])
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        finished = datetime.now()
+        with self._lock:
+            self._busy[platform_key(job['platform'])] += (finished - started).total_seconds()
+
+        if result.get('success'):
+            self.ledger.succeed(key, result)
+        else:
+            self.ledger.fail(key, result.get('error', 'Unknown error'))
+
+        with transaction(self.queue.db_path):
+            if result.get('success'):
+                self.queue.complete(job['id'], owner, result)
+                result['status'] = 'published'
+            else:
+                result['retry_at'] = next_retry(platform_key(job['platform']), result, job['attempts'])
+                error = f"[{classify(result)}] {result.get('error', 'Unknown error')}"
+                result['status'] = self.queue.fail(job['id'], owner, error, result['retry_at'])
+            self.metrics.record_attempt(job, started, finished, result['status'], owner)
+        return result
+
+    def _skip(self, job: Dict, owner: str, prior: Dict) -> Dict:
+        """Settle a job whose publish the ledger says already happened or is unresolved"""
+        result = as_result(prior)
+        if prior['state'] == 'succeeded':
+            self.queue.complete(job['id'], owner, result)
+            result['status'] = 'published'
+        elif prior['state'] == 'started':
+            # Another worker is mid-call (our lease was reclaimed); check again after its lease,
+            # within the retry policy's attempt budget
+            policy = policy_for(platform_key(job['platform']), 'in_flight')
+            if job['attempts'] < policy['max_attempts']:
+                result['retry_at'] = datetime.now() + timedelta(seconds=config.SCHEDULER_LEASE_SECONDS)
+            else:
+                result['retry_at'] = None
+            result['status'] = self.queue.fail(job['id'], owner, "[in_flight] publish already in progress",
+                                               result['retry_at'])
+        else:
+            result['retry_at'] = None
+            result['status'] = self.queue.fail(job['id'], owner, "[unknown] a worker stopped mid-publish; "
+                                               "check the platform before rescheduling")
+        return result
+
+    def submit(self, job: Dict, owner: str) -> Future:
+        """Publish a claimed job on its platform's pool; the future resolves to the result"""
+        pool, limiter = self._pool(job['platform'])
+        return pool.submit(self._run, job, owner, limiter)
+
+    def publish_many(self, jobs: List[Dict], owner: str) -> List[Dict]:
+        """Publish claimed jobs concurrently and wait for all of them"""
+        futures = [self.submit(job, owner) for job in jobs]
+        wait_for(futures)
+        return [future.result() for future in futures]
+
+    def utilisation(self) -> Dict[str, Tuple[float, float]]:
+        """(busy, capacity) worker-seconds per platform pool since the last call"""
+        with self._lock:
+            now = time.monotonic()
+            elapsed, self._sampled = now - self._sampled, now
+            busy, self._busy = self._busy, Counter()
+            return {
+                key: (busy.get(key, 0.0), self.limits.get(key, self.limits['default'])['workers'] * elapsed)
+                for key in self._pools
+            }
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.shutdown(wait=wait)
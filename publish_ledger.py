@@ -0,0 +1,136 @@
+"""
+Idempotency ledger for publishing
+
+Every external publish call is bracketed by ledger writes keyed on an
+idempotency key (content hash plus schedule id): 'started' before the call,
+'succeeded' or 'failed' after it. A retried or reclaimed job checks the ledger
+first and skips work that already completed, so crashes between the platform
+call and the queue update, or double-clicked buttons, never publish twice.
+
+A 'started' entry older than a lease, whose job no live worker holds, means
+the outcome is unknown (the worker died mid-call); it is marked 'unknown' and
+left for a human to check rather than risking a duplicate post. Callers that
+pass a reuse window (immediate publishes) may publish again once an 'unknown'
+entry is older than that window, like a succeeded one.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from config import Config
+from database import get_connection, transaction
+from dedup import content_hash
+from migrations import migrate
+
+config = Config()
+
+_COLUMNS = "idempotency_key, job_id, platform, state, external_post_id, post_url, error, started_at, finished_at"
+
+
+def idempotency_key(content: str, schedule_id: Optional[int] = None, platform: Optional[str] = None) -> str:
+    """content hash + schedule id for queued jobs, content hash + platform for immediate publishes"""
+    suffix = schedule_id if schedule_id is not None else f"now:{platform}"
+    return f"{content_hash(content)}:{suffix}"
+
+
+def as_result(entry: Dict) -> Dict:
+    """Publish result reconstructed from a ledger entry"""
+    return {
+        'success': entry['state'] == 'succeeded',
+        'post_id': entry['external_post_id'],
+        'url': entry['post_url'],
+        'platform': entry['platform'],
+        'error': entry['error'],
+        'duplicate': True
+    }
+
+
+class PublishLedger:
+    """Before/after records of external publish calls"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or config.DB_PATH
+        migrate(self.db_path)
+
+    def get(self, key: str) -> Optional[Dict]:
+        row = get_connection(self.db_path).execute(
+            f"SELECT {_COLUMNS} FROM publish_ledger WHERE idempotency_key = ?", (key,)
+        ).fetchone()
+        return dict(zip([column.strip() for column in _COLUMNS.split(",")], row)) if row else None
+
+    def begin(self, key: str, job_id: Optional[int], platform: str,
+              reuse_seconds: Optional[float] = None, owner: Optional[str] = None) -> Optional[Dict]:
+        """Record a publish as started, or return the entry that makes it unnecessary.
+
+        None means go ahead. Otherwise the returned entry's state says why not:
+        'succeeded' (already published), 'started' (in flight elsewhere) or
+        'unknown' (a worker died mid-call). With reuse_seconds, succeeded and
+        unknown entries only count while they are that recent. owner is the
+        caller's own lease on the job, which never keeps a stale entry alive.
+        """
+        now = datetime.now()
+        with transaction(self.db_path) as conn:
+            entry = self.get(key)
+            if entry:
+                started = datetime.fromisoformat(str(entry['started_at']))
+                finished = datetime.fromisoformat(str(entry['finished_at'])) if entry['finished_at'] else None
+                if entry['state'] in ('succeeded', 'unknown'):
+                    if reuse_seconds is None or now - finished < timedelta(seconds=reuse_seconds):
+                        return entry
+                elif entry['state'] == 'started':
+                    if now - started < timedelta(seconds=config.SCHEDULER_LEASE_SECONDS):
+                        return entry
+                    if self._lease_held(conn, entry['job_id'], owner, now):
+                        return entry  # a slow call; the worker's heartbeat keeps the lease alive
+                    conn.execute(
+                        "UPDATE publish_ledger SET state = 'unknown', finished_at = ? WHERE idempotency_key = ?",
+                        (now, key)
+                    )
+                    entry['state'] = 'unknown'
+                    entry['finished_at'] = now
+                    return entry
+
+            conn.execute('''
+                INSERT INTO publish_ledger (idempotency_key, job_id, platform, state, started_at)
+                VALUES (?, ?, ?, 'started', ?)
+                ON CONFLICT (idempotency_key) DO UPDATE SET
+                    state = 'started', started_at = excluded.started_at, finished_at = NULL, error = NULL
+            ''', (key, job_id, platform, now))
+        return None
+
+    @staticmethod
+    def _lease_held(conn, job_id: Optional[int], owner: Optional[str], now: datetime) -> bool:
+        """Whether a worker other than owner still holds an unexpired lease on the job"""
+        if job_id is None:
+            return False
+        return conn.execute('''
+            SELECT 1 FROM scheduled_posts
+            WHERE id = ? AND status = 'publishing' AND lease_expires_at > ? AND lease_owner IS NOT ?
+        ''', (job_id, now, owner)).fetchone() is not None
+
+    def succeed(self, key: str, result: Dict):
+        with transaction(self.db_path) as conn:
+            conn.execute('''
+                UPDATE publish_ledger
+                SET state = 'succeeded', external_post_id = ?, post_url = ?, error = NULL, finished_at = ?
+                WHERE idempotency_key = ?
+            ''', (result.get('post_id'), result.get('url'), datetime.now(), key))
+
+    def fail(self, key: str, error: str):
+        """A definite failure: nothing was published, so the key may be retried"""
+        with transaction(self.db_path) as conn:
+            conn.execute(
+                "UPDATE publish_ledger SET state = 'failed', error = ?, finished_at = ? WHERE idempotency_key = ?",
+                (error, datetime.now(), key)
+            )
+
+    def reconcile(self) -> int:
+        """Mark queued jobs published when the ledger shows their publish succeeded"""
+        with transaction(self.db_path) as conn:
+            return conn.execute('''
+                UPDATE scheduled_posts
+                SET status = 'published', published_at = l.finished_at, post_url = l.post_url,
+                    error_message = NULL, lease_owner = NULL, lease_expires_at = NULL
+                FROM publish_ledger l
+                WHERE l.job_id = scheduled_posts.id AND l.state = 'succeeded'
+                  AND scheduled_posts.status IN ('pending', 'publishing')
+            ''').rowcount
@@ -0,0 +1,230 @@
+"""
+Durable publish queue on top of the scheduled_posts table
+
+Both schedulers (``LinkedInScheduler`` and ``api_integrations.ContentScheduler``)
+enqueue into ``scheduled_posts``, so there is a single queue. Workers claim due
+jobs atomically with ``UPDATE ... RETURNING``, which moves them to
+'publishing' under a time-limited lease. If a worker dies mid-publish its lease
+expires and the job returns to 'pending' for another worker.
+
+Job states: pending -> publishing -> published | pending (retry) | dead_letter,
+or cancelled.
+"""
+import json
+import os
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from database import get_connection, transaction
+from dedup import store_post
+from migrations import migrate
+
+config = Config()
+
+_JOB_COLUMNS = ("id, post_id, platform, scheduled_time, status, attempts, media_urls, "
+                "lease_owner, lease_expires_at, published_at, post_url, error_message")
+
+
+def worker_id() -> str:
+    """Identifier for the calling thread, used as the lease owner"""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def _timestamp(value) -> datetime:
+    """Scheduled times are stored in one text format so they compare correctly in SQL"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+def _job(row) -> Dict:
+    job = dict(zip([column.strip() for column in _JOB_COLUMNS.split(",")], row))
+    job['media_urls'] = json.loads(job['media_urls']) if job['media_urls'] else []
+    return job
+
+
+class PublishQueue:
+    """Scheduled publish jobs with atomic, leased claiming"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or config.DB_PATH
+        migrate(self.db_path)
+
+    def enqueue(self, post_id: int, scheduled_time, platform: str = 'linkedin',
+                media_urls: Optional[List[str]] = None, optimal_time_adjusted: bool = False) -> int:
+        """Add a job for a saved post; returns the job (schedule) id"""
+        with transaction(self.db_path) as conn:
+            cursor = conn.execute('''
+                INSERT INTO scheduled_posts (post_id, scheduled_time, platform, media_urls, optimal_time_adjusted)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (post_id, _timestamp(scheduled_time), platform,
+                  json.dumps(media_urls) if media_urls else None, optimal_time_adjusted))
+            return cursor.lastrowid
+
+    def enqueue_many(self, items: List[Tuple[int, datetime]], platform: str = 'linkedin',
+                     optimal_time_adjusted: bool = False) -> List[int]:
+        """Add jobs for (post_id, scheduled_time) pairs in one transaction; returns their ids"""
+        with transaction(self.db_path) as conn:
+            return [
+                self.enqueue(post_id, scheduled_time, platform, optimal_time_adjusted=optimal_time_adjusted)
+                for post_id, scheduled_time in items
+            ]
+
+    def enqueue_content(self, content: str, scheduled_time, platform: str = 'linkedin',
+                        media_urls: Optional[List[str]] = None) -> int:
+        """Save content to the library (reusing an identical post) and enqueue it"""
+        with transaction(self.db_path) as conn:
+            post_id = store_post(conn, content)
+            return self.enqueue(post_id, scheduled_time, platform, media_urls)
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        row = get_connection(self.db_path).execute(
+            f"SELECT {_JOB_COLUMNS} FROM scheduled_posts WHERE id = ?", (job_id,)
+        ).fetchone()
+        return _job(row) if row else None
+
+    def _with_content(self, conn, jobs: List[Dict]) -> List[Dict]:
+        if jobs:
+            placeholders = ", ".join("?" for _ in jobs)
+            contents = dict(conn.execute(
+                f"SELECT id, content FROM posts WHERE id IN ({placeholders})",
+                [job['post_id'] for job in jobs]
+            ).fetchall())
+            for job in jobs:
+                job['content'] = contents.get(job['post_id'])
+        return jobs
+
+    def claim(self, job_id: int, owner: str, lease_seconds: Optional[float] = None) -> Optional[Dict]:
+        """Claim one specific job if it is pending and due"""
+        now = datetime.now()
+        lease_until = now + timedelta(seconds=lease_seconds or config.SCHEDULER_LEASE_SECONDS)
+        with transaction(self.db_path) as conn:
+            rows = conn.execute(f'''
+                UPDATE scheduled_posts
+                SET status = 'publishing', lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1
+                WHERE id = ? AND status = 'pending' AND scheduled_time <= ?
+                RETURNING {_JOB_COLUMNS}
+            ''', (owner, lease_until, job_id, now)).fetchall()
+            jobs = self._with_content(conn, [_job(row) for row in rows])
+        return jobs[0] if jobs else None
+
+    def claim_due(self, owner: str, limit: int = 10, lease_seconds: Optional[float] = None) -> List[Dict]:
+        """Atomically claim up to limit due jobs, earliest first (recovering expired leases first)"""
+        now = datetime.now()
+        lease_until = now + timedelta(seconds=lease_seconds or config.SCHEDULER_LEASE_SECONDS)
+        with transaction(self.db_path) as conn:
+            self._recover(conn, now)
+            rows = conn.execute(f'''
+                UPDATE scheduled_posts
+                SET status = 'publishing', lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1
+                WHERE id IN (
+                    SELECT id FROM scheduled_posts
+                    WHERE status = 'pending' AND scheduled_time <= ?
+                    ORDER BY scheduled_time
+                    LIMIT ?
+                )
+                RETURNING {_JOB_COLUMNS}
+            ''', (owner, lease_until, now, limit)).fetchall()
+            jobs = self._with_content(conn, [_job(row) for row in rows])
+        return sorted(jobs, key=lambda job: job['scheduled_time'])
+
+    def recover_expired(self) -> int:
+        """Return jobs whose worker's lease ran out to 'pending'"""
+        with transaction(self.db_path) as conn:
+            return self._recover(conn, datetime.now())
+
+    @staticmethod
+    def _recover(conn, now: datetime) -> int:
+        return conn.execute('''
+            UPDATE scheduled_posts
+            SET status = 'pending', lease_owner = NULL, lease_expires_at = NULL
+            WHERE status = 'publishing' AND lease_expires_at < ?
+        ''', (now,)).rowcount
+
+    def complete(self, job_id: int, owner: str, result: Dict) -> bool:
+        """Record a successful publish; False if the lease was lost to another worker"""
+        with transaction(self.db_path) as conn:
+            return conn.execute('''
+                UPDATE scheduled_posts
+                SET status = 'published', published_at = ?, post_url = ?, error_message = NULL,
+                    lease_owner = NULL, lease_expires_at = NULL
+                WHERE id = ? AND status = 'publishing' AND lease_owner = ?
+            ''', (datetime.now(), result.get('url'), job_id, owner)).rowcount == 1
+
+    def fail(self, job_id: int, owner: str, error: str, retry_at: Optional[datetime] = None) -> Optional[str]:
+        """Record a failed attempt.
+
+        With retry_at the job goes back to 'pending', due at retry_at, where
+        any dispatcher's next poll of pending due jobs picks it up again;
+        without it the job is dead-lettered.
+        Returns the job's new status, or None if the lease was lost.
+        """
+        with transaction(self.db_path) as conn:
+            row = conn.execute('''
+                UPDATE scheduled_posts
+                SET status = CASE WHEN ? IS NULL THEN 'dead_letter' ELSE 'pending' END,
+                    scheduled_time = COALESCE(?, scheduled_time),
+                    error_message = ?, lease_owner = NULL, lease_expires_at = NULL
+                WHERE id = ? AND status = 'publishing' AND lease_owner = ?
+                RETURNING status
+            ''', (retry_at, retry_at, error, job_id, owner)).fetchall()
+        return row[0][0] if row else None
+
+    def cancel(self, job_id: int) -> Optional[Dict]:
+        """Cancel a pending job; returns the cancelled job, None if it was not pending"""
+        with transaction(self.db_path) as conn:
+            row = conn.execute(f'''
+                UPDATE scheduled_posts SET status = 'cancelled'
+                WHERE id = ? AND status = 'pending'
+                RETURNING {_JOB_COLUMNS}
+            ''', (job_id,)).fetchall()
+        return _job(row[0]) if row else None
+
+    def list_jobs(self, status: Optional[str] = None, cursor: Optional[List] = None,
+                  page_size: int = 20) -> Dict:
+        """One page of jobs in due-time order, using keyset pagination.
+
+        cursor is the (scheduled_time, id) of the last job on the previous page,
+        as returned in next_cursor; None starts from the earliest job.
+        """
+        conditions, params = [], []
+        if status:
+            conditions.append("sp.status = ?")
+            params.append(status)
+        if cursor:
+            conditions.append("(sp.scheduled_time, sp.id) > (?, ?)")
+            params.extend(cursor)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        conn = get_connection(self.db_path)
+        columns = ", ".join(f"sp.{column.strip()}" for column in _JOB_COLUMNS.split(","))
+        rows = conn.execute(f'''
+            SELECT {columns}
+            FROM scheduled_posts sp
+            {where}
+            ORDER BY sp.scheduled_time, sp.id
+            LIMIT ?
+        ''', params + [page_size + 1]).fetchall()
+
+        jobs = self._with_content(conn, [_job(row) for row in rows[:page_size]])
+        next_cursor = None
+        if len(rows) > page_size:
+            next_cursor = [jobs[-1]['scheduled_time'], jobs[-1]['id']]
+
+        return {'jobs': jobs, 'next_cursor': next_cursor}
+
+    def status_counts(self, since=None) -> Dict[str, int]:
+        """Number of jobs per status (published ones only since `since`, when given)"""
+        conn = get_connection(self.db_path)
+        counts = dict(conn.execute(
+            "SELECT status, COUNT(*) FROM scheduled_posts GROUP BY status"
+        ).fetchall())
+        if since is not None:
+            counts['published'] = conn.execute(
+                "SELECT COUNT(*) FROM scheduled_posts WHERE status = 'published' AND published_at >= ?",
+                (_timestamp(since),)
+            ).fetchone()[0]
+        return counts
@@ -187,7 +187,11 @@ What's your take on this transformation? Share your thoughts below! 👇
                             with st.spinner("📡 Publishing to platform..."):
                                 result = scheduler.publish_now(selected_platform, content)
                                 
-                                if result['success']:
+                                if result.get('duplicate') and result['success']:
+                                    st.info("ℹ️ Already published - showing the original post")
+                                    if result.get('url'):
+                                        st.markdown(f"🔗 [View Post]({result['url']})")
+                                elif result['success']:
                                     st.success(f"✅ Published successfully!")
                                     if 'url' in result:
                                         st.markdown(f"🔗 [View Post]({result['url']})")
@@ -302,21 +306,22 @@ What's your take on this transformation? Share your thoughts below! 👇
         st.markdown("*Schedule and manage posts across all platforms*")
         
         # Scheduled posts overview
-        scheduled_posts = scheduler.get_scheduled_posts()
+        status_counts = scheduler.get_status_counts()
         
         col1, col2, col3 = st.columns(3)
         with col1:
-            st.metric("Scheduled Posts", len([p for p in scheduled_posts if p['status'] == 'scheduled']))
+            st.metric("Scheduled Posts", status_counts.get('pending', 0))
         with col2:
-            st.metric("Published Today", len([p for p in scheduled_posts if p['status'] == 'published']))
+            st.metric("Published Today", status_counts.get('published', 0))
         with col3:
-            st.metric("Failed Posts", len([p for p in scheduled_posts if p['status'] == 'failed']))
+            st.metric("Failed Posts", status_counts.get('dead_letter', 0) + status_counts.get('failed', 0))
         
         # Upcoming posts
         st.markdown("### 📋 Upcoming Posts")
         
+        scheduled_posts = scheduler.get_scheduled_posts(status='pending', limit=5)
         if scheduled_posts:
-            for post in scheduled_posts[-5:]:  # Show last 5 posts
+            for post in scheduled_posts:  # Show next 5 posts
                 with st.container():
                     col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
                     
@@ -324,7 +329,7 @@ What's your take on this transformation? Share your thoughts below! 👇
                         st.markdown(f"**{post['content'][:60]}...**")
                     
                     with col2:
-                        platform_icon = config.PLATFORMS[post['platform']]['icon']
+                        platform_icon = config.PLATFORMS.get(post['platform'], {}).get('icon', '📝')
                         st.markdown(f"{platform_icon} {post['platform']}")
                     
                     with col3:
@@ -333,9 +338,11 @@ What's your take on this transformation? Share your thoughts below! 👇
                     
                     with col4:
                         status_colors = {
-                            'scheduled': 'orange',
+                            'pending': 'orange',
+                            'publishing': 'blue',
                             'published': 'green',
                             'failed': 'red',
+                            'dead_letter': 'red',
                             'cancelled': 'gray'
                         }
                         color = status_colors.get(post['status'], 'blue')
@@ -0,0 +1,76 @@
+"""
+Retry policies for failed publishes
+
+Failures are classified from the platform response and retried with
+exponential backoff and full jitter (a uniformly random delay up to the
+backoff cap), so retries from many jobs spread out instead of arriving in
+bursts. A Retry-After from the platform is honoured as a minimum delay. When
+a policy gives up the job is dead-lettered with its error.
+"""
+import random
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from config import Config
+
+config = Config()
+
+# Error classes that are never worth retrying
+PERMANENT = {'auth', 'client'}
+
+
+def classify(result: Dict) -> str:
+    """Error class of a failed publish result: rate_limited, server, auth, client or network"""
+    status = result.get('status_code')
+    if status is None:
+        return 'network'
+    if status == 429:
+        return 'rate_limited'
+    if status in (401, 403):
+        return 'auth'
+    if status >= 500 or status == 408:
+        return 'server'
+    return 'client'
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Seconds from a Retry-After header value (delta-seconds or HTTP date)"""
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    now = datetime.now(when.tzinfo) if when.tzinfo else datetime.now()
+    return max((when - now).total_seconds(), 0.0)
+
+
+def policy_for(platform: str, error_class: str) -> Dict:
+    """Retry policy for a platform and error class, falling back to the defaults"""
+    policies = config.RETRY_POLICIES
+    merged = dict(policies['default'].get('default', {}))
+    merged.update(policies['default'].get(error_class, {}))
+    platform_policies = policies.get(platform, {})
+    merged.update(platform_policies.get('default', {}))
+    merged.update(platform_policies.get(error_class, {}))
+    return merged
+
+
+def next_retry(platform: str, result: Dict, attempts: int) -> Optional[datetime]:
+    """When to retry after `attempts` failed attempts, or None to dead-letter the job"""
+    error_class = classify(result)
+    policy = policy_for(platform, error_class)
+    if error_class in PERMANENT or attempts >= policy['max_attempts']:
+        return None
+
+    cap = min(policy['max_delay'], policy['base_delay'] * 2 ** (attempts - 1))
+    delay = random.uniform(0, cap)
+    retry_after = parse_retry_after(result.get('retry_after'))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return datetime.now() + timedelta(seconds=delay)
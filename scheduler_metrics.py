@@ -0,0 +1,142 @@
+"""
+Scheduler lag and throughput instrumentation
+
+Every platform call made by the publish executor is recorded in
+``publish_attempts`` (due time, start, finish, outcome) in the same
+transaction that settles the job. Dispatchers periodically sample their pool
+utilisation, and the leader samples queue depth per platform. ``report``
+turns these into the lag histogram, latency, attempt and utilisation figures
+shown in the calendar's Insights tab.
+"""
+import math
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from database import get_connection, transaction
+from migrations import migrate
+
+config = Config()
+
+# Upper bounds (seconds) of the scheduled-vs-actual lag histogram buckets
+LAG_BUCKETS = [(1, "<1s"), (5, "1-5s"), (30, "5-30s"), (60, "30s-1m"), (300, "1-5m"),
+               (900, "5-15m"), (3600, "15m-1h"), (None, "1h+")]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+
+def _lag_bucket(seconds: float) -> str:
+    for bound, label in LAG_BUCKETS:
+        if bound is None or seconds < bound:
+            return label
+
+
+class SchedulerMetrics:
+    """Publish attempts and periodic samples of the scheduler's state"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or config.DB_PATH
+        migrate(self.db_path)
+
+    def record_attempt(self, job: Dict, started_at: datetime, finished_at: datetime,
+                       outcome: Optional[str], worker: Optional[str] = None):
+        """One platform call for a job (joins the caller's transaction, if any)"""
+        with transaction(self.db_path) as conn:
+            conn.execute('''
+                INSERT INTO publish_attempts (job_id, platform, attempt, due_at, started_at, finished_at, outcome, worker)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (job['id'], job['platform'], job['attempts'], job['scheduled_time'],
+                  started_at, finished_at, outcome or 'lease_lost', worker))
+
+    def sample(self, worker: str, utilisation: Dict[str, Tuple[float, float]], queue_depth: bool = False):
+        """Store a worker's (busy, capacity) seconds per platform, plus queue depth when asked (leader)"""
+        now = datetime.now()
+        with transaction(self.db_path) as conn:
+            conn.executemany('''
+                INSERT INTO worker_utilization (sampled_at, worker_id, platform, busy_seconds, capacity_seconds)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(now, worker, platform, busy, capacity) for platform, (busy, capacity) in utilisation.items()])
+            if queue_depth:
+                conn.execute('''
+                    INSERT INTO queue_depth_samples (sampled_at, platform, pending, due, publishing)
+                    SELECT ?, platform,
+                           SUM(status = 'pending'),
+                           SUM(status = 'pending' AND scheduled_time <= ?),
+                           SUM(status = 'publishing')
+                    FROM scheduled_posts
+                    WHERE status IN ('pending', 'publishing')
+                    GROUP BY platform
+                ''', (now, now))
+                self._prune(conn, now)
+
+    @staticmethod
+    def _prune(conn, now: datetime):
+        cutoff = now - timedelta(days=config.SCHEDULER_METRICS_RETENTION_DAYS)
+        conn.execute("DELETE FROM publish_attempts WHERE finished_at < ?", (cutoff,))
+        conn.execute("DELETE FROM worker_utilization WHERE sampled_at < ?", (cutoff,))
+        conn.execute("DELETE FROM queue_depth_samples WHERE sampled_at < ?", (cutoff,))
+
+    def report(self, days: int = 7) -> Dict:
+        """Lag, latency, attempts, queue depth and utilisation over the last `days` days"""
+        since = datetime.now() - timedelta(days=days)
+        conn = get_connection(self.db_path)
+
+        # Actual publish time against the original schedule (the earliest due time, before retries)
+        published = conn.execute('''
+            SELECT platform,
+                   (julianday(MAX(CASE WHEN outcome = 'published' THEN finished_at END)) - julianday(MIN(due_at))) * 86400,
+                   MAX(attempt)
+            FROM publish_attempts
+            WHERE job_id IN (SELECT job_id FROM publish_attempts WHERE outcome = 'published' AND finished_at >= ?)
+            GROUP BY job_id
+        ''', (since,)).fetchall()
+        lags = sorted(max(lag, 0.0) for _, lag, _ in published)
+        histogram = Counter(_lag_bucket(lag) for lag in lags)
+
+        latency = {}
+        for platform, seconds in conn.execute('''
+            SELECT platform, (julianday(finished_at) - julianday(started_at)) * 86400
+            FROM publish_attempts WHERE finished_at >= ?
+        ''', (since,)):
+            latency.setdefault(platform, []).append(seconds)
+
+        depth = conn.execute('''
+            SELECT sampled_at, SUM(pending), SUM(due), SUM(publishing)
+            FROM queue_depth_samples WHERE sampled_at >= ?
+            GROUP BY sampled_at ORDER BY sampled_at
+        ''', (since,)).fetchall()
+
+        return {
+            'published': len(lags),
+            'lag': {
+                'p50': _percentile(lags, 0.5),
+                'p90': _percentile(lags, 0.9),
+                'p99': _percentile(lags, 0.99),
+                'on_time': sum(lag < 60 for lag in lags) / len(lags) if lags else 0.0,
+                'histogram': {label: histogram.get(label, 0) for _, label in LAG_BUCKETS},
+            },
+            'latency': {
+                platform: {'calls': len(values), 'avg': sum(values) / len(values),
+                           'p90': _percentile(sorted(values), 0.9)}
+                for platform, values in latency.items()
+            },
+            'attempts': dict(Counter(attempts for _, _, attempts in published)),
+            'outcomes': dict(conn.execute(
+                "SELECT outcome, COUNT(*) FROM publish_attempts WHERE finished_at >= ? GROUP BY outcome", (since,)
+            ).fetchall()),
+            'queue_depth': [
+                {'sampled_at': sampled_at, 'pending': pending, 'due': due, 'publishing': publishing}
+                for sampled_at, pending, due, publishing in depth
+            ],
+            'utilization': dict(conn.execute('''
+                SELECT platform, SUM(busy_seconds) / SUM(capacity_seconds)
+                FROM worker_utilization WHERE sampled_at >= ? AND capacity_seconds > 0
+                GROUP BY platform
+            ''', (since,)).fetchall()),
+        }
@@ -0,0 +1,76 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from database import close_connections, transaction
+from linkedin_scheduler import LinkedInScheduler
+from posting_times import assign_slots
+
+# Mornings are best: 9:00 > 10:00 > 11:00 > every other hour
+SCORES = [[{9: 10.0, 10: 9.0, 11: 8.0}.get(hour, 1.0) for hour in range(24)] for _ in range(7)]
+MONDAY = datetime(2030, 1, 7)
+
+
+def test_best_slots_first_returned_in_time_order():
+    slots = assign_slots(SCORES, 3, MONDAY, MONDAY + timedelta(days=1))
+    assert slots == [MONDAY.replace(hour=9), MONDAY.replace(hour=10), MONDAY.replace(hour=11)]
+
+
+def test_per_day_cap_spreads_posts_over_days():
+    slots = assign_slots(SCORES, 3, MONDAY, MONDAY + timedelta(days=3), max_per_day=1)
+    assert slots == [MONDAY.replace(hour=9) + timedelta(days=day) for day in range(3)]
+
+
+def test_spacing_counts_existing_posts():
+    taken = [MONDAY.replace(hour=10)]
+    slots = assign_slots(SCORES, 2, MONDAY, MONDAY + timedelta(days=1), taken=taken,
+                         min_spacing=timedelta(hours=2))
+    # 9:00 and 11:00 are within two hours of the existing 10:00 post; ties go to the earliest hour
+    assert slots == [MONDAY.replace(hour=0), MONDAY.replace(hour=2)]
+
+
+def test_blackout_dates_and_weekdays_are_skipped():
+    slots = assign_slots(SCORES, 3, MONDAY, MONDAY + timedelta(days=7), max_per_day=1,
+                         blackout_days=[date(2030, 1, 8), 2])
+    assert [slot.date() for slot in slots] == [date(2030, 1, 7), date(2030, 1, 10), date(2030, 1, 11)]
+
+
+def test_start_mid_hour_rounds_up_and_short_windows_return_fewer():
+    slots = assign_slots(SCORES, 5, MONDAY.replace(hour=9, minute=30), MONDAY.replace(hour=12))
+    assert slots == [MONDAY.replace(hour=10), MONDAY.replace(hour=11)]
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    path = str(tmp_path / "test.db")
+    scheduler = LinkedInScheduler(path)
+    with transaction(path) as conn:
+        scheduler.post_ids = [
+            conn.execute("INSERT INTO posts (content) VALUES (?)", (f"Batch {i}",)).lastrowid
+            for i in range(6)
+        ]
+    yield scheduler
+    close_connections(path)
+
+
+def test_schedule_batch_respects_constraints_and_post_order(scheduler):
+    start = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    scheduled = scheduler.schedule_batch(scheduler.post_ids, start=start, min_spacing_hours=3, max_per_day=2)
+
+    assert [item['post_id'] for item in scheduled] == scheduler.post_ids
+    times = [item['scheduled_time'] for item in scheduled]
+    assert times == sorted(times) and times[0] >= start
+    assert all(b - a >= timedelta(hours=3) for a, b in zip(times, times[1:]))
+    per_day = {}
+    for when in times:
+        per_day[when.date()] = per_day.get(when.date(), 0) + 1
+    assert max(per_day.values()) <= 2
+    assert all(scheduler.queue.get(item['schedule_id'])['status'] == 'pending' for item in scheduled)
+
+
+def test_schedule_batch_with_a_fixed_end_that_cannot_fit(scheduler):
+    start = datetime(2030, 1, 7)
+    with pytest.raises(ValueError):
+        scheduler.schedule_batch(scheduler.post_ids, start=start, end=start + timedelta(days=1), max_per_day=2)
+    with pytest.raises(ValueError):
+        scheduler.schedule_batch(scheduler.post_ids, start=start, blackout_days=range(7))
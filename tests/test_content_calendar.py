@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from database import close_connections, get_connection, transaction
+from linkedin_scheduler import ContentCalendar
+
+
+@pytest.fixture
+def calendar(tmp_path):
+    path = str(tmp_path / "test.db")
+    calendar = ContentCalendar(path)
+    with transaction(path) as conn:
+        calendar.post_id = conn.execute(
+            "INSERT INTO posts (content, content_type) VALUES ('Calendar post', 'Tips')"
+        ).lastrowid
+    yield calendar
+    close_connections(path)
+
+
+def _schedule(calendar, when):
+    return calendar.scheduler.schedule_post(calendar.post_id, when, auto_optimize=False)
+
+
+def test_months_are_half_open_ranges(calendar):
+    _schedule(calendar, datetime(2030, 1, 31, 23, 30))
+    _schedule(calendar, datetime(2030, 1, 31, 8, 0))
+    _schedule(calendar, datetime(2030, 2, 1, 0, 0))
+    _schedule(calendar, datetime(2030, 12, 31, 12, 0))
+
+    assert calendar.get_calendar_data(2030, 1) == {'2030-01-31': {'post_count': 2, 'content_types': ['Tips', 'Tips']}}
+    assert list(calendar.get_calendar_data(2030, 2)) == ['2030-02-01']
+    assert list(calendar.get_calendar_data(2030, 12)) == ['2030-12-31']
+    assert calendar.get_calendar_data(2031, 1) == {}
+
+
+def test_schedule_and_cancel_invalidate_the_cached_month(calendar):
+    assert calendar.get_calendar_data(2030, 3) == {}
+    schedule_id = _schedule(calendar, datetime(2030, 3, 10, 9, 0))
+    assert calendar.get_calendar_data(2030, 3)['2030-03-10']['post_count'] == 1
+
+    assert calendar.scheduler.cancel_scheduled_post(schedule_id)
+    assert calendar.get_calendar_data(2030, 3) == {}
+    assert not calendar.scheduler.cancel_scheduled_post(schedule_id)
+
+
+def test_month_query_uses_the_time_index(calendar):
+    plan = get_connection(calendar.db_path).execute('''
+        EXPLAIN QUERY PLAN
+        SELECT DATE(scheduled_time), COUNT(*) FROM scheduled_posts
+        WHERE scheduled_time >= ? AND scheduled_time < ? AND status != 'cancelled'
+        GROUP BY DATE(scheduled_time)
+    ''', ("2030-01-01", "2030-02-01")).fetchall()
+    assert any("idx_scheduled_posts_time" in row[-1] and "scheduled_time>" in row[-1] for row in plan)
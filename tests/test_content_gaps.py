@@ -0,0 +1,34 @@
+from datetime import date
+
+import pytest
+
+from config import Config
+from content_gaps import iter_gaps
+from database import close_connections
+from migrations import migrate
+from publish_queue import PublishQueue
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    migrate(path)
+    yield path
+    close_connections(path)
+
+
+MONDAY = date(2030, 1, 7)
+
+
+def test_empty_calendar_is_all_gaps_when_grouped(db_path):
+    platforms = [platform for platform in Config.PUBLISH_LIMITS if platform != 'default']
+    gaps = list(iter_gaps(db_path, MONDAY, date(2030, 1, 8), by=('platform', 'content_type')))
+    assert [(gap['platform'], gap['content_type']) for gap in gaps] == [(platform, None) for platform in platforms]
+    assert all(gap['missing'] == 1 for gap in gaps)
+
+
+def test_scheduled_platforms_replace_the_fallback(db_path):
+    queue = PublishQueue(db_path)
+    queue.enqueue_content("Monday post", "2030-01-07 09:00:00", platform='twitter')
+    gaps = list(iter_gaps(db_path, MONDAY, date(2030, 1, 9), by=('platform',)))
+    assert [(gap['date'], gap['platform']) for gap in gaps] == [(date(2030, 1, 8), 'twitter')]
@@ -0,0 +1,58 @@
+import pytest
+
+from database import close_connections, get_connection, transaction
+from enhanced_linkedin_main import EnhancedLinkedInGenerator
+from migrations import migrate
+
+
+@pytest.fixture
+def library(tmp_path):
+    path = str(tmp_path / "test.db")
+    migrate(path)
+    # Skip __init__: the library queries need no AI components
+    generator = EnhancedLinkedInGenerator.__new__(EnhancedLinkedInGenerator)
+    generator.db_path = path
+    with transaction(path) as conn:
+        for i in range(7):
+            conn.execute(
+                "INSERT INTO posts (content, content_type, topic, industry, is_published, created_at) "
+                "VALUES (?, ?, 'Leadership', ?, ?, ?)",
+                (f"Post {i}", "Tips" if i % 2 else "Story", "Tech" if i < 4 else "Finance", i % 3 == 0,
+                 # Two posts share each timestamp, so the id breaks ties
+                 f"2030-01-0{1 + i // 2} 09:00:00"),
+            )
+    yield generator
+    close_connections(path)
+
+
+def _pages(library, filters=None, page_size=3):
+    pages, cursor = [], None
+    while True:
+        page = library.get_posts_page(cursor, filters, page_size)
+        pages.append([post['content'] for post in page['posts']])
+        cursor = page['next_cursor']
+        if cursor is None:
+            return pages
+
+
+def test_pages_cover_every_post_newest_first(library):
+    assert _pages(library) == [["Post 6", "Post 5", "Post 4"], ["Post 3", "Post 2", "Post 1"], ["Post 0"]]
+
+
+def test_exact_page_size_has_no_next_cursor(library):
+    page = library.get_posts_page(page_size=7)
+    assert len(page['posts']) == 7 and page['next_cursor'] is None
+
+
+def test_filters_apply_to_every_page(library):
+    assert _pages(library, {'content_type': "Tips"}, page_size=2) == [["Post 5", "Post 3"], ["Post 1"]]
+    assert _pages(library, {'industry': "Finance", 'is_published': True}) == [["Post 6"]]
+    assert _pages(library, {'content_type': ""}, page_size=10) == [[f"Post {i}" for i in range(6, -1, -1)]]
+
+
+def test_pages_use_the_keyset_index(library):
+    plan = get_connection(library.db_path).execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM posts WHERE (created_at, id) < (?, ?) "
+        "ORDER BY created_at DESC, id DESC LIMIT 3", ("2030-01-03", 5)
+    ).fetchall()
+    assert not any("TEMP B-TREE" in row[-1] for row in plan)
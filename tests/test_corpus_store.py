@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from few_shot import FewShotPosts, build_corpus_store
+
+POSTS = [
+    {"text": "English short", "engagement": 50, "line_count": 3, "language": "English", "tags": ["Job Search"]},
+    {"text": "Hinglish short", "engagement": 90, "line_count": 4, "language": "Hinglish", "tags": ["Job Search"]},
+    {"text": "No language", "engagement": 70, "line_count": 2, "language": None, "tags": ["Job Search", "Career"]},
+    {"text": "Missing language", "engagement": 10, "line_count": 12, "tags": ["Career"]},
+    {"text": "Empty language", "engagement": 30, "line_count": 15, "language": "", "tags": ["Motivation"]},
+]
+
+QUERIES = [
+    (length, language, tag)
+    for length in ("Short", "Medium", "Long")
+    for language in ("English", "Hinglish", None, "")
+    for tag in ("Job Search", "Career", "Motivation", "Unknown")
+]
+
+
+@pytest.fixture
+def backends(tmp_path):
+    json_path = tmp_path / "posts.json"
+    json_path.write_text(json.dumps(POSTS), encoding="utf-8")
+    store_path = build_corpus_store(str(json_path), str(tmp_path / "posts.ccs"))
+    return FewShotPosts(str(json_path)), FewShotPosts(store_path)
+
+
+def _texts(posts):
+    return [post["text"] for post in posts]
+
+
+@pytest.mark.parametrize("length,language,tag", QUERIES)
+def test_filtered_posts_match_across_backends(backends, length, language, tag):
+    from_json, from_store = backends
+    assert _texts(from_store.get_filtered_posts(length, language, tag)) == \
+        _texts(from_json.get_filtered_posts(length, language, tag))
+
+
+@pytest.mark.parametrize("length,language,tag", QUERIES)
+def test_ranked_posts_match_across_backends(backends, length, language, tag):
+    from_json, from_store = backends
+    expected = from_json.get_ranked_posts(length, language, tag, k=3)
+    actual = from_store.get_ranked_posts(length, language, tag, k=3)
+    assert (actual["level"], actual["candidates"], _texts(actual["posts"])) == \
+        (expected["level"], expected["candidates"], _texts(expected["posts"]))
+
+
+def test_none_language_round_trips(backends):
+    from_json, from_store = backends
+    assert _texts(from_store.get_filtered_posts("Short", None, "Job Search")) == ["No language"]
+    assert [post.get("language") for post in from_store.posts_data] == \
+        [post.get("language") for post in from_json.posts_data]
+    assert from_store.get_tag_stats() == from_json.get_tag_stats()
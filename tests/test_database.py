@@ -0,0 +1,39 @@
+import sqlite3
+
+import pytest
+
+from database import close_connections, get_connection, transaction
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    get_connection(path).execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    yield path
+    close_connections(path)
+
+
+def test_failed_commit_rolls_back_and_leaves_connection_usable(db_path):
+    # A deferred foreign key violation only surfaces at COMMIT
+    conn = get_connection(db_path)
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.execute("CREATE TABLE children (id INTEGER PRIMARY KEY, "
+                 "item_id INTEGER REFERENCES items (id) DEFERRABLE INITIALLY DEFERRED)")
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with transaction(db_path) as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('lost')")
+            conn.execute("INSERT INTO children (item_id) VALUES (999)")
+
+    assert not conn.in_transaction
+    with transaction(db_path) as conn:
+        conn.execute("INSERT INTO items (name) VALUES ('kept')")
+    assert [row[0] for row in conn.execute("SELECT name FROM items")] == ["kept"]
+
+
+def test_error_in_block_rolls_back(db_path):
+    with pytest.raises(RuntimeError):
+        with transaction(db_path) as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('lost')")
+            raise RuntimeError("boom")
+    assert get_connection(db_path).execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
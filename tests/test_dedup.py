@@ -0,0 +1,40 @@
+import pytest
+
+from database import close_connections, transaction
+from dedup import content_hash, find_duplicate, normalize_content, store_post
+from migrations import migrate
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    migrate(path)
+    yield path
+    close_connections(path)
+
+
+def test_wordless_posts_do_not_share_a_hash():
+    assert normalize_content("🚀🚀🚀") == "🚀🚀🚀"
+    assert content_hash("🚀🚀🚀") != content_hash("🎉 !!!")
+    assert content_hash("🚀  🚀") == content_hash("🚀 🚀\n")
+    assert normalize_content("Hello, World! 🚀") == "hello world"
+
+
+def test_store_post_keeps_distinct_wordless_posts(db_path):
+    with transaction(db_path) as conn:
+        rocket = store_post(conn, "🚀🚀🚀")
+        party = store_post(conn, "🎉 !!!")
+        again = store_post(conn, "🚀🚀🚀")
+        assert rocket != party
+        assert again == rocket
+        assert find_duplicate(conn, "👍") is None
+        assert find_duplicate(conn, "🎉 !!!")['post_id'] == party
+
+
+def test_exact_and_near_duplicates_still_detected(db_path):
+    text = "Five lessons I learned from my first year leading a remote engineering team"
+    with transaction(db_path) as conn:
+        post_id = store_post(conn, text)
+        assert find_duplicate(conn, text.upper() + "!!")['type'] == 'exact'
+        near = find_duplicate(conn, text + " in a startup", threshold=0.5)
+        assert near['type'] == 'near' and near['post_id'] == post_id
@@ -0,0 +1,169 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import publish_executor
+from config import Config
+from database import close_connections, transaction
+from dispatcher import ScheduleDispatcher, notify_scheduled
+from publish_queue import PublishQueue
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "DISPATCHER_POLL_INTERVAL", 0.1)
+    monkeypatch.setattr(Config, "WORKER_HEARTBEAT_INTERVAL", 0.1)
+    monkeypatch.setattr(Config, "DISPATCHER_LEADER_ONLY", False)
+    monkeypatch.setattr(publish_executor, "next_retry",
+                        lambda platform, result, attempts: datetime.now() + timedelta(seconds=0.3))
+    path = str(tmp_path / "test.db")
+    yield path
+    close_connections(path)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_load_does_not_duplicate_queued_jobs(db_path):
+    queue = PublishQueue(db_path)
+    queue.enqueue_content("Due soon", datetime.now())
+    dispatcher = ScheduleDispatcher(db_path, lambda *args: {'success': True})
+    assert dispatcher.load() == 1
+    assert dispatcher.load() == 0
+    assert dispatcher.pending == 1
+
+
+def test_retry_is_picked_up_by_another_dispatcher(db_path):
+    queue = PublishQueue(db_path)
+    job_id = queue.enqueue_content("Retried elsewhere", datetime.now())
+    later_id = queue.enqueue_content("Next week", datetime.now() + timedelta(days=7))
+    release = threading.Event()
+    published = []
+
+    def failing(platform, content, media_urls=None):
+        release.wait(5)
+        return {'success': False, 'error': 'Connection reset'}
+
+    def working(platform, content, media_urls=None):
+        published.append(content)
+        return {'success': True, 'post_id': 'ext-1'}
+
+    first = ScheduleDispatcher(db_path, failing)
+    second = ScheduleDispatcher(db_path, working)
+    first.load()
+    future = first.dispatch(job_id)
+    assert future is not None
+    second.start()
+    try:
+        # The second dispatcher has read past the job's id while the first holds its lease
+        assert _wait_for(lambda: second._last_id == later_id)
+        release.set()
+        assert future.result(5)['status'] == 'pending'
+        first.stop(1)
+
+        assert _wait_for(lambda: queue.get(job_id)['status'] == 'published')
+        assert published == ["Retried elsewhere"]
+        assert queue.get(job_id)['attempts'] == 2
+    finally:
+        release.set()
+        second.stop(1)
+
+
+def test_retry_survives_a_dispatcher_restart(db_path):
+    queue = PublishQueue(db_path)
+    job_id = queue.enqueue_content("Retried after restart", datetime.now())
+
+    first = ScheduleDispatcher(db_path, lambda *args: {'success': False, 'error': 'Connection reset'}).start()
+    try:
+        assert _wait_for(lambda: queue.get(job_id)['attempts'] == 1 and queue.get(job_id)['status'] == 'pending')
+    finally:
+        first.stop(1)
+
+    restarted = ScheduleDispatcher(db_path, lambda *args: {'success': True, 'post_id': 'ext-2'}).start()
+    try:
+        assert _wait_for(lambda: queue.get(job_id)['status'] == 'published')
+        assert queue.get(job_id)['attempts'] == 2
+    finally:
+        restarted.stop(1)
+
+
+def test_failed_publish_run_releases_the_job(db_path, monkeypatch, capsys):
+    queue = PublishQueue(db_path)
+    job_id = queue.enqueue_content("Ledger bug", datetime.now())
+    dispatcher = ScheduleDispatcher(db_path, lambda *args: {'success': True, 'post_id': 'ext-3'})
+
+    def broken(key, result):
+        raise RuntimeError("disk I/O error")
+    monkeypatch.setattr(dispatcher.executor.ledger, "succeed", broken)
+
+    dispatcher.load()
+    future = dispatcher.dispatch(job_id)
+    with pytest.raises(RuntimeError):
+        future.result(5)
+    assert _wait_for(lambda: queue.get(job_id)['status'] == 'pending')
+    job = queue.get(job_id)
+    assert job['lease_owner'] is None and "disk I/O error" in job['error_message']
+    assert "publishing schedule" in capsys.readouterr().out
+    dispatcher.executor.shutdown()
+
+
+def test_due_jobs_publish_in_due_order_and_future_ones_wait(db_path):
+    queue = PublishQueue(db_path)
+    now = datetime.now()
+    published = []
+    second = queue.enqueue_content("Second", now - timedelta(seconds=1))
+    first = queue.enqueue_content("First", now - timedelta(seconds=5))
+    future = queue.enqueue_content("Future", now + timedelta(hours=1))
+
+    dispatcher = ScheduleDispatcher(db_path, lambda platform, content, media_urls=None:
+                                    published.append(content) or {'success': True})
+    dispatcher.executor.limits = {'default': {'workers': 1, 'rate_per_minute': 6000}}
+    dispatcher.start()
+    try:
+        assert _wait_for(lambda: len(published) == 2)
+        assert published == ["First", "Second"]
+        assert queue.get(future)['status'] == 'pending'
+        assert [queue.get(job_id)['status'] for job_id in (first, second)] == ['published', 'published']
+    finally:
+        dispatcher.stop(1)
+
+
+def test_new_schedule_wakes_the_dispatcher(db_path, monkeypatch):
+    # No polling during the test: only the notification can bring the job in
+    monkeypatch.setattr(Config, "DISPATCHER_POLL_INTERVAL", 60)
+    monkeypatch.setattr(Config, "WORKER_HEARTBEAT_INTERVAL", 60)
+    queue = PublishQueue(db_path)
+    published = []
+    dispatcher = ScheduleDispatcher(db_path, lambda platform, content, media_urls=None:
+                                    published.append(content) or {'success': True}).start()
+    try:
+        job_id = queue.enqueue_content("Soon", datetime.now() + timedelta(seconds=0.2))
+        notify_scheduled(db_path, job_id, queue.get(job_id)['scheduled_time'])
+        assert _wait_for(lambda: published == ["Soon"], timeout=2)
+    finally:
+        dispatcher.stop(1)
+
+
+def test_stale_heap_entries_are_skipped(db_path):
+    queue = PublishQueue(db_path)
+    dispatcher = ScheduleDispatcher(db_path, lambda *args: {'success': True})
+    cancelled = queue.enqueue_content("Cancelled", datetime.now())
+    moved = queue.enqueue_content("Moved", datetime.now())
+    dispatcher.load()
+    queue.cancel(cancelled)
+    with transaction(db_path) as conn:
+        conn.execute("UPDATE scheduled_posts SET scheduled_time = ? WHERE id = ?",
+                     (datetime.now() + timedelta(hours=1), moved))
+
+    assert dispatcher.dispatch(cancelled) is None
+    assert dispatcher.dispatch(moved) is None
+    assert queue.get(moved)['status'] == 'pending'
+    assert dispatcher.pending == 3  # moved is queued again at its new time
@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from few_shot import FewShotPosts
+
+POSTS = [
+    {"text": "First", "engagement": 10, "line_count": 3, "language": "English", "tags": ["Career"]},
+    {"text": "Second", "engagement": 20, "line_count": 8, "language": "English", "tags": ["Career", "Job Search"]},
+    {"text": "Third", "engagement": 30, "line_count": 12, "language": "Hinglish", "tags": ["Motivation"]},
+]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / "posts.json"
+
+    def write(posts):
+        path.write_text(json.dumps(posts), encoding="utf-8")
+        return str(path)
+    return write
+
+
+def _reloaded_matches_fresh(fs, path):
+    fresh = FewShotPosts(path)
+    assert sorted(post["text"] for post in fs.posts_data) == sorted(post["text"] for post in fresh.posts_data)
+    assert fs.get_tag_stats() == fresh.get_tag_stats()
+    for tag in ("Career", "Job Search", "Motivation", "Leadership"):
+        for length in ("Short", "Medium", "Long"):
+            assert sorted(p["text"] for p in fs.get_filtered_posts(length, "English", tag)) == \
+                sorted(p["text"] for p in fresh.get_filtered_posts(length, "English", tag))
+
+
+def test_appending_posts_keeps_existing_ids(corpus):
+    fs = FewShotPosts(corpus(POSTS))
+    before = dict(fs.snapshot.posts)
+    path = corpus(POSTS + [{"text": "Fourth", "engagement": 5, "line_count": 2,
+                            "language": "English", "tags": ["Leadership"]}])
+    assert fs.refresh(force=True)
+    assert all(fs.snapshot.posts[post_id] is post for post_id, post in before.items())
+    _reloaded_matches_fresh(fs, path)
+
+
+def test_edited_and_removed_posts_are_retracted(corpus):
+    fs = FewShotPosts(corpus(POSTS))
+    edited = [dict(POSTS[0], tags=["Leadership"]), POSTS[2]]
+    path = corpus(edited)
+    assert fs.refresh(force=True)
+    assert fs.get_filtered_posts("Short", "English", "Career") == []
+    assert [p["text"] for p in fs.get_filtered_posts("Short", "English", "Leadership")] == ["First"]
+    _reloaded_matches_fresh(fs, path)
+
+
+def test_unchanged_file_is_not_reloaded(corpus):
+    path = corpus(POSTS)
+    fs = FewShotPosts(path)
+    snapshot = fs.snapshot
+    corpus(POSTS)
+    assert not fs.refresh(force=True)
+    assert fs.snapshot is snapshot
+
+
+LADDER_POSTS = [
+    {"text": "A", "engagement": 10, "line_count": 3, "language": "English", "tags": ["Career"]},
+    {"text": "B", "engagement": 50, "line_count": 8, "language": "English", "tags": ["Career"]},
+    {"text": "C", "engagement": 30, "line_count": 12, "language": "Hinglish", "tags": ["Motivation"]},
+    {"text": "D", "engagement": 5, "line_count": 2, "language": "English", "tags": ["job search"]},
+    {"text": "E", "engagement": 40, "line_count": 6, "language": "Hinglish", "tags": ["Job Search"]},
+]
+
+
+@pytest.mark.parametrize("query,level,texts", [
+    (("Short", "English", "Career"), "exact", ["A"]),
+    (("Long", "English", "Career"), "adjacent_length", ["B"]),
+    (("Long", "Hinglish", "Career"), "any_language", ["B"]),
+    (("Medium", "English", "JOB SEARCH"), "tag_alias", ["E", "D"]),
+    (("Short", "Hinglish", "Motivation"), None, []),
+])
+def test_ranked_posts_relax_until_something_matches(corpus, query, level, texts):
+    fs = FewShotPosts(corpus(LADDER_POSTS))
+    result = fs.get_ranked_posts(*query, k=2)
+    assert result['level'] == level
+    assert [post["text"] for post in result['posts']] == texts
+    assert result['candidates'] == len(texts)
+
+
+def test_ranked_posts_prefer_the_requested_length_then_engagement(corpus):
+    posts = LADDER_POSTS + [{"text": "F", "engagement": 90, "line_count": 9, "language": "English",
+                             "tags": ["Career"]}]
+    fs = FewShotPosts(corpus(posts))
+    result = fs.get_ranked_posts("Medium", "English", "Career", k=1)
+    assert [post["text"] for post in result['posts']] == ["F"]
+    assert (result['level'], result['candidates']) == ("exact", 2)
+
+
+def test_tag_stats_count_co_occurrence_and_breakdowns(corpus):
+    posts = LADDER_POSTS + [{"text": "G", "engagement": 1, "line_count": 4, "language": "English",
+                             "tags": ["Motivation", "Career", "Career"]}]
+    fs = FewShotPosts(corpus(posts))
+    stats = fs.get_tag_stats()
+    assert stats['counts'] == {"Career": 3, "Motivation": 2, "job search": 1, "Job Search": 1}
+    assert stats['co_occurrence'] == [{'tags': ["Career", "Motivation"], 'count': 1}]
+    assert stats['by_language'] == {"English": {"Career": 3, "job search": 1, "Motivation": 1},
+                                    "Hinglish": {"Motivation": 1, "Job Search": 1}}
+    assert stats['by_length']["Short"] == {"Career": 2, "job search": 1, "Motivation": 1}
+    assert fs.get_tags(sort_by='frequency') == ["Career", "Motivation", "Job Search", "job search"]
+    assert fs.get_tags(sort_by='name') == ["Career", "Job Search", "Motivation", "job search"]
+
+
+def test_tag_stats_follow_removed_posts(corpus):
+    fs = FewShotPosts(corpus(LADDER_POSTS))
+    corpus(LADDER_POSTS[:2])
+    assert fs.refresh(force=True)
+    stats = fs.get_tag_stats()
+    assert stats['counts'] == {"Career": 2}
+    assert stats['by_language'] == {"English": {"Career": 2}}
+    assert set(stats['by_length']) == {"Short", "Medium"}
+
+
+def test_empty_corpus_falls_back_to_default_tags(corpus):
+    fs = FewShotPosts(corpus([]))
+    assert fs.get_tags() == ["General", "Technology", "Career", "Business"]
@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+
+import pytest
+
+from database import close_connections, get_connection, transaction
+from metrics_retention import (archive_old_metrics, attach_archive, enable_incremental_vacuum,
+                               incremental_vacuum, post_history)
+from migrations import migrate
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    migrate(path)
+    yield path
+    close_connections(path)
+
+
+def _seed(db_path):
+    today = date.today()
+    old = today - timedelta(days=400)
+    with transaction(db_path) as conn:
+        post_id = conn.execute("INSERT INTO posts (content) VALUES ('Archived post')").lastrowid
+        for day in (old, old + timedelta(days=1), today):
+            conn.execute(
+                "INSERT INTO post_metrics (post_id, metric_date, views, likes) VALUES (?, ?, 100, 5)",
+                (post_id, day.isoformat()),
+            )
+    return post_id
+
+
+def test_archive_keeps_history_off_the_pooled_connection(db_path):
+    post_id = _seed(db_path)
+    assert archive_old_metrics(db_path, retention_days=30) == 2
+
+    conn = get_connection(db_path)
+    assert [row[1] for row in conn.execute("PRAGMA database_list")] == ["main"]
+    assert conn.execute("SELECT COUNT(*) FROM post_metrics").fetchone()[0] == 1
+    assert len(post_history(db_path, post_id)) == 3
+
+    with attach_archive(db_path) as archive:
+        assert archive.execute("SELECT COUNT(*) FROM post_metrics_archive").fetchone()[0] == 2
+    # Writers on the pooled connection are unaffected by the (closed) archive connection
+    with transaction(db_path) as conn:
+        conn.execute("DELETE FROM post_metrics")
+
+
+def test_incremental_vacuum_needs_the_explicit_conversion(db_path):
+    conn = get_connection(db_path)
+    assert incremental_vacuum(db_path) == 0
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+
+    assert enable_incremental_vacuum(db_path) is True
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    assert enable_incremental_vacuum(db_path) is False
@@ -0,0 +1,35 @@
+from datetime import date
+
+import pytest
+
+from database import close_connections, open_connection, transaction
+from metrics_rollup import compact_rollups, window_summary
+from migrations import migrate
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    migrate(path)
+    with transaction(path) as conn:
+        post_id = conn.execute("INSERT INTO posts (content) VALUES ('Rolled up')").lastrowid
+        conn.execute("INSERT INTO post_metrics (post_id, metric_date, views) VALUES (?, '2030-01-07', 100)",
+                     (post_id,))
+    yield path
+    close_connections(path)
+
+
+def test_window_summary_reads_without_the_write_lock(db_path):
+    writer = open_connection(db_path)
+    writer.execute("BEGIN IMMEDIATE")
+    try:
+        # Dirty rows are left for the write path; the read neither blocks nor refreshes
+        assert window_summary(db_path, date(2030, 1, 1))['count'] == 0
+    finally:
+        writer.execute("ROLLBACK")
+        writer.close()
+
+    assert compact_rollups(db_path) > 0
+    summary = window_summary(db_path, date(2030, 1, 1))
+    assert summary['count'] == 1 and summary['views']['sum'] == 100
+    assert compact_rollups(db_path) == 0
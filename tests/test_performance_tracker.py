@@ -0,0 +1,65 @@
+from datetime import date, datetime
+
+import pytest
+
+from database import close_connections, get_connection, transaction
+from linkedin_scheduler import PerformanceTracker
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    path = str(tmp_path / "test.db")
+    tracker = PerformanceTracker(path)
+    with transaction(path) as conn:
+        tracker.post_id = conn.execute("INSERT INTO posts (content) VALUES ('Tracked post')").lastrowid
+    yield tracker
+    close_connections(path)
+
+
+def _rows(tracker):
+    return get_connection(tracker.db_path).execute(
+        "SELECT metric_date, views FROM post_metrics ORDER BY metric_date"
+    ).fetchall()
+
+
+def test_same_day_polls_update_one_row_whatever_the_date_type(tracker):
+    post_id = tracker.post_id
+    tracker.track_many([{'post_id': post_id, 'metric_date': date(2026, 10, 19), 'views': 10}])
+    tracker.track_many([{'post_id': post_id, 'metric_date': datetime(2026, 10, 19, 14, 3), 'views': 20}])
+    tracker.track_many([{'post_id': post_id, 'metric_date': "2026-10-19T18:30:00", 'views': 30}])
+    tracker.track_many([{'post_id': post_id, 'metric_date': "2026-10-20", 'views': 40}])
+    assert _rows(tracker) == [("2026-10-19", 30), ("2026-10-20", 40)]
+
+
+def test_metric_date_defaults_to_today(tracker):
+    tracker.track_post_performance(tracker.post_id, {'views': 5, 'likes': 1})
+    assert _rows(tracker) == [(datetime.now().date().isoformat(), 5)]
+
+
+def test_top_posts_rank_by_the_latest_metrics(tracker):
+    with transaction(tracker.db_path) as conn:
+        other = conn.execute("INSERT INTO posts (content) VALUES ('Other post')").lastrowid
+        broken = conn.execute(
+            "INSERT INTO posts (content, engagement_data) VALUES ('Legacy post', 'not json')"
+        ).lastrowid
+    tracker.track_many([
+        {'post_id': tracker.post_id, 'metric_date': "2026-10-18", 'views': 100, 'shares': 50},
+        {'post_id': tracker.post_id, 'metric_date': "2026-10-19", 'views': 100, 'shares': 3},
+        {'post_id': other, 'metric_date': "2026-10-19", 'views': 100, 'shares': 7},
+    ])
+
+    top = tracker.get_top_posts('shares', days=1)
+    assert [(post['post_id'], post['shares']) for post in top] == [(other, 7), (tracker.post_id, 3)]
+    # Malformed legacy JSON reads as NULL instead of failing the query
+    row = get_connection(tracker.db_path).execute(
+        "SELECT engagement_shares FROM posts WHERE id = ?", (broken,)
+    ).fetchone()
+    assert row == (None,)
+
+
+def test_generated_columns_are_indexed(tracker):
+    plan = get_connection(tracker.db_path).execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM posts WHERE engagement_shares IS NOT NULL "
+        "ORDER BY engagement_shares DESC LIMIT 5"
+    ).fetchall()
+    assert any("idx_posts_engagement_shares" in row[-1] for row in plan)
@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import pytest
+
+from config import Config
+from database import close_connections, get_connection, transaction
+from linkedin_scheduler import PerformanceTracker
+from migrations import migrate
+from posting_times import (PRIOR_HOURS, PRIOR_MULTIPLIERS, PostingTimeOptimizer, build_model,
+                           update_posting_times)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    migrate(path)
+    yield path
+    close_connections(path)
+
+
+def _set_cell(db_path, weekday, hour, posts, rate):
+    with transaction(db_path) as conn:
+        conn.execute('''
+            INSERT INTO posting_time_stats (weekday, hour, posts, rate_sum) VALUES (?, ?, ?, ?)
+            ON CONFLICT (weekday, hour) DO UPDATE SET posts = excluded.posts, rate_sum = excluded.rate_sum
+        ''', (weekday, hour, posts, posts * rate))
+
+
+def test_without_data_the_prior_decides(db_path):
+    model = build_model(get_connection(db_path))
+    assert model['posts'] == 0
+    assert model['scores'][1][9] == pytest.approx(PRIOR_MULTIPLIERS[0])
+    assert model['scores'][1][14] == pytest.approx(PRIOR_MULTIPLIERS[1])
+    assert model['scores'][6][3] == pytest.approx(PRIOR_MULTIPLIERS[2])
+    # Every research hour is optimal; other hours move to the nearest one
+    assert all(model['targets'][1][hour] == hour for hour in PRIOR_HOURS[1])
+    assert model['targets'][1][13] == 12
+
+
+def test_sparse_cells_shrink_toward_the_prior(db_path):
+    # One outstanding post at 3am on a Sunday is not enough to beat the research hours
+    _set_cell(db_path, 6, 3, posts=1, rate=10.0)
+    model = build_model(get_connection(db_path))
+    strength = Config.POSTING_TIME_PRIOR_STRENGTH
+    expected = (10.0 + strength * 10.0 * PRIOR_MULTIPLIERS[2]) / (1 + strength)
+    assert model['scores'][6][3] == pytest.approx(expected)
+    assert model['scores'][6][3] < model['scores'][1][9]
+
+    # Enough posts behind it and the cell wins
+    _set_cell(db_path, 6, 3, posts=200, rate=10.0)
+    _set_cell(db_path, 1, 9, posts=200, rate=2.0)
+    model = build_model(get_connection(db_path))
+    assert max(range(24), key=model['scores'][6].__getitem__) == 3
+    assert model['scores'][6][3] > model['scores'][1][9]
+
+
+def test_optimizer_cache_follows_new_data(db_path):
+    optimizer = PostingTimeOptimizer(db_path)
+    tuesday = datetime(2030, 1, 8, 13, 30)
+    assert optimizer.optimize(tuesday) == datetime(2030, 1, 8, 12)
+    assert optimizer.optimize(datetime(2030, 1, 8, 9, 30)) == datetime(2030, 1, 8, 9, 30)
+
+    _set_cell(db_path, 1, 13, posts=500, rate=50.0)
+    _set_cell(db_path, 1, 9, posts=500, rate=1.0)
+    with transaction(db_path) as conn:
+        update_posting_times(conn, [0])  # bumps the model generation
+    assert optimizer.optimize(tuesday) == tuesday
+    assert optimizer.best_slots(limit=1)[0]['weekday'] == 1 and optimizer.best_slots(limit=1)[0]['hour'] == 13
+
+
+def test_new_metrics_replace_a_posts_contribution(db_path):
+    tracker = PerformanceTracker(db_path)
+    with transaction(db_path) as conn:
+        post_id = conn.execute("INSERT INTO posts (content) VALUES ('Tuesday post')").lastrowid
+        conn.execute(
+            "INSERT INTO scheduled_posts (post_id, scheduled_time, status, published_at) "
+            "VALUES (?, ?, 'published', ?)", (post_id, datetime(2030, 1, 8, 10), datetime(2030, 1, 8, 10, 5))
+        )
+    tracker.track_many([{'post_id': post_id, 'metric_date': "2030-01-08", 'views': 100, 'likes': 10}])
+    tracker.track_many([{'post_id': post_id, 'metric_date': "2030-01-08", 'views': 100, 'likes': 20}])
+
+    cells = get_connection(db_path).execute(
+        "SELECT weekday, hour, posts, rate_sum FROM posting_time_stats WHERE posts > 0"
+    ).fetchall()
+    assert cells == [(1, 10, 1, pytest.approx(20.0))]
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from config import Config
+from database import close_connections, transaction
+from publish_executor import PublishExecutor
+from publish_ledger import PublishLedger, idempotency_key
+from publish_queue import PublishQueue
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "test.db")
+    yield path
+    close_connections(path)
+
+
+def _age(db_path, key, column, seconds):
+    with transaction(db_path) as conn:
+        conn.execute(
+            f"UPDATE publish_ledger SET {column} = ? WHERE idempotency_key = ?",
+            (datetime.now() - timedelta(seconds=seconds), key)
+        )
+
+
+def test_started_entry_with_a_live_lease_is_not_unknown(db_path):
+    queue = PublishQueue(db_path)
+    ledger = PublishLedger(db_path)
+    job_id = queue.enqueue_content("Slow upload", datetime.now())
+    queue.claim(job_id, "worker-1")
+    key = idempotency_key("Slow upload", job_id)
+
+    assert ledger.begin(key, job_id, "linkedin") is None
+    _age(db_path, key, "started_at", 3600)
+    assert ledger.begin(key, job_id, "linkedin")['state'] == 'started'
+
+    with transaction(db_path) as conn:
+        conn.execute("UPDATE scheduled_posts SET lease_expires_at = ? WHERE id = ?",
+                     (datetime.now() - timedelta(seconds=1), job_id))
+    assert ledger.begin(key, job_id, "linkedin")['state'] == 'unknown'
+    # Queued jobs stay blocked until someone checks the platform
+    _age(db_path, key, "finished_at", 3600)
+    assert ledger.begin(key, job_id, "linkedin")['state'] == 'unknown'
+
+
+def test_unknown_publish_now_entry_expires_with_the_reuse_window(db_path):
+    ledger = PublishLedger(db_path)
+    key = idempotency_key("Launch day 🚀", platform="linkedin")
+
+    assert ledger.begin(key, None, "linkedin", reuse_seconds=600) is None
+    _age(db_path, key, "started_at", 3600)
+    assert ledger.begin(key, None, "linkedin", reuse_seconds=600)['state'] == 'unknown'
+    assert ledger.begin(key, None, "linkedin", reuse_seconds=600)['state'] == 'unknown'
+
+    _age(db_path, key, "finished_at", 601)
+    assert ledger.begin(key, None, "linkedin", reuse_seconds=600) is None
+    assert ledger.get(key)['state'] == 'started'
+
+
+def _reclaim(db_path, job_id):
+    """What WorkerRegistry.reclaim_dead does for a dead worker's job"""
+    with transaction(db_path) as conn:
+        conn.execute("UPDATE scheduled_posts SET status = 'pending', lease_owner = NULL, "
+                     "lease_expires_at = NULL WHERE id = ?", (job_id,))
+
+
+def test_reclaimed_job_after_a_dead_worker_becomes_unknown(db_path):
+    queue = PublishQueue(db_path)
+    ledger = PublishLedger(db_path)
+    job_id = queue.enqueue_content("Crashed mid-call", datetime.now())
+    queue.claim(job_id, "dead-worker")
+    key = idempotency_key("Crashed mid-call", job_id)
+    assert ledger.begin(key, job_id, "linkedin", owner="dead-worker") is None
+
+    _age(db_path, key, "started_at", 3600)
+    _reclaim(db_path, job_id)
+    queue.claim(job_id, "new-worker")
+    # The new claimant's own lease does not count as the dead worker's
+    assert ledger.begin(key, job_id, "linkedin", owner="new-worker")['state'] == 'unknown'
+
+
+def test_in_flight_skips_dead_letter_instead_of_retrying_forever(db_path):
+    queue = PublishQueue(db_path)
+    executor = PublishExecutor(queue, lambda *args: {'success': True})
+    job_id = queue.enqueue_content("Stuck upload", datetime.now())
+    key = idempotency_key("Stuck upload", job_id)
+    job = queue.claim(job_id, "dead-worker")
+    assert executor.ledger.begin(key, job_id, "linkedin", owner="dead-worker") is None
+
+    statuses = []
+    try:
+        for attempt in range(20):
+            _reclaim(db_path, job_id)
+            with transaction(db_path) as conn:
+                conn.execute("UPDATE scheduled_posts SET scheduled_time = ? WHERE id = ?",
+                             (datetime.now() - timedelta(seconds=1), job_id))
+            job = queue.claim(job_id, f"worker-{attempt}")
+            statuses.append(executor.submit(job, f"worker-{attempt}").result(5)['status'])
+            if statuses[-1] != 'pending':
+                break
+    finally:
+        executor.shutdown()
+
+    assert statuses[-1] == 'dead_letter'
+    assert len(statuses) == Config.RETRY_POLICIES['default']['default']['max_attempts'] - 1
+    assert executor.ledger.get(key)['state'] == 'started'
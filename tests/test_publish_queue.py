@@ -0,0 +1,111 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import close_connections, transaction
+from publish_queue import PublishQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    path = str(tmp_path / "test.db")
+    queue = PublishQueue(path)
+    yield queue
+    close_connections(path)
+
+
+def test_claim_due_takes_due_jobs_earliest_first(queue):
+    now = datetime.now()
+    late = queue.enqueue_content("Later", now - timedelta(minutes=1))
+    early = queue.enqueue_content("Earlier", now - timedelta(minutes=5))
+    queue.enqueue_content("Future", now + timedelta(hours=1))
+
+    jobs = queue.claim_due("worker-1")
+    assert [job['id'] for job in jobs] == [early, late]
+    assert all(job['status'] == 'publishing' and job['lease_owner'] == "worker-1" for job in jobs)
+    assert jobs[0]['content'] == "Earlier" and jobs[0]['attempts'] == 1
+    assert queue.claim_due("worker-2") == []
+
+
+def test_only_one_concurrent_claimant_wins(queue):
+    job_id = queue.enqueue_content("Contended", datetime.now())
+    results = []
+
+    def claim(owner):
+        results.append(queue.claim(job_id, owner))
+        close_connections(queue.db_path)
+
+    threads = [threading.Thread(target=claim, args=(f"worker-{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len([job for job in results if job]) == 1
+
+
+def test_expired_lease_is_recovered_and_reclaimed(queue):
+    job_id = queue.enqueue_content("Orphaned", datetime.now())
+    queue.claim(job_id, "dead-worker")
+    assert queue.claim_due("worker-2") == []  # lease still valid
+
+    with transaction(queue.db_path) as conn:
+        conn.execute("UPDATE scheduled_posts SET lease_expires_at = ? WHERE id = ?",
+                     (datetime.now() - timedelta(seconds=1), job_id))
+    jobs = queue.claim_due("worker-2")
+    assert [(job['id'], job['lease_owner'], job['attempts']) for job in jobs] == [(job_id, "worker-2", 2)]
+    # The worker that lost its lease can no longer settle the job
+    assert not queue.complete(job_id, "dead-worker", {'url': "https://example.com/p/1"})
+    assert queue.fail(job_id, "dead-worker", "late failure") is None
+    assert queue.complete(job_id, "worker-2", {'url': "https://example.com/p/1"})
+
+
+def test_recover_expired_returns_jobs_to_pending(queue):
+    job_id = queue.enqueue_content("Stalled", datetime.now())
+    queue.claim(job_id, "dead-worker", lease_seconds=60)
+    assert queue.recover_expired() == 0
+    with transaction(queue.db_path) as conn:
+        conn.execute("UPDATE scheduled_posts SET lease_expires_at = ? WHERE id = ?",
+                     (datetime.now() - timedelta(seconds=1), job_id))
+    assert queue.recover_expired() == 1
+    job = queue.get(job_id)
+    assert (job['status'], job['lease_owner'], job['lease_expires_at']) == ('pending', None, None)
+
+
+def test_fail_retries_or_dead_letters(queue):
+    retry_id = queue.enqueue_content("Retry me", datetime.now())
+    dead_id = queue.enqueue_content("Give up", datetime.now())
+    queue.claim_due("worker-1")
+    retry_at = datetime.now() + timedelta(minutes=5)
+
+    assert queue.fail(retry_id, "worker-1", "[network] timeout", retry_at) == 'pending'
+    assert queue.fail(dead_id, "worker-1", "[permanent] rejected") == 'dead_letter'
+    job = queue.get(retry_id)
+    assert job['lease_owner'] is None and job['error_message'] == "[network] timeout"
+    assert datetime.fromisoformat(str(job['scheduled_time'])) == retry_at
+    assert queue.claim(retry_id, "worker-2") is None  # not due until retry_at
+
+
+def test_complete_and_cancel(queue):
+    done = queue.enqueue_content("Publish me", datetime.now())
+    pending = queue.enqueue_content("Cancel me", datetime.now() + timedelta(days=1))
+    queue.claim(done, "worker-1")
+
+    assert queue.complete(done, "worker-1", {'url': "https://example.com/p/2"})
+    assert queue.get(done)['status'] == 'published' and queue.get(done)['post_url'] == "https://example.com/p/2"
+    assert queue.cancel(done) is None
+    assert queue.cancel(pending)['status'] == 'cancelled'
+    assert queue.status_counts() == {'published': 1, 'cancelled': 1}
+
+
+def test_list_jobs_pages_in_due_order(queue):
+    start = datetime(2030, 1, 1, 9)
+    ids = [queue.enqueue_content(f"Job {i}", start + timedelta(hours=i % 3)) for i in range(5)]
+    seen, cursor = [], None
+    while True:
+        page = queue.list_jobs(cursor=cursor, page_size=2)
+        seen += [job['id'] for job in page['jobs']]
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert seen == sorted(ids, key=lambda job_id: (ids.index(job_id) % 3, job_id))
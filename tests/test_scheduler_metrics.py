@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from database import close_connections
+from publish_queue import PublishQueue
+from scheduler_metrics import LAG_BUCKETS, SchedulerMetrics, _lag_bucket, _percentile
+
+
+@pytest.fixture
+def metrics(tmp_path):
+    path = str(tmp_path / "test.db")
+    metrics = SchedulerMetrics(path)
+    yield metrics
+    close_connections(path)
+
+
+@pytest.mark.parametrize("seconds,label", [
+    (0, "<1s"), (0.99, "<1s"), (1, "1-5s"), (29.9, "5-30s"), (30, "30s-1m"),
+    (299, "1-5m"), (899, "5-15m"), (3599, "15m-1h"), (3600, "1h+"), (86400, "1h+"),
+])
+def test_lag_buckets_are_half_open(seconds, label):
+    assert _lag_bucket(seconds) == label
+
+
+def test_percentile_is_nearest_rank():
+    values = list(range(1, 11))
+    assert (_percentile(values, 0.5), _percentile(values, 0.9), _percentile(values, 1.0)) == (5, 9, 10)
+    assert _percentile([], 0.5) == 0.0
+
+
+def _attempt(metrics, job_id, attempt, due, lag_seconds, outcome, platform="linkedin", call_seconds=0.5):
+    finished = due + timedelta(seconds=lag_seconds)
+    job = {'id': job_id, 'platform': platform, 'attempts': attempt, 'scheduled_time': due}
+    metrics.record_attempt(job, finished - timedelta(seconds=call_seconds), finished, outcome, "worker-1")
+
+
+def test_report_measures_lag_from_the_original_due_time(metrics):
+    due = datetime.now() - timedelta(hours=2)
+    _attempt(metrics, 1, 1, due, 0.5, 'published')
+    _attempt(metrics, 2, 1, due, 10, 'published', platform="twitter")
+    # Job 3 failed once and was published on its retry, 20 minutes after the original due time
+    _attempt(metrics, 3, 1, due, 2, 'pending')
+    _attempt(metrics, 3, 2, due + timedelta(minutes=15), 300, 'published')
+    _attempt(metrics, 4, 1, due, 1, 'dead_letter')
+
+    report = metrics.report(days=1)
+    assert report['published'] == 3
+    histogram = report['lag']['histogram']
+    assert list(histogram) == [label for _, label in LAG_BUCKETS]
+    assert (histogram["<1s"], histogram["5-30s"], histogram["15m-1h"]) == (1, 1, 1)
+    assert sum(histogram.values()) == 3
+    assert report['lag']['on_time'] == pytest.approx(2 / 3)
+    assert report['attempts'] == {1: 2, 2: 1}
+    assert report['outcomes'] == {'published': 3, 'pending': 1, 'dead_letter': 1}
+    assert report['latency']['linkedin']['calls'] == 4 and report['latency']['twitter']['calls'] == 1
+
+
+def test_samples_feed_utilisation_and_queue_depth(metrics):
+    queue = PublishQueue(metrics.db_path)
+    queue.enqueue_content("Due", datetime.now() - timedelta(minutes=1))
+    queue.enqueue_content("Later", datetime.now() + timedelta(days=1))
+    queue.claim(queue.enqueue_content("Claimed", datetime.now()), "worker-1")
+
+    metrics.sample("worker-1", {'linkedin': (30.0, 120.0)})
+    metrics.sample("worker-2", {'linkedin': (90.0, 120.0), 'twitter': (0.0, 60.0)}, queue_depth=True)
+    report = metrics.report()
+    assert report['utilization'] == {'linkedin': pytest.approx(0.5), 'twitter': 0.0}
+    assert [(depth['pending'], depth['due'], depth['publishing']) for depth in report['queue_depth']] == [(2, 1, 1)]
@@ -0,0 +1,134 @@
+"""
+Coordination between dispatcher processes sharing one database
+
+Each dispatcher registers itself in ``scheduler_workers`` and heartbeats
+periodically; a heartbeat also extends the leases of the jobs it holds, so a
+slow publish never loses its lease while the worker is alive. A worker that
+stops heartbeating for ``WORKER_TIMEOUT`` is dead and its jobs go back to
+'pending' without waiting for their full lease.
+
+Housekeeping (reclaiming dead workers' jobs, reconciling the ledger) is done
+by one elected leader, which holds a renewable row lease in
+``scheduler_leader``. With ``DISPATCHER_LEADER_ONLY`` the leader is also the
+only publisher and the others are hot standbys.
+"""
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+from database import get_connection, transaction
+from migrations import migrate
+
+config = Config()
+
+
+class WorkerRegistry:
+    """Heartbeats of live dispatcher workers"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or config.DB_PATH
+        migrate(self.db_path)
+
+    def register(self, worker: str):
+        now = datetime.now()
+        with transaction(self.db_path) as conn:
+            conn.execute('''
+                INSERT INTO scheduler_workers (worker_id, host, pid, started_at, heartbeat_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (worker_id) DO UPDATE SET heartbeat_at = excluded.heartbeat_at
+            ''', (worker, socket.gethostname(), os.getpid(), now, now))
+
+    def heartbeat(self, worker: str, lease_seconds: Optional[float] = None) -> int:
+        """Mark the worker alive and extend its job leases; returns how many jobs it holds"""
+        now = datetime.now()
+        lease_until = now + timedelta(seconds=lease_seconds or config.SCHEDULER_LEASE_SECONDS)
+        with transaction(self.db_path) as conn:
+            updated = conn.execute(
+                "UPDATE scheduler_workers SET heartbeat_at = ? WHERE worker_id = ?", (now, worker)
+            ).rowcount
+            if not updated:
+                # Declared dead after a long stall; its old jobs were reclaimed, so just rejoin
+                self.register(worker)
+            return conn.execute('''
+                UPDATE scheduled_posts SET lease_expires_at = ?
+                WHERE lease_owner = ? AND status = 'publishing'
+            ''', (lease_until, worker)).rowcount
+
+    def unregister(self, worker: str):
+        with transaction(self.db_path) as conn:
+            conn.execute("DELETE FROM scheduler_workers WHERE worker_id = ?", (worker,))
+
+    def reclaim_dead(self, timeout: Optional[float] = None) -> List[Tuple[int, str]]:
+        """Return jobs of dead workers (and any expired leases) to 'pending'.
+
+        Returns the (id, scheduled_time) of each reclaimed job so the caller can
+        queue them again.
+        """
+        now = datetime.now()
+        cutoff = now - timedelta(seconds=timeout or config.WORKER_TIMEOUT)
+        with transaction(self.db_path) as conn:
+            rows = conn.execute('''
+                UPDATE scheduled_posts
+                SET status = 'pending', lease_owner = NULL, lease_expires_at = NULL
+                WHERE status = 'publishing' AND (
+                    lease_expires_at < ?
+                    OR lease_owner IN (SELECT worker_id FROM scheduler_workers WHERE heartbeat_at < ?)
+                )
+                RETURNING id, scheduled_time
+            ''', (now, cutoff)).fetchall()
+            conn.execute("DELETE FROM scheduler_workers WHERE heartbeat_at < ?", (cutoff,))
+        return rows
+
+    def workers(self) -> List[Dict]:
+        """Registered workers with the number of jobs each holds"""
+        cutoff = datetime.now() - timedelta(seconds=config.WORKER_TIMEOUT)
+        rows = get_connection(self.db_path).execute('''
+            SELECT w.worker_id, w.host, w.pid, w.started_at, w.heartbeat_at,
+                   COUNT(sp.id) AS jobs
+            FROM scheduler_workers w
+            LEFT JOIN scheduled_posts sp ON sp.lease_owner = w.worker_id AND sp.status = 'publishing'
+            GROUP BY w.worker_id
+            ORDER BY w.started_at
+        ''').fetchall()
+        return [{
+            'worker_id': worker, 'host': host, 'pid': pid, 'started_at': started_at,
+            'heartbeat_at': heartbeat_at, 'jobs': jobs,
+            'alive': datetime.fromisoformat(str(heartbeat_at)) >= cutoff
+        } for worker, host, pid, started_at, heartbeat_at, jobs in rows]
+
+
+class LeaderElection:
+    """Leadership as a renewable lease on one row of scheduler_leader"""
+
+    def __init__(self, db_path: Optional[str] = None, name: str = "dispatcher"):
+        self.db_path = db_path or config.DB_PATH
+        self.name = name
+        migrate(self.db_path)
+
+    def acquire(self, owner: str, ttl: Optional[float] = None) -> bool:
+        """Take or renew leadership; True if owner is the leader until the lease runs out"""
+        now = datetime.now()
+        expires = now + timedelta(seconds=ttl or config.WORKER_TIMEOUT)
+        with transaction(self.db_path) as conn:
+            conn.execute('''
+                INSERT INTO scheduler_leader (name, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE scheduler_leader.owner = excluded.owner OR scheduler_leader.expires_at < ?
+            ''', (self.name, owner, expires, now))
+            return conn.execute(
+                "SELECT owner FROM scheduler_leader WHERE name = ?", (self.name,)
+            ).fetchone()[0] == owner
+
+    def release(self, owner: str):
+        with transaction(self.db_path) as conn:
+            conn.execute("DELETE FROM scheduler_leader WHERE name = ? AND owner = ?", (self.name, owner))
+
+    def leader(self) -> Optional[str]:
+        """Current leader, if its lease is still valid"""
+        row = get_connection(self.db_path).execute(
+            "SELECT owner FROM scheduler_leader WHERE name = ? AND expires_at >= ?",
+            (self.name, datetime.now())
+        ).fetchone()
+        return row[0] if row else None